@@ -1 +1 @@
-from .dependencies import get_current_user_role, require_admin, require_operator, require_viewer
\ No newline at end of file
+from .dependencies import get_current_user_role, get_current_username, require_admin, require_operator, require_viewer
\ No newline at end of file
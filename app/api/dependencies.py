@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.security import get_current_user_role
+from app.core.security import decode_access_token, get_current_user_role
+from app.core.token_cache import token_revocations
 from app.db import UserRole
 from typing import List
 
@@ -9,6 +10,12 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 def require_roles(allowed_roles: List[UserRole]):
     """Dependency for role-based access control"""
     async def role_checker(token: str = Depends(oauth2_scheme)):
+        if token_revocations.is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session has been revoked",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
         user_role = await get_current_user_role(token)
         if user_role not in allowed_roles:
             raise HTTPException(
@@ -18,6 +25,17 @@ def require_roles(allowed_roles: List[UserRole]):
         return user_role
     return role_checker
 
+async def get_current_username(token: str = Depends(oauth2_scheme)) -> str:
+    """Username (token subject) of the caller, for attributing actions"""
+    payload = decode_access_token(token)
+    if payload is None or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return payload["sub"]
+
 # Convenience dependencies for common role requirements
 require_admin = require_roles([UserRole.ADMIN])
 require_operator = require_roles([UserRole.ADMIN, UserRole.OPERATOR])
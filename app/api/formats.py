@@ -0,0 +1,265 @@
+from fastapi import HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Annotated, Callable, Dict, List, Optional, Sequence
+import gzip
+import io
+import zlib
+import msgpack
+import numpy as np
+import orjson
+import zstandard
+from app.core.config import get_settings
+from app.models import PowerReadingCreate
+
+settings = get_settings()
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+PACKED = "application/vnd.ot-monitor.packed"
+
+# Fast-path list formats and the media type each is served as
+LIST_FORMATS = {
+    "rows": JSON,
+    "columns": "application/vnd.ot-monitor.columns+json",
+    "msgpack": MSGPACK,
+    "packed": PACKED,
+}
+
+# Accept media types that opt into a fast-path format
+_ACCEPT_FORMATS = {
+    "application/vnd.ot-monitor.rows+json": "rows",
+    "application/vnd.ot-monitor.columns+json": "columns",
+    MSGPACK: "msgpack",
+    "application/x-msgpack": "msgpack",
+    PACKED: "packed",
+}
+
+# Packed columnar layout of readings, a MessagePack map of:
+#   count             number of readings
+#   equipment         dictionary of [equipment_id, location] pairs
+#   equipment_index   uint32 per reading, into the dictionary
+#   voltage, current, frequency, power_factor
+#                     float64 per reading (power_factor NaN = missing)
+#   id, timestamp, is_anomaly
+#                     responses only: int64, int64 microseconds since the
+#                     Unix epoch (UTC), uint8
+# Arrays are little-endian raw bytes.
+PACKED_FLOAT_FIELDS = ("voltage", "current", "frequency", "power_factor")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_BATCH = TypeAdapter(Annotated[
+    List[PowerReadingCreate],
+    Field(min_length=1, max_length=settings.MAX_READINGS_BATCH_SIZE)
+])
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "zstd": lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+    "gzip": lambda data: gzip.compress(data, compresslevel=6),
+}
+
+def _media_type(header: str) -> str:
+    return header.split(";")[0].strip().lower()
+
+def list_format_dependency(*formats: str) -> Callable[..., Optional[str]]:
+    """Dependency resolving the fast-path format an endpoint supports, None for the default"""
+    def list_format(
+        request: Request,
+        format: Optional[str] = Query(None, description=f"One of {', '.join(formats)}; omit for the default JSON")
+    ) -> Optional[str]:
+        if format is not None:
+            if format not in formats:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown format '{format}', expected one of {', '.join(formats)}"
+                )
+            return format
+        for media_range in request.headers.get("accept", "").split(","):
+            fmt = _ACCEPT_FORMATS.get(_media_type(media_range))
+            if fmt in formats:
+                return fmt
+        return None
+    return list_format
+
+reading_list_format = list_format_dependency("rows", "columns", "msgpack", "packed")
+alert_list_format = list_format_dependency("rows", "columns", "msgpack")
+
+def _accepted_encoding(request: Request) -> Optional[str]:
+    """Preferred response compression from Accept-Encoding: zstd, then gzip"""
+    weights = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().lower().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip()] = quality
+    for coding in _COMPRESSORS:
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+def encoded_response(
+    request: Request,
+    content: bytes,
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Response compressed with zstd or gzip when the client accepts it and it is worth it"""
+    headers = dict(headers or {}, Vary="Accept-Encoding")
+    coding = _accepted_encoding(request) if len(content) >= settings.WIRE_COMPRESS_MIN_BYTES else None
+    if coding:
+        content = _COMPRESSORS[coding](content)
+        headers["Content-Encoding"] = coding
+    return Response(content=content, media_type=media_type, headers=headers)
+
+def pack_readings(names: List[str], rows: Sequence) -> bytes:
+    """Encode reading rows in the packed columnar layout"""
+    columns = dict(zip(names, zip(*rows))) if rows else {name: () for name in names}
+    dictionary: Dict[tuple, int] = {}
+    index = [
+        dictionary.setdefault(pair, len(dictionary))
+        for pair in zip(columns["equipment_id"], columns["location"])
+    ]
+    document = {
+        "count": len(rows),
+        "equipment": [list(pair) for pair in dictionary],
+        "equipment_index": np.array(index, dtype="<u4").tobytes(),
+        "id": np.array(columns["id"], dtype="<i8").tobytes(),
+        "timestamp": np.array(
+            [(timestamp - _EPOCH) // timedelta(microseconds=1) for timestamp in columns["timestamp"]],
+            dtype="<i8"
+        ).tobytes(),
+        "is_anomaly": np.array(columns["is_anomaly"], dtype="<u1").tobytes(),
+    }
+    for field in PACKED_FLOAT_FIELDS:
+        document[field] = np.array(
+            [np.nan if value is None else value for value in columns[field]], dtype="<f8"
+        ).tobytes()
+    return msgpack.packb(document)
+
+def list_response(
+    request: Request,
+    names: List[str],
+    rows: Sequence,
+    fmt: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serialize Core result rows straight to bytes in the requested format"""
+    if fmt == "columns":
+        columns = list(zip(*rows)) or [()] * len(names)
+        content = orjson.dumps(dict(zip(names, columns)), option=orjson.OPT_UTC_Z)
+    elif fmt == "msgpack":
+        content = msgpack.packb([dict(zip(names, row)) for row in rows], datetime=True)
+    elif fmt == "packed":
+        content = pack_readings(names, rows)
+    else:
+        content = orjson.dumps([dict(zip(names, row)) for row in rows], option=orjson.OPT_UTC_Z)
+    return encoded_response(request, content, LIST_FORMATS[fmt], headers)
+
+def model_response(request: Request, model: BaseModel):
+    """A response model as MessagePack when the client asks for it, else left to FastAPI"""
+    for media_range in request.headers.get("accept", "").split(","):
+        if _ACCEPT_FORMATS.get(_media_type(media_range)) == "msgpack":
+            return encoded_response(request, msgpack.packb(model.model_dump(), datetime=True), MSGPACK)
+    return model
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    limit = settings.WIRE_MAX_BODY_BYTES
+    try:
+        if encoding in ("", "identity"):
+            data = body
+        elif encoding == "gzip":
+            data = zlib.decompressobj(wbits=31).decompress(body, limit + 1)
+        elif encoding == "zstd":
+            data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body)).read(limit + 1)
+        else:
+            raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding '{encoding}'")
+    except (zlib.error, zstandard.ZstdError):
+        raise HTTPException(status_code=400, detail=f"Invalid {encoding} body")
+    if len(data) > limit:
+        raise HTTPException(status_code=413, detail=f"Decompressed body exceeds {limit} bytes")
+    return data
+
+def _unpack_readings(body: bytes) -> List[dict]:
+    """Expand a packed columnar body into reading dicts for validation"""
+    try:
+        document = msgpack.unpackb(body)
+        count = document["count"]
+        equipment = document["equipment"]
+        index = np.frombuffer(document["equipment_index"], dtype="<u4")
+        columns = {field: np.frombuffer(document[field], dtype="<f8") for field in PACKED_FLOAT_FIELDS}
+        pairs = [(equipment_id, location) for equipment_id, location in equipment]
+    except (KeyError, TypeError, ValueError, msgpack.UnpackException):
+        raise HTTPException(status_code=400, detail="Malformed packed body")
+    if any(len(array) != count for array in (index, *columns.values())):
+        raise HTTPException(status_code=400, detail="Packed arrays do not match count")
+    if count and int(index.max()) >= len(pairs):
+        raise HTTPException(status_code=400, detail="Packed equipment index out of range")
+
+    power_factor = columns["power_factor"]
+    return [
+        {
+            "voltage": voltage,
+            "current": current,
+            "frequency": frequency,
+            "power_factor": pf,
+            "equipment_id": pairs[key][0],
+            "location": pairs[key][1]
+        }
+        for key, voltage, current, frequency, pf in zip(
+            index.tolist(),
+            columns["voltage"].tolist(),
+            columns["current"].tolist(),
+            columns["frequency"].tolist(),
+            np.where(np.isnan(power_factor), None, power_factor).tolist()
+        )
+    ]
+
+def decode_reading_batch_body(body: bytes, content_type: str, content_encoding: str = "") -> List[PowerReadingCreate]:
+    """Decode and validate a batch of readings in any supported wire format"""
+    data = _decompress(body, content_encoding.strip().lower())
+    media_type = _media_type(content_type) or JSON
+    try:
+        if media_type == JSON or media_type.endswith("+json"):
+            return _BATCH.validate_json(data)
+        if media_type in (MSGPACK, "application/x-msgpack"):
+            try:
+                payload = msgpack.unpackb(data)
+            except (ValueError, msgpack.UnpackException):
+                raise HTTPException(status_code=400, detail="Malformed MessagePack body")
+            return _BATCH.validate_python(payload)
+        if media_type == PACKED:
+            return _BATCH.validate_python(_unpack_readings(data))
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+    raise HTTPException(
+        status_code=415,
+        detail=f"Unsupported Content-Type '{media_type}', expected {JSON}, {MSGPACK} or {PACKED}"
+    )
+
+async def decode_reading_batch(request: Request) -> List[PowerReadingCreate]:
+    """Dependency reading a batch of readings from JSON, MessagePack or packed columnar bodies"""
+    return decode_reading_batch_body(
+        await request.body(),
+        request.headers.get("content-type", ""),
+        request.headers.get("content-encoding", "")
+    )
+
+# Request body documentation for endpoints using decode_reading_batch
+READING_BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON: {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/PowerReadingCreate"}}},
+            MSGPACK: {"schema": {"type": "string", "format": "binary"}},
+            PACKED: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
@@ -1,47 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.db import get_db
-from app.models import Alert
+from typing import AsyncIterator, List, Optional
+import asyncio
+from app.core import get_settings
+from app.core.pagination import next_cursor
+from app.db import get_db, AlertSeverity, UserRole
+from app.db.session import AsyncSessionLocal
+from app.models import Alert, AlertBulkAcknowledge, AlertBulkAcknowledgeResult
 from app.services.alert import AlertService
+from app.services.alert_hub import AlertEvent, alert_hub
+from app.api import get_current_username, require_operator, require_viewer
+from app.api.formats import alert_list_format, list_response
+
+settings = get_settings()
 
 router = APIRouter()
 
 @router.get("/alerts/", response_model=List[Alert])
 async def get_alerts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     equipment_id: str = None,
     is_acknowledged: bool = None,
+    cursor: Optional[str] = None,
+    fmt: Optional[str] = Depends(alert_list_format),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of alerts with optional filtering"""
+    """Get list of alerts with optional filtering.
+
+    The X-Next-Cursor response header holds the cursor for the next page.
+    format=rows, columns or msgpack (or the matching Accept media type)
+    skips the ORM and schema validation for large pages.
+    """
     alert_service = AlertService(db)
-    return await alert_service.get_alerts(
+    filters = dict(
         skip=skip,
         limit=limit,
         equipment_id=equipment_id,
-        is_acknowledged=is_acknowledged
+        is_acknowledged=is_acknowledged,
+        cursor=cursor
+    )
+    try:
+        if fmt:
+            names, alerts = await alert_service.get_alert_rows(**filters)
+        else:
+            alerts = await alert_service.get_alerts(**filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cursor_token = next_cursor(alerts, limit)
+    headers = {"X-Next-Cursor": cursor_token} if cursor_token else None
+    if fmt:
+        return list_response(request, names, alerts, fmt, headers)
+    if headers:
+        response.headers.update(headers)
+    return alerts
+
+@router.post("/alerts/acknowledge", response_model=AlertBulkAcknowledgeResult)
+async def acknowledge_alerts(
+    selection: AlertBulkAcknowledge,
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_operator),
+    username: str = Depends(get_current_username)
+):
+    """Acknowledge many alerts at once, by ids or by filter.
+
+    Only unacknowledged alerts are updated, atomically; the caller is
+    recorded as the acknowledger.
+    """
+    alert_service = AlertService(db)
+    return await alert_service.acknowledge_alerts(
+        username,
+        ids=selection.ids,
+        equipment_id=selection.equipment_id,
+        severities=selection.severity,
+        start=selection.start,
+        end=selection.end
     )
 
 @router.put("/alerts/{alert_id}/acknowledge")
 async def acknowledge_alert(
     alert_id: int,
-    user_id: str,  # This would come from auth token in real implementation
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_operator),
+    username: str = Depends(get_current_username)
 ):
-    """Acknowledge an alert"""
+    """Acknowledge an alert as the calling user"""
     alert_service = AlertService(db)
     try:
-        await alert_service.acknowledge_alert(alert_id, user_id)
+        await alert_service.acknowledge_alert(alert_id, username)
         return {"message": "Alert acknowledged successfully"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/alerts/summary")
 async def get_alert_summary(
+    equipment_id: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """Get summary of alerts (counts by severity and acknowledgment status)"""
     alert_service = AlertService(db)
-    return await alert_service.get_summary()
\ No newline at end of file
+    return await alert_service.get_summary(equipment_id)
+
+@router.get("/alerts/stream")
+async def stream_alerts(
+    request: Request,
+    severity: Optional[List[AlertSeverity]] = Query(None),
+    equipment_id: Optional[List[str]] = Query(None),
+    last_alert_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Push new alerts as Server-Sent Events.
+
+    Reconnecting clients resume after ``last_alert_id`` (or the standard
+    ``Last-Event-ID`` header) instead of reloading the alert list.
+
+    The hub is per process: only alerts raised by the worker serving the
+    stream are pushed or replayed from its history, so with several
+    workers a client misses the others' alerts until it reloads the list.
+    """
+    resume_from = last_alert_id if last_alert_id is not None else last_event_id
+
+    return StreamingResponse(
+        _alert_event_stream(request, resume_from, severity, equipment_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _format_event(event: AlertEvent) -> str:
+    return f"id: {event.id}\nevent: alert\ndata: {event.payload}\n\n"
+
+async def _alert_event_stream(
+    request: Request,
+    resume_from: Optional[int],
+    severity: Optional[List[AlertSeverity]],
+    equipment_id: Optional[List[str]]
+) -> AsyncIterator[str]:
+    # Subscribed once the response starts, so a request that never streams
+    # leaves nothing behind; still before replaying so nothing published
+    # meanwhile is missed
+    subscription = alert_hub.subscribe(
+        severities=[s.value for s in severity] if severity else None,
+        equipment_ids=equipment_id
+    )
+    try:
+        last_sent = resume_from
+        if resume_from is not None:
+            backlog = alert_hub.replay(resume_from, subscription)
+            if backlog is None:
+                # Resume point is older than the in-memory history
+                async with AsyncSessionLocal() as db:
+                    alerts = await AlertService(db).get_alert_events_after(
+                        resume_from,
+                        severities=severity,
+                        equipment_ids=equipment_id,
+                        limit=settings.ALERT_STREAM_RESUME_LIMIT
+                    )
+                backlog = [AlertEvent.from_dict(alert) for alert in alerts]
+            for event in backlog:
+                yield _format_event(event)
+                last_sent = event.id
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(),
+                    timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            dropped = subscription.take_dropped()
+            if dropped:
+                yield f"event: dropped\ndata: {{\"count\": {dropped}}}\n\n"
+            # Skip events already delivered by the replay
+            if last_sent is not None and event.id <= last_sent:
+                continue
+            yield _format_event(event)
+    finally:
+        alert_hub.unsubscribe(subscription)
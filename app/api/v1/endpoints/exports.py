@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.db import UserRole
+from app.models import ArchiveExportRequest, ArchiveExportJob
+from app.services.export import export_jobs
+from app.api import require_admin
+
+router = APIRouter(tags=["exports"])
+
+@router.post("/exports/", response_model=ArchiveExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def export_archive(
+    request: ArchiveExportRequest,
+    current_role: UserRole = Depends(require_admin)
+):
+    """Start exporting readings and alerts to Parquet or Arrow IPC files on the server.
+
+    The export runs in the background; poll GET /exports/{id} until it
+    completes. Files are partitioned by date and equipment under
+    EXPORT_DIR/<name>, described by its manifest.json, and can be opened
+    with app.services.export.open_archive. Use the `export-archive` CLI
+    command for very large ranges.
+    """
+    try:
+        return export_jobs.start(
+            name=request.name,
+            fmt=request.format,
+            start=request.start,
+            end=request.end,
+            equipment_ids=request.equipment_ids,
+            tables=request.tables
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/exports/{export_id}", response_model=ArchiveExportJob)
+async def get_export(
+    export_id: str,
+    current_role: UserRole = Depends(require_admin)
+):
+    """Get the progress of an export, and the rows and files written once it completes"""
+    job = export_jobs.get(export_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
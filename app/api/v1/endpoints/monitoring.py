@@ -1,10 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
+from app.core import get_settings
+from app.core.pagination import next_cursor
 from app.db import get_db, UserRole
-from app.models import PowerReadingCreate, PowerReading
-from app.services import MonitoringService
-from app.api import require_operator
+from app.db.session import AsyncSessionLocal
+from app.models import PowerReadingCreate, PowerReading, PowerReadingBatchResult
+from app.services import MonitoringService, RollupService
+from app.services.ingest import ingest_writer
+from app.services.latest import latest_readings
+from app.api import require_operator, require_viewer
+from app.api.formats import (
+    JSON,
+    READING_BATCH_OPENAPI,
+    decode_reading_batch,
+    encoded_response,
+    list_response,
+    model_response,
+    reading_list_format,
+)
+
+settings = get_settings()
 
 router = APIRouter(tags=["monitoring"])
 
@@ -18,16 +39,141 @@ async def create_power_reading(
     monitoring_service = MonitoringService(db)
     return await monitoring_service.create_reading(reading)
 
+@router.post(
+    "/readings/batch",
+    response_model=PowerReadingBatchResult,
+    openapi_extra=READING_BATCH_OPENAPI
+)
+async def create_power_readings(
+    request: Request,
+    readings: List[PowerReadingCreate] = Depends(decode_reading_batch),
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_operator)
+):
+    """Create a batch of power readings (e.g. one gateway polling cycle).
+
+    The body is a JSON array, a MessagePack array of the same objects
+    (application/msgpack) or the packed columnar layout
+    (application/vnd.ot-monitor.packed), optionally with Content-Encoding
+    gzip or zstd. Accept: application/msgpack returns a MessagePack result.
+    """
+    monitoring_service = MonitoringService(db)
+    return model_response(request, await monitoring_service.create_readings(readings))
+
 @router.get("/readings/", response_model=List[PowerReading])
 async def get_power_readings(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     equipment_id: str = None,
+    cursor: Optional[str] = None,
+    fmt: Optional[str] = Depends(reading_list_format),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of power readings"""
+    """Get list of power readings, newest first.
+
+    The X-Next-Cursor response header holds the cursor for the next page.
+    format=rows, columns, msgpack or packed (or the matching Accept media
+    type) skips the ORM and schema validation for large pages, and is
+    compressed with zstd or gzip per Accept-Encoding.
+    """
     monitoring_service = MonitoringService(db)
-    return await monitoring_service.get_readings(skip, limit, equipment_id)
+    try:
+        if fmt:
+            names, readings = await monitoring_service.get_reading_rows(skip, limit, equipment_id, cursor)
+        else:
+            readings = await monitoring_service.get_readings(skip, limit, equipment_id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cursor_token = next_cursor(readings, limit)
+    headers = {"X-Next-Cursor": cursor_token} if cursor_token else None
+    if fmt:
+        return list_response(request, names, readings, fmt, headers)
+    if headers:
+        response.headers.update(headers)
+    return readings
+
+@router.get("/readings/aggregate")
+async def aggregate_power_readings(
+    start: datetime,
+    end: datetime,
+    equipment_id: List[str] = Query(...),
+    bucket: str = "1h",
+    stats: List[str] = Query(["avg"]),
+    fields: List[str] = Query(["voltage"]),
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Aggregate readings into time buckets (e.g. hourly average voltage).
+
+    The response is newline-delimited JSON; each line is a columnar chunk
+    such as {"equipment_id": [...], "bucket": [...], "voltage_avg": [...]}.
+    """
+    try:
+        MonitoringService.build_aggregate_query(equipment_id, start, end, bucket, stats, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        _aggregate_chunks(equipment_id, start, end, bucket, stats, fields),
+        media_type="application/x-ndjson"
+    )
+
+async def _aggregate_chunks(
+    equipment_ids: List[str],
+    start: datetime,
+    end: datetime,
+    bucket: str,
+    stats: List[str],
+    fields: List[str]
+) -> AsyncIterator[str]:
+    # The stream outlives the request's dependencies, so it owns its session
+    async with AsyncSessionLocal() as db:
+        monitoring_service = MonitoringService(db)
+        async for chunk in monitoring_service.aggregate_readings(
+            equipment_ids, start, end, bucket, stats, fields
+        ):
+            yield json.dumps(chunk, default=datetime.isoformat) + "\n"
+
+@router.get("/readings/rollups")
+async def get_power_reading_rollups(
+    start: datetime,
+    end: datetime,
+    equipment_id: List[str] = Query(...),
+    resolution: str = "1h",
+    fields: List[str] = Query(["voltage", "current", "frequency"]),
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Get pre-aggregated trend data (1m, 1h or 1d buckets) as columns"""
+    rollup_service = RollupService(db)
+    try:
+        return await rollup_service.get_rollups(equipment_id, start, end, resolution, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/equipment/latest", response_model=List[PowerReading])
+async def get_latest_power_readings(
+    request: Request,
+    location: Optional[str] = None,
+    fmt: Optional[str] = Depends(reading_list_format),
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Get the most recent reading of every equipment, ordered by equipment_id.
+
+    Served from memory; readings written by other workers appear within
+    LATEST_READINGS_REFRESH_SECONDS. Supports the same formats as
+    GET /readings/.
+    """
+    await latest_readings.ensure_loaded(db)
+    if fmt in (None, "rows"):
+        # Pre-encoded entries, so skip response_model validation
+        return encoded_response(request, latest_readings.to_json(location), JSON)
+    entries = latest_readings.get(location)
+    names = list(entries[0]) if entries else list(PowerReading.model_fields)
+    return list_response(request, names, [tuple(entry.values()) for entry in entries], fmt)
 
 @router.get("/readings/{reading_id}", response_model=PowerReading)
 async def get_power_reading(
@@ -39,4 +185,87 @@ async def get_power_reading(
     reading = await monitoring_service.get_reading(reading_id)
     if reading is None:
         raise HTTPException(status_code=404, detail="Reading not found")
-    return reading
\ No newline at end of file
+    return reading
+
+@router.websocket("/ws/readings")
+async def stream_power_readings(
+    websocket: WebSocket,
+    token: Optional[str] = None
+):
+    """Stream newline-delimited readings; each frame is acknowledged once written"""
+    # Authenticate once for the lifetime of the connection
+    token = token or websocket.headers.get("Authorization", "").replace("Bearer ", "")
+    try:
+        await require_operator(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    pending_acks = set()
+    seq = 0
+    try:
+        while True:
+            frame = await websocket.receive_text()
+            seq += 1
+
+            futures = []
+            rejected = []
+            throttled = False
+            for line_no, line in enumerate(frame.splitlines()):
+                if not line.strip():
+                    continue
+                try:
+                    reading = PowerReadingCreate.model_validate_json(line)
+                except ValidationError as e:
+                    rejected.append({
+                        "line": line_no,
+                        "errors": e.errors(include_url=False, include_context=False)
+                    })
+                    continue
+
+                future = ingest_writer.try_submit(reading)
+                if future is None:
+                    # Queue is full: tell the client, then stop reading its
+                    # frames until the writer has made room
+                    if not throttled:
+                        await websocket.send_json({"seq": seq, "status": "throttled"})
+                        throttled = True
+                    future = await ingest_writer.submit(reading)
+                futures.append(future)
+
+            ack = asyncio.create_task(_acknowledge_frame(websocket, seq, futures, rejected))
+            pending_acks.add(ack)
+            ack.add_done_callback(pending_acks.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Queued readings are still written; only the acks are dropped
+        for ack in pending_acks:
+            ack.cancel()
+
+async def _acknowledge_frame(
+    websocket: WebSocket,
+    seq: int,
+    futures: List[asyncio.Future],
+    rejected: List[dict]
+):
+    """Send the ack for a frame once all of its readings are committed"""
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    items = [r for r in results if not isinstance(r, Exception)]
+
+    message = {
+        "seq": seq,
+        "status": "error" if failed else "ok",
+        "accepted": len(items),
+        "anomalies": sum(1 for item in items if item.is_anomaly),
+        "ids": [item.id for item in items],
+        "rejected": rejected
+    }
+    if failed:
+        message["detail"] = f"{len(failed)} readings could not be written"
+    try:
+        await websocket.send_json(message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
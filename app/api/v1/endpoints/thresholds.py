@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.db import get_db, UserRole
+from app.models import ThresholdProfileCreate, ThresholdProfileUpdate, ThresholdProfile, ThresholdCacheStats
+from app.services import ThresholdProfileService
+from app.services.thresholds import threshold_cache
+from app.api import require_admin, require_viewer
+
+router = APIRouter(tags=["thresholds"])
+
+@router.get("/thresholds/", response_model=List[ThresholdProfile])
+async def get_threshold_profiles(
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Get all threshold profiles"""
+    threshold_service = ThresholdProfileService(db)
+    return await threshold_service.get_profiles()
+
+@router.post("/thresholds/", response_model=ThresholdProfile)
+async def create_threshold_profile(
+    profile: ThresholdProfileCreate,
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_admin)
+):
+    """Create a threshold profile for an equipment id or location pattern"""
+    threshold_service = ThresholdProfileService(db)
+    try:
+        return await threshold_service.create_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/thresholds/{profile_id}", response_model=ThresholdProfile)
+async def update_threshold_profile(
+    profile_id: int,
+    update: ThresholdProfileUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_admin)
+):
+    """Update a threshold profile"""
+    threshold_service = ThresholdProfileService(db)
+    try:
+        profile = await threshold_service.update_profile(profile_id, update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Threshold profile not found")
+    return profile
+
+@router.delete("/thresholds/{profile_id}")
+async def delete_threshold_profile(
+    profile_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_role: UserRole = Depends(require_admin)
+):
+    """Delete a threshold profile"""
+    threshold_service = ThresholdProfileService(db)
+    if not await threshold_service.delete_profile(profile_id):
+        raise HTTPException(status_code=404, detail="Threshold profile not found")
+    return {"message": "Threshold profile deleted successfully"}
+
+@router.get("/thresholds/cache", response_model=ThresholdCacheStats)
+async def get_threshold_cache_stats(
+    current_role: UserRole = Depends(require_viewer)
+):
+    """Get compiled rule cache statistics (hits, misses, reloads)"""
+    return threshold_cache.stats()
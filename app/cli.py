@@ -0,0 +1,89 @@
+"""Administrative commands.
+
+Usage:
+    python -m app.cli rebuild-rollups --start 2024-01-01 [--end 2024-02-01] [--resolution 1h]
+    python -m app.cli export-archive --output exports/2024-06 [--start 2024-06-01] [--end 2024-07-01] [--format arrow]
+    python -m app.cli maintain-partitions [--ahead 7] [--retention-days 90] [--archive]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.db.session import AsyncSessionLocal, engine
+from app.services.export import EXPORT_FORMATS, EXPORT_TABLES, ArchiveExporter
+from app.services.partitions import PartitionManager, partition_maintenance_lock
+from app.services.rollup import ROLLUP_TABLES, RollupService, truncate_timestamp
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+async def rebuild_rollups(args: argparse.Namespace):
+    end = args.end or truncate_timestamp(datetime.now(timezone.utc), "day")
+    async with AsyncSessionLocal() as db:
+        written = await RollupService(db).rebuild(args.start, end, args.resolution)
+    for resolution, count in written.items():
+        print(f"{resolution}: {count} rollup rows written")
+
+async def maintain_partitions(args: argparse.Namespace):
+    async with partition_maintenance_lock() as acquired:
+        if not acquired:
+            raise SystemExit("Partitions are being maintained by another process, try again later")
+        async with AsyncSessionLocal() as db:
+            manager = PartitionManager(db, args.interval)
+            created = await manager.ensure_partitions(args.ahead)
+            retired = await manager.apply_retention(args.retention_days, args.archive or None)
+    print(f"created: {', '.join(created) or 'none'}")
+    print(f"expired: {', '.join(retired) or 'none'}")
+
+async def export_archive(args: argparse.Namespace):
+    async with AsyncSessionLocal() as db:
+        exporter = ArchiveExporter(db, args.output, args.format, args.chunk_size)
+        manifest = await exporter.export(args.start, args.end, args.equipment_id, args.table)
+    for table, stats in manifest.tables.items():
+        print(f"{table}: {stats.rows} rows in {stats.files} files")
+    print(f"written to {manifest.path}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="OT Security Monitor administration")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rebuild-rollups", help="Rebuild reading rollups from raw history")
+    rollups.add_argument("--start", type=_parse_datetime, required=True, help="ISO date/time (UTC if no offset)")
+    rollups.add_argument("--end", type=_parse_datetime, help="Defaults to the start of today (UTC)")
+    rollups.add_argument("--resolution", action="append", choices=list(ROLLUP_TABLES), help="Repeatable; defaults to all")
+    rollups.set_defaults(handler=rebuild_rollups)
+
+    export = commands.add_parser("export-archive", help="Export readings and alerts to partitioned Parquet/Arrow files")
+    export.add_argument("--output", required=True, help="Directory to write into")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    export.add_argument("--start", type=_parse_datetime, help="ISO date/time (UTC if no offset)")
+    export.add_argument("--end", type=_parse_datetime, help="ISO date/time (UTC if no offset), exclusive")
+    export.add_argument("--equipment-id", action="append", help="Repeatable; defaults to all equipment")
+    export.add_argument("--table", action="append", choices=list(EXPORT_TABLES), help="Repeatable; defaults to all")
+    export.add_argument("--chunk-size", type=int, help="Rows per fetch; defaults to EXPORT_CHUNK_SIZE")
+    export.set_defaults(handler=export_archive)
+
+    partitions = commands.add_parser("maintain-partitions", help="Create upcoming reading partitions and apply retention")
+    partitions.add_argument("--interval", choices=["day", "month"], help="Defaults to PARTITION_INTERVAL")
+    partitions.add_argument("--ahead", type=int, help="Future partitions to create; defaults to PARTITION_PREMAKE")
+    partitions.add_argument("--retention-days", type=int, help="Defaults to READINGS_RETENTION_DAYS (0 keeps everything)")
+    partitions.add_argument("--archive", action="store_true", help="Move expired partitions to the archive schema instead of dropping them")
+    partitions.set_defaults(handler=maintain_partitions)
+
+    return parser
+
+async def _run(args: argparse.Namespace):
+    try:
+        await args.handler(args)
+    finally:
+        await engine.dispose()
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    main()
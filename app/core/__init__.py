@@ -1,2 +1,2 @@
 from .config import get_settings
-from .security import verify_password, get_password_hash, create_access_token, get_current_user_role
\ No newline at end of file
+from .security import verify_password, get_password_hash, verify_password_async, get_password_hash_async, create_access_token, decode_access_token, get_current_user_role
\ No newline at end of file
@@ -14,6 +14,15 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str
     POSTGRES_DB: str
 
+    # Engine and Connection Pool Settings (per worker process)
+    DB_POOL_SIZE: int = 10  # connections kept open
+    DB_MAX_OVERFLOW: int = 20  # extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True  # check connections on checkout
+    DB_STATEMENT_CACHE_SIZE: int = 100  # prepared statements cached per connection, 0 for pgbouncer
+    DB_ECHO: bool = False  # log every SQL statement
+
     # Calculated Database URL
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -23,11 +32,80 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = 'HS256'
+    PASSWORD_HASH_WORKERS: int = 2  # threads running bcrypt; bounds CPU taken by concurrent logins
+    TOKEN_CACHE_SIZE: int = 10000  # verified tokens kept in memory, 0 disables the cache
+    TOKEN_CACHE_TTL_SECONDS: int = 300  # upper bound on how long a verified token is trusted without re-decoding
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 15  # how soon a logout through another worker is enforced here
+    
+    # Session Cache Settings
+    SESSION_CACHE_SIZE: int = 10000  # active sessions held in memory per worker
+    SESSION_CACHE_TTL_SECONDS: int = 60  # max age of a cached session before it is re-read
+    SESSION_ACTIVITY_FLUSH_SECONDS: int = 30  # interval between batched last_activity writes
     
     # Monitoring Settings
-    POWER_READING_INTERVAL: int = 60  # seconds
+    POWER_READING_INTERVAL: int = 60  # seconds between device polls unless a device sets its own
     ALERT_THRESHOLD_VOLTAGE: float = 230.0  # volts
     ALERT_THRESHOLD_CURRENT: float = 100.0  # amperes
+    MAX_READINGS_BATCH_SIZE: int = 5000  # readings per POST /readings/batch
+    AGGREGATE_MAX_BUCKETS: int = 100000  # time buckets per equipment in one aggregate query
+    AGGREGATE_CHUNK_SIZE: int = 5000  # rows per streamed aggregate chunk
+    ROLLUPS_ENABLED: bool = True  # maintain 1m/1h/1d rollup tables at ingest
+    LATEST_READINGS_REFRESH_SECONDS: int = 30  # merges other workers' readings into GET /equipment/latest, 0 disables
+    THRESHOLD_RELOAD_SECONDS: int = 30  # picks up threshold profiles changed through other workers, 0 disables
+    WIRE_MAX_BODY_BYTES: int = 64 * 1024 * 1024  # decompressed size limit of gzip/zstd request bodies
+    WIRE_COMPRESS_MIN_BYTES: int = 1024  # smaller list responses are sent uncompressed
+
+    # Storage Settings (power_readings partitions)
+    PARTITION_INTERVAL: str = "day"  # "day" or "month"
+    PARTITION_PREMAKE: int = 7  # future partitions kept ready
+    READINGS_RETENTION_DAYS: int = 0  # 0 keeps readings forever
+    READINGS_RETENTION_ARCHIVE: bool = False  # move expired partitions to the archive schema instead of dropping
+
+    # Maintenance Settings (background jobs started with the app)
+    MAINTENANCE_ENABLED: bool = True
+    SESSION_CLEANUP_INTERVAL_SECONDS: int = 3600
+    SESSION_CLEANUP_BATCH_SIZE: int = 1000  # sessions deleted per transaction
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    ALERT_SUMMARY_RECONCILE_SECONDS: int = 60  # bounds drift from other workers' alert writes
+
+    # Archive Export Settings
+    EXPORT_DIR: str = "exports"  # server-side root for admin exports
+    EXPORT_CHUNK_SIZE: int = 50000  # rows fetched and written per batch
+    EXPORT_MAX_RUNNING: int = 1  # background exports streaming at once per worker, the rest queue
+    EXPORT_JOB_HISTORY: int = 100  # export jobs remembered per worker for status requests
+
+    # Alert Deduplication Settings
+    ALERT_DEDUP_WINDOW_SECONDS: int = 300  # repeats closer than this update the open alert, 0 disables
+    ALERT_DEDUP_MAX_INCIDENTS: int = 100000  # open incidents tracked in memory
+
+    # Streaming Detector Settings (per-equipment state in each worker)
+    STREAM_WINDOW_SIZE: int = 0  # readings in each meter's rolling baseline (e.g. 60), 0 disables the detectors
+    STREAM_MIN_SAMPLES: int = 20  # readings buffered before the z-score rule applies
+    STREAM_ZSCORE_THRESHOLD: float = 4.0  # standard deviations from the rolling mean
+    STREAM_MAX_STEP_PCT: float = 3.0  # % of nominal voltage or current limit between consecutive readings
+    STREAM_SUSTAINED_FRACTION: float = 0.5  # share of the voltage tolerance that counts as a soft violation
+    STREAM_SUSTAINED_SECONDS: int = 600  # time a meter must stay outside the soft band before alerting
+    STREAM_MAX_METERS: int = 100000  # meters tracked in memory
+    STREAM_STATE_MAX_AGE_SECONDS: int = 3600  # silent meters older than this restart their baseline
+    STREAM_SNAPSHOT_INTERVAL_SECONDS: int = 60
+
+    # Streaming Ingest Settings
+    INGEST_QUEUE_SIZE: int = 10000  # readings buffered before clients are throttled
+    INGEST_BATCH_SIZE: int = 500  # readings per database write
+    INGEST_FLUSH_INTERVAL_MS: int = 200  # max time a reading waits for its batch
+
+    # Device Poller Settings (Modbus TCP, readings go through the ingest writer)
+    POLLER_ENABLED: bool = True  # False keeps this process from ever polling
+    POLLER_DEVICES_FILE: str = ""  # JSON array of devices to poll, empty disables the poller
+    POLLER_LEADER_RETRY_SECONDS: int = 15  # one worker polls, holding an advisory lock; the others retry this often
+    POLLER_TIMEOUT_SECONDS: float = 2.0  # per request, including connecting
+    POLLER_MAX_BACKOFF_SECONDS: int = 300  # cap on the retry delay of a failing device
+
+    # Alert Stream Settings
+    ALERT_STREAM_HISTORY_SIZE: int = 1000  # recent alerts kept for resuming clients
+    ALERT_STREAM_QUEUE_SIZE: int = 256  # per-subscriber buffer before oldest alerts are dropped
+    ALERT_STREAM_HEARTBEAT_SECONDS: int = 15
+    ALERT_STREAM_RESUME_LIMIT: int = 1000  # max alerts replayed from the database on resume
     
     class Config:
         env_file = ".env"
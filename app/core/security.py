@@ -1,13 +1,23 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import get_settings
+from app.core.token_cache import token_cache, token_revocations
 from app.db.models import UserRole
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so hashing in a few threads keeps the event
+# loop responsive while capping the cores a burst of logins can take
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -16,6 +26,16 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
 def create_access_token(
     data: dict, 
     expires_delta: Optional[timedelta] = None
@@ -35,18 +55,35 @@ def create_access_token(
     )
     return encoded_jwt
 
-async def get_current_user_role(token: str) -> UserRole:
-    """Get user role from JWT token"""
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify a JWT and return its claims, or None if it is invalid.
+
+    Verified claims are cached until the token expires, so repeated
+    requests with the same token skip signature verification. Tokens of
+    ended sessions are rejected before the cache is consulted.
+    """
+    if token_revocations.is_revoked(token):
+        return None
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(
             token, 
             settings.SECRET_KEY, 
             algorithms=[settings.ALGORITHM]
         )
-        print('payload ', payload)
-        role = payload.get("role")
-        if role is None:
-            return UserRole.VIEWER
-        return UserRole(role)
     except JWTError:
-        return UserRole.VIEWER
\ No newline at end of file
+        return None
+    token_cache.put(token, payload)
+    return payload
+
+async def get_current_user_role(token: str) -> UserRole:
+    """Get user role from JWT token"""
+    payload = decode_access_token(token)
+    if payload is None:
+        return UserRole.VIEWER
+    role = payload.get("role")
+    if role is None:
+        return UserRole.VIEWER
+    return UserRole(role)
\ No newline at end of file
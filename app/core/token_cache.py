@@ -0,0 +1,124 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from jose import JWTError, jwt
+from app.core.config import get_settings
+
+settings = get_settings()
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims, keyed by a SHA-256 of the token.
+
+    Entries expire at the token's own `exp` (capped by `ttl` seconds), so
+    a cached token is never accepted after it would have failed
+    verification. Raw tokens are never stored. Claims are shared between
+    hits and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self.key(token)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, token: str):
+        """Forget a token, e.g. when its session is revoked"""
+        self._entries.pop(self.key(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class TokenRevocations:
+    """Tokens of ended sessions, rejected until they would have expired anyway.
+
+    Checked before the token cache, so logging out takes effect at once in
+    this process. Other workers learn of revocations from the sessions
+    table (see SessionService.get_revoked_tokens). Like the token cache,
+    only SHA-256 digests of tokens are held.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[bytes, float] = {}
+
+    def revoke(self, token: str):
+        try:
+            expires_at = float(jwt.get_unverified_claims(token)["exp"])
+        except (JWTError, KeyError, TypeError, ValueError):
+            expires_at = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        if expires_at > time.time():
+            self._expiry[TokenCache.key(token)] = expires_at
+
+    def is_revoked(self, token: str) -> bool:
+        if not self._expiry:
+            return False
+        key = TokenCache.key(token)
+        expires_at = self._expiry.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            # The token no longer verifies, so its revocation can be forgotten
+            del self._expiry[key]
+            return False
+        return True
+
+    def prune(self) -> int:
+        """Forget revocations of tokens that have expired"""
+        now = time.time()
+        expired = [key for key, expires_at in self._expiry.items() if expires_at <= now]
+        for key in expired:
+            del self._expiry[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+token_revocations = TokenRevocations()
@@ -1,2 +1,3 @@
 from .session import get_db
-from .models import Alert, AlertSeverity, PowerReading, UserRole, User, Session
\ No newline at end of file
+from .models import Alert, AlertSeverity, Equipment, Location, PowerReading, UserRole, User, Session, ThresholdProfile, DetectorState, ReadingRollupMinute, ReadingRollupHour, ReadingRollupDay
+from .hooks import after_commit
\ No newline at end of file
@@ -0,0 +1,29 @@
+import logging
+from typing import Callable
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+
+logger = logging.getLogger(__name__)
+
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]):
+    """Run callback once the session's current transaction commits.
+
+    Callbacks are discarded if the transaction rolls back, so in-memory
+    state (push hubs, counters, caches) only ever reflects committed rows.
+    """
+    session.sync_session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+@event.listens_for(OrmSession, "after_commit")
+def _run_after_commit(session: OrmSession):
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, ()):
+        try:
+            callback()
+        except Exception:
+            logger.exception("after_commit callback failed")
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_after_commit(session: OrmSession):
+    session.info.pop(_AFTER_COMMIT_KEY, None)
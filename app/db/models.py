@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLAlchemyEnum, Boolean
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLAlchemyEnum, Boolean, Index
 import enum
-from sqlalchemy.orm import relationship, DeclarativeBase
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, DeclarativeBase, foreign
 from sqlalchemy.sql import func
 import enum
 from datetime import datetime
@@ -14,11 +15,28 @@ class AlertSeverity(str, enum.Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+class Equipment(Base):
+    """Registry of metered equipment; readings reference it by a compact integer key"""
+    __tablename__ = "equipment"
+
+    id = Column(Integer, primary_key=True)
+    equipment_id = Column(String, unique=True, nullable=False)  # external identifier used by the API
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Location(Base):
+    """Registry of reporting locations; each reading keeps the key of the one it came from"""
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class PowerReading(Base):
     __tablename__ = "power_readings"
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Range-partitioned on timestamp, so the partition key is part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), index=True)
     
     # Power Measurements
     voltage = Column(Float, nullable=False)
@@ -26,37 +44,139 @@ class PowerReading(Base):
     frequency = Column(Float, nullable=False)
     power_factor = Column(Float)
     
-    # Equipment Identifier
-    equipment_id = Column(String, nullable=False, index=True)
-    location = Column(String, nullable=False)
+    # Equipment and location, interned in the registry
+    equipment_key = Column(Integer, ForeignKey("equipment.id"), nullable=False)
+    equipment = relationship("Equipment", lazy="joined", innerjoin=True)
+    location_key = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    reporting_location = relationship("Location", lazy="joined", innerjoin=True)
     
     # Status
     is_anomaly = Column(Boolean, default=False)
     
     # Relationships
-    alerts = relationship("Alert", back_populates="power_reading")
+    alerts = relationship(
+        "Alert",
+        back_populates="power_reading",
+        primaryjoin="PowerReading.id == foreign(Alert.power_reading_id)"
+    )
+
+    @property
+    def equipment_id(self) -> str:
+        return self.equipment.equipment_id
+
+    @property
+    def location(self) -> str:
+        return self.reporting_location.name
+
+    __table_args__ = (
+        # Backs equipment filters and keyset pagination on (timestamp, id)
+        Index("ix_power_readings_equipment_timestamp_id", "equipment_key", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
 class Alert(Base):
     __tablename__ = "alerts"
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     # Alert Details
     severity = Column(SQLAlchemyEnum(AlertSeverity), nullable=False)
     message = Column(String, nullable=False)
     description = Column(String)
     
-    # Related Reading
-    power_reading_id = Column(Integer, ForeignKey("power_readings.id"))
-    power_reading = relationship("PowerReading", back_populates="alerts")
+    # Related Reading. No foreign key: readings live in partitions that
+    # retention drops, so the equipment is copied onto the alert.
+    power_reading_id = Column(Integer)
+    power_reading = relationship(
+        "PowerReading",
+        back_populates="alerts",
+        primaryjoin="foreign(Alert.power_reading_id) == PowerReading.id"
+    )
+    equipment_id = Column(String, index=True)
+
+    # Deduplication: repeats of the same incident update the open alert
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen = Column(DateTime(timezone=True), server_default=func.now())
     
     # Status
     is_acknowledged = Column(Boolean, default=False)
     acknowledged_by = Column(String)
     acknowledged_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_alerts_timestamp_id", "timestamp", "id"),
+    )
     
 
+class ThresholdProfile(Base):
+    __tablename__ = "threshold_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+
+    # Matching: an exact equipment_id wins over a location pattern
+    equipment_id = Column(String, unique=True, nullable=True)
+    location_pattern = Column(String, nullable=True)  # fnmatch-style, e.g. "Substation-4/*"
+    priority = Column(Integer, default=0)  # Higher wins among matching patterns
+
+    # Thresholds
+    voltage_nominal = Column(Float, nullable=False)
+    voltage_tolerance = Column(Float, nullable=False, default=10.0)
+    current_limit = Column(Float, nullable=False)
+    frequency_min = Column(Float, nullable=False, default=45.0)
+    frequency_max = Column(Float, nullable=False, default=65.0)
+    power_factor_min = Column(Float)
+
+    # Status
+    is_active = Column(Boolean, default=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DetectorState(Base):
+    """Snapshot of an equipment's streaming detector state (rolling windows, counters)"""
+    __tablename__ = "detector_states"
+
+    equipment_id = Column(String, primary_key=True)
+    state = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class ReadingRollupMixin:
+    """Per-equipment aggregates of readings over a fixed time bucket.
+
+    Sums and sums of squares are kept instead of averages so rows can be
+    merged incrementally; mean and stddev are derived when reading.
+    Rows are keyed by the equipment registry key, like the readings.
+    """
+    equipment_key = Column(Integer, ForeignKey("equipment.id"), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    anomaly_count = Column(Integer, nullable=False, default=0)
+
+    voltage_sum = Column(Float, nullable=False, default=0.0)
+    voltage_sumsq = Column(Float, nullable=False, default=0.0)
+    voltage_min = Column(Float)
+    voltage_max = Column(Float)
+
+    current_sum = Column(Float, nullable=False, default=0.0)
+    current_sumsq = Column(Float, nullable=False, default=0.0)
+    current_min = Column(Float)
+    current_max = Column(Float)
+
+    frequency_sum = Column(Float, nullable=False, default=0.0)
+    frequency_sumsq = Column(Float, nullable=False, default=0.0)
+    frequency_min = Column(Float)
+    frequency_max = Column(Float)
+
+class ReadingRollupMinute(ReadingRollupMixin, Base):
+    __tablename__ = "reading_rollups_1m"
+
+class ReadingRollupHour(ReadingRollupMixin, Base):
+    __tablename__ = "reading_rollups_1h"
+
+class ReadingRollupDay(ReadingRollupMixin, Base):
+    __tablename__ = "reading_rollups_1d"
+
 
 # Add this to your existing models.py
 class UserRole(str, enum.Enum):
@@ -78,6 +198,9 @@ class User(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    sessions = relationship("Session", back_populates="user")
     
 
 
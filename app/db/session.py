@@ -1,20 +1,32 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
+from app.db.pool import InstrumentedAsyncQueuePool
 from typing import AsyncGenerator
 
 settings = get_settings()
 
-try:
-# Create async engine
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=True,  # Set to False in production
-        future=True
+def make_engine(**overrides) -> AsyncEngine:
+    """Create the async engine from the DB_* settings; keyword arguments override them"""
+    options = dict(
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # SQLAlchemy's prepared statement cache and asyncpg's own one;
+            # both must be 0 behind pgbouncer in transaction mode
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
     )
-    print("Connected to the database successfully!")
-except Exception as e:
-    print(f"Error: {e}")
+    options.update(overrides)
+    return create_async_engine(settings.SQLALCHEMY_DATABASE_URI, **options)
+
+engine = make_engine()
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -31,4 +43,4 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.commit()
         except Exception:
             await session.rollback()
-            raise
\ No newline at end of file
+            raise
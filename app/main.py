@@ -1,10 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import get_settings
+from app.db.session import engine
+from app.services.export import export_jobs
+from app.services.ingest import ingest_writer
+from app.services.latest import latest_readings
+from app.services.maintenance import maintenance_scheduler
+from app.services.poller import device_poller
+from app.services.session_store import session_store
+
+settings = get_settings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers and flush them on shutdown"""
+    await latest_readings.warm()
+    ingest_writer.start()
+    if settings.POLLER_ENABLED:
+        device_poller.start()
+    session_store.start()
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_scheduler.start()
+    yield
+    await maintenance_scheduler.stop()
+    # Stop polling before the writer flushes the readings still queued
+    await device_poller.stop()
+    await ingest_writer.stop()
+    await session_store.stop()
+    await export_jobs.stop()
+    # Persist detector state so baselines survive the restart
+    if "snapshot_stream_detectors" in maintenance_scheduler.jobs:
+        await maintenance_scheduler.run_job("snapshot_stream_detectors")
 
 app = FastAPI(
     title="OT Security Monitoring System",
     description="API for monitoring power systems security",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -14,9 +47,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/health")
 async def health_check():
     print("Basic health check endpoint")
-    return {"status": "healthy", "service": "ot-security-monitor"}
\ No newline at end of file
+    return {"status": "healthy", "service": "ot-security-monitor"}
+
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Connection pool usage and checkout wait times for this worker"""
+    return engine.pool.stats()
+
+@app.get("/health/maintenance")
+async def maintenance_health():
+    """Last run of each of this worker's maintenance jobs"""
+    return {
+        "running": maintenance_scheduler.is_running,
+        "jobs": maintenance_scheduler.status()
+    }
+
+@app.get("/health/poller")
+async def poller_health():
+    """Per-device polling state of this worker's Modbus poller"""
+    return {
+        "running": device_poller.is_running,
+        "leader": device_poller.is_leader,
+        "write_failures": device_poller.write_failures,
+        "devices": device_poller.status()
+    }
@@ -1 +1 @@
-from .schemas import PowerReadingCreate, PowerReading, PowerReadingBase, User, UserCreate, Token, PasswordChange, PasswordReset, SessionInfo
\ No newline at end of file
+from .schemas import PowerReadingCreate, PowerReading, PowerReadingBase, PowerReadingBatchItem, PowerReadingBatchResult, ArchiveExportRequest, ArchiveExportTable, ArchiveExportJob, Alert, AlertCreate, AlertBulkAcknowledge, AlertBulkAcknowledgeResult, User, UserCreate, Token, PasswordChange, PasswordReset, SessionInfo, ThresholdProfileCreate, ThresholdProfileUpdate, ThresholdProfile, ThresholdCacheStats, RegisterPoint, PollDevice
\ No newline at end of file
@@ -1,5 +1,8 @@
-from .power_reading import PowerReading, PowerReadingBase, PowerReadingCreate
-from .alert import Alert
+from .power_reading import PowerReading, PowerReadingBase, PowerReadingCreate, PowerReadingBatchItem, PowerReadingBatchResult
+from .export import ArchiveExportRequest, ArchiveExportTable, ArchiveExportJob
+from .alert import Alert, AlertCreate, AlertBulkAcknowledge, AlertBulkAcknowledgeResult
 from .user import UserCreate, User, Token, PasswordChange, PasswordReset
 from .session import SessionInfo
+from .threshold import ThresholdProfileCreate, ThresholdProfileUpdate, ThresholdProfile, ThresholdCacheStats
+from .poller import RegisterPoint, PollDevice
 # from .user import UserRole
\ No newline at end of file
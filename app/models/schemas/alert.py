@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from app.db.models import AlertSeverity
 
 class AlertBase(BaseModel):
@@ -8,6 +8,7 @@ class AlertBase(BaseModel):
     message: str = Field(..., min_length=1)
     description: Optional[str] = None
     power_reading_id: int
+    equipment_id: Optional[str] = None
 
 class AlertCreate(AlertBase):
     pass
@@ -16,8 +17,32 @@ class Alert(AlertBase):
     id: int
     timestamp: datetime
     is_acknowledged: bool
+    occurrence_count: int = 1
+    last_seen: Optional[datetime] = None
     acknowledged_by: Optional[str] = None
     acknowledged_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AlertBulkAcknowledge(BaseModel):
+    """Alerts to acknowledge, either by id or by filter"""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    equipment_id: Optional[str] = None
+    severity: Optional[List[AlertSeverity]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        filters = (self.equipment_id, self.severity, self.start, self.end)
+        if self.ids is None and all(value is None for value in filters):
+            raise ValueError("Provide ids or at least one filter")
+        if self.start and self.end and self.start >= self.end:
+            raise ValueError("start must be before end")
+        return self
+
+class AlertBulkAcknowledgeResult(BaseModel):
+    acknowledged: List[int]
+    already_acknowledged: List[int] = []  # only reported when acknowledging by ids
+    not_found: List[int] = []
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class ArchiveExportRequest(BaseModel):
+    name: Optional[str] = Field(None, description="Directory under EXPORT_DIR; defaults to a UTC timestamp")
+    format: str = Field("parquet", description="parquet or arrow (Arrow IPC)")
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    equipment_ids: Optional[List[str]] = None
+    tables: Optional[List[str]] = Field(None, description="readings and/or alerts; defaults to both")
+
+class ArchiveExportTable(BaseModel):
+    files: int
+    rows: int
+
+    class Config:
+        from_attributes = True
+
+class ArchiveExportJob(BaseModel):
+    id: str = Field(..., description="The export name; poll GET /exports/{id} for progress")
+    status: str = Field(..., description="queued, running, completed or failed")
+    path: str
+    format: str
+    manifest_path: str = Field(..., description="manifest.json written into the export once it completes")
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    tables: Optional[Dict[str, ArchiveExportTable]] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
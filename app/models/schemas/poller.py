@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Literal, Optional
+
+# Registers occupied by each data type
+REGISTER_WIDTHS = {"uint16": 1, "int16": 1, "uint32": 2, "int32": 2, "float32": 2}
+
+# Registers one read request may return
+MAX_READ_REGISTERS = 125
+
+class RegisterPoint(BaseModel):
+    address: int = Field(..., description="Zero-based register address", ge=0, le=65535)
+    data_type: Literal["uint16", "int16", "uint32", "int32", "float32"] = "float32"
+    scale: float = Field(1.0, description="Multiplier applied to the raw value")
+
+    @property
+    def width(self) -> int:
+        return REGISTER_WIDTHS[self.data_type]
+
+class PollDevice(BaseModel):
+    equipment_id: str
+    location: str
+    host: str
+    port: int = Field(502, ge=1, le=65535)
+    unit_id: int = Field(1, ge=0, le=255)
+    register_type: Literal["holding", "input"] = "holding"
+    word_order: Literal["big", "little"] = Field("big", description="Order of the registers of 32-bit values")
+    interval: Optional[float] = Field(None, description="Seconds between polls; defaults to POWER_READING_INTERVAL", gt=0)
+    voltage: RegisterPoint
+    current: RegisterPoint
+    frequency: RegisterPoint
+    power_factor: Optional[RegisterPoint] = None
+
+    @property
+    def points(self) -> Dict[str, RegisterPoint]:
+        points = {"voltage": self.voltage, "current": self.current, "frequency": self.frequency}
+        if self.power_factor is not None:
+            points["power_factor"] = self.power_factor
+        return points
+
+    @property
+    def block(self) -> range:
+        """Register range covering every point, read in one request"""
+        points = self.points.values()
+        return range(
+            min(point.address for point in points),
+            max(point.address + point.width for point in points)
+        )
+
+    @model_validator(mode="after")
+    def check_block(self):
+        if len(self.block) > MAX_READ_REGISTERS:
+            raise ValueError(f"Registers must lie within {MAX_READ_REGISTERS} consecutive addresses")
+        return self
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class PowerReadingBase(BaseModel):
     voltage: float = Field(..., description="Voltage reading in volts", ge=0)
@@ -19,4 +19,16 @@ class PowerReading(PowerReadingBase):
     is_anomaly: bool
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PowerReadingBatchItem(BaseModel):
+    index: int = Field(..., description="Position of the reading in the submitted batch")
+    id: int
+    timestamp: datetime
+    is_anomaly: bool
+    alert_id: Optional[int] = None
+
+class PowerReadingBatchResult(BaseModel):
+    created: int
+    anomalies: int
+    results: List[PowerReadingBatchItem]
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime
+from typing import Optional
+
+class ThresholdProfileBase(BaseModel):
+    name: str = Field(..., min_length=1)
+    equipment_id: Optional[str] = Field(None, description="Exact equipment identifier this profile applies to")
+    location_pattern: Optional[str] = Field(None, description="fnmatch-style location pattern, e.g. 'Substation-4/*'")
+    priority: int = Field(0, description="Higher priority wins when several location patterns match")
+    voltage_nominal: float = Field(..., description="Nominal voltage in volts", gt=0)
+    voltage_tolerance: float = Field(10.0, description="Allowed deviation from nominal in volts", ge=0)
+    current_limit: float = Field(..., description="Maximum current in amperes", gt=0)
+    frequency_min: float = Field(45.0, description="Lower frequency bound in Hz", ge=0)
+    frequency_max: float = Field(65.0, description="Upper frequency bound in Hz", ge=0)
+    power_factor_min: Optional[float] = Field(None, description="Minimum power factor", ge=-1, le=1)
+    is_active: bool = True
+
+class ThresholdProfileCreate(ThresholdProfileBase):
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.equipment_id is None) == (self.location_pattern is None):
+            raise ValueError("Exactly one of equipment_id or location_pattern must be set")
+        if self.frequency_min > self.frequency_max:
+            raise ValueError("frequency_min must not exceed frequency_max")
+        return self
+
+class ThresholdProfileUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    priority: Optional[int] = None
+    voltage_nominal: Optional[float] = Field(None, gt=0)
+    voltage_tolerance: Optional[float] = Field(None, ge=0)
+    current_limit: Optional[float] = Field(None, gt=0)
+    frequency_min: Optional[float] = Field(None, ge=0)
+    frequency_max: Optional[float] = Field(None, ge=0)
+    power_factor_min: Optional[float] = Field(None, ge=-1, le=1)
+    is_active: Optional[bool] = None
+
+    @field_validator(
+        "name", "priority", "voltage_nominal", "voltage_tolerance", "current_limit",
+        "frequency_min", "frequency_max", "is_active",
+        mode="before"
+    )
+    @classmethod
+    def check_not_null(cls, value):
+        # Fields may be omitted but not cleared; only power_factor_min is optional
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class ThresholdProfile(ThresholdProfileBase):
+    id: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ThresholdCacheStats(BaseModel):
+    loaded: bool
+    profiles: int
+    compiled_rules: int
+    hits: int
+    misses: int
+    loads: int
+    invalidations: int
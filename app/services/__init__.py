@@ -1,4 +1,6 @@
 from .monitoring import MonitoringService
 from .alert import AlertService
 from .auth import AuthService
-from .session import SessionService
\ No newline at end of file
+from .session import SessionService
+from .thresholds import ThresholdProfileService
+from .rollup import RollupService
\ No newline at end of file
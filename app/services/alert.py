@@ -1,8 +1,28 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func, tuple_, lambda_stmt, Row
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from datetime import datetime
-from typing import List, Optional, Dict
-from app.db import Alert as AlertModel, AlertSeverity
+from typing import List, Optional, Dict, Tuple
+from app.db import Alert as AlertModel, AlertSeverity, after_commit
+from app.core.pagination import decode_cursor
+from app.services.alert_counters import alert_counters
+from app.services.alert_dedup import alert_deduplicator
+
+# Alert schema fields, selected as plain columns for the fast list path
+_ALERT_COLUMNS = (
+    AlertModel.severity,
+    AlertModel.message,
+    AlertModel.description,
+    AlertModel.power_reading_id,
+    AlertModel.equipment_id,
+    AlertModel.id,
+    AlertModel.timestamp,
+    func.coalesce(AlertModel.is_acknowledged, False).label("is_acknowledged"),
+    AlertModel.occurrence_count,
+    AlertModel.last_seen,
+    AlertModel.acknowledged_by,
+    AlertModel.acknowledged_at
+)
 
 class AlertService:
     def __init__(self, db: AsyncSession):
@@ -13,68 +33,171 @@ class AlertService:
         skip: int = 0,
         limit: int = 100,
         equipment_id: Optional[str] = None,
-        is_acknowledged: Optional[bool] = None
+        is_acknowledged: Optional[bool] = None,
+        cursor: Optional[str] = None
     ) -> List[AlertModel]:
-        """Get filtered list of alerts"""
-        query = select(AlertModel)
+        """Get filtered list of alerts.
+
+        With a cursor the page starts after that (timestamp, id) position
+        and skip is ignored.
+        """
+        query = self._alerts_page(
+            lambda_stmt(lambda: select(AlertModel)), skip, limit, equipment_id, is_acknowledged, cursor
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_alert_rows(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        equipment_id: Optional[str] = None,
+        is_acknowledged: Optional[bool] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], List[Row]]:
+        """Get the same page as get_alerts as column names and plain Core rows"""
+        query = self._alerts_page(
+            lambda_stmt(lambda: select(*_ALERT_COLUMNS)), skip, limit, equipment_id, is_acknowledged, cursor
+        )
+        result = await self.db.execute(query)
+        return list(result.keys()), result.all()
 
-        # Apply filters if provided
+    @staticmethod
+    def _alerts_page(
+        query: StatementLambdaElement,
+        skip: int,
+        limit: int,
+        equipment_id: Optional[str],
+        is_acknowledged: Optional[bool],
+        cursor: Optional[str]
+    ) -> StatementLambdaElement:
+        # Each filter combination compiles once; values become bind params
         if equipment_id:
-            query = query.join(AlertModel.power_reading).filter(
-                AlertModel.power_reading.has(equipment_id=equipment_id)
-            )
+            query += lambda s: s.filter(AlertModel.equipment_id == equipment_id)
         if is_acknowledged is not None:
-            query = query.filter(AlertModel.is_acknowledged == is_acknowledged)
+            query += lambda s: s.filter(AlertModel.is_acknowledged == is_acknowledged)
+
+        if cursor:
+            timestamp, alert_id = decode_cursor(cursor)
+            query += lambda s: s.filter(
+                tuple_(AlertModel.timestamp, AlertModel.id) < tuple_(timestamp, alert_id)
+            )
+        else:
+            query += lambda s: s.offset(skip)
+
+        # Order by timestamp descending (newest first), id breaks ties
+        query += lambda s: s.order_by(AlertModel.timestamp.desc(), AlertModel.id.desc()).limit(limit)
+        return query
 
-        # Order by timestamp descending (newest first)
-        query = query.order_by(AlertModel.timestamp.desc())
-        query = query.offset(skip).limit(limit)
+    async def get_alert_events_after(
+        self,
+        last_alert_id: int,
+        severities: Optional[List[AlertSeverity]] = None,
+        equipment_ids: Optional[List[str]] = None,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """Get alerts newer than last_alert_id in push-event form, oldest first"""
+        query = select(AlertModel).where(AlertModel.id > last_alert_id)
+
+        if severities:
+            query = query.where(AlertModel.severity.in_(severities))
+        if equipment_ids:
+            query = query.where(AlertModel.equipment_id.in_(equipment_ids))
 
+        query = query.order_by(AlertModel.id).limit(limit)
         result = await self.db.execute(query)
-        return result.scalars().all()
+
+        return [
+            {
+                "id": alert.id,
+                "timestamp": alert.timestamp.isoformat(),
+                "severity": alert.severity.value,
+                "message": alert.message,
+                "description": alert.description,
+                "power_reading_id": alert.power_reading_id,
+                "equipment_id": alert.equipment_id,
+                "occurrence_count": alert.occurrence_count
+            }
+            for alert in result.scalars().all()
+        ]
 
     async def acknowledge_alert(self, alert_id: int, user_id: str):
         """Mark an alert as acknowledged"""
-        query = select(AlertModel).filter(AlertModel.id == alert_id)
-        result = await self.db.execute(query)
-        alert = result.scalar_one_or_none()
-
-        if not alert:
+        result = await self.acknowledge_alerts(user_id, ids=[alert_id])
+        if result["not_found"]:
             raise ValueError(f"Alert with id {alert_id} not found")
+        if result["already_acknowledged"]:
+            query = select(AlertModel.acknowledged_by).where(AlertModel.id == alert_id)
+            acknowledged_by = (await self.db.execute(query)).scalar_one_or_none()
+            raise ValueError(f"Alert already acknowledged by {acknowledged_by}")
 
-        if alert.is_acknowledged:
-            raise ValueError(f"Alert already acknowledged by {alert.acknowledged_by}")
-
-        alert.is_acknowledged = True
-        alert.acknowledged_by = user_id
-        alert.acknowledged_at = datetime.utcnow()
+    async def acknowledge_alerts(
+        self,
+        acknowledged_by: str,
+        ids: Optional[List[int]] = None,
+        equipment_id: Optional[str] = None,
+        severities: Optional[List[AlertSeverity]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, List[int]]:
+        """Acknowledge all matching unacknowledged alerts in one UPDATE.
 
-        await self.db.commit()
+        The is_acknowledged condition is evaluated under the row lock, so
+        an alert acknowledged concurrently is skipped rather than
+        re-attributed. When ids are given, the ones not updated are
+        reported as already acknowledged or not found.
+        """
+        conditions = [AlertModel.is_acknowledged.isnot(True)]
+        if ids is not None:
+            conditions.append(AlertModel.id.in_(ids))
+        if equipment_id:
+            conditions.append(AlertModel.equipment_id == equipment_id)
+        if severities:
+            conditions.append(AlertModel.severity.in_(severities))
+        if start:
+            conditions.append(AlertModel.timestamp >= start)
+        if end:
+            conditions.append(AlertModel.timestamp < end)
 
-    async def get_summary(self) -> Dict:
-        """Get summary of alerts"""
-        # Count alerts by severity
-        severity_query = select(
+        query = update(AlertModel).where(*conditions).values(
+            is_acknowledged=True,
+            acknowledged_by=acknowledged_by,
+            acknowledged_at=func.now()
+        ).returning(
+            AlertModel.id,
             AlertModel.severity,
-            func.count(AlertModel.id)
-        ).group_by(AlertModel.severity)
+            AlertModel.equipment_id
+        ).execution_options(synchronize_session=False)
+        rows = (await self.db.execute(query)).all()
+        acknowledged = sorted(row.id for row in rows)
 
-        # Count unacknowledged alerts
-        unacknowledged_query = select(func.count(AlertModel.id)).filter(
-            AlertModel.is_acknowledged == False  # noqa: E712
-        )
+        already_acknowledged: List[int] = []
+        not_found: List[int] = []
+        if ids is not None:
+            remaining = set(ids).difference(acknowledged)
+            if remaining:
+                existing = await self.db.execute(select(AlertModel.id).where(AlertModel.id.in_(remaining)))
+                already_acknowledged = sorted(existing.scalars().all())
+                not_found = sorted(remaining.difference(already_acknowledged))
 
-        severity_result = await self.db.execute(severity_query)
-        unacknowledged_result = await self.db.execute(unacknowledged_query)
+        counted = [(row.severity, row.equipment_id) for row in rows]
+        after_commit(self.db, lambda: alert_counters.record_acknowledged(counted))
+        # Further anomalies after an acknowledgement open a new alert
+        after_commit(self.db, lambda: alert_deduplicator.close(acknowledged))
+        await self.db.commit()
 
-        severity_counts = {
-            severity.name: count 
-            for severity, count in severity_result.all()
+        return {
+            "acknowledged": acknowledged,
+            "already_acknowledged": already_acknowledged,
+            "not_found": not_found
         }
-        unacknowledged_count = unacknowledged_result.scalar()
 
-        return {
-            "total_alerts": sum(severity_counts.values()),
-            "by_severity": severity_counts,
-            "unacknowledged": unacknowledged_count
-        }
\ No newline at end of file
+    async def get_summary(self, equipment_id: Optional[str] = None) -> Dict:
+        """Get summary of alerts.
+
+        Served from in-memory counters kept up to date by alert writes
+        and reconciled with the database periodically, so the cost does
+        not grow with the alerts table.
+        """
+        await alert_counters.ensure_loaded(self.db)
+        return alert_counters.summary(equipment_id)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import Alert as AlertModel, AlertSeverity
+
+# (severity, equipment_id, is_acknowledged)
+CounterKey = Tuple[AlertSeverity, Optional[str], bool]
+
+def _bump(counter: Counter, key, delta: int):
+    counter[key] += delta
+    if counter[key] <= 0:
+        del counter[key]
+
+class AlertCounters:
+    """Alert counts by severity, equipment and acknowledged state, kept in memory.
+
+    Loaded once from the database, then adjusted by the writers in this
+    process after their transactions commit. reconcile() reloads from the
+    database to correct drift from other workers or direct SQL. Changes
+    committed while a reload is in flight are replayed on top of it, so
+    at worst an alert committed during the reload's round trip is counted
+    twice until the next reconciliation.
+    """
+
+    def __init__(self):
+        self._counts: Optional[Counter] = None
+        # Derived views so a summary touches at most 8 (severity, acknowledged) entries
+        self._totals: Counter = Counter()
+        self._by_equipment: Dict[Optional[str], Counter] = {}
+        self._replay: Optional[List[Tuple[CounterKey, int]]] = None
+        # One reload at a time; each owns the replay log while it runs
+        self._lock = asyncio.Lock()
+        self.reconciliations = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._counts is not None
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """Reload counts from the database; returns the absolute drift corrected"""
+        async with self._lock:
+            return await self._reload(db)
+
+    async def _reload(self, db: AsyncSession) -> int:
+        self._replay = []
+        try:
+            query = select(
+                AlertModel.severity,
+                AlertModel.equipment_id,
+                func.coalesce(AlertModel.is_acknowledged, False),
+                func.count()
+            ).group_by(AlertModel.severity, AlertModel.equipment_id, AlertModel.is_acknowledged)
+            result = await db.execute(query)
+            counts: Counter = Counter()
+            for severity, equipment_id, acknowledged, count in result.all():
+                counts[severity, equipment_id, acknowledged] += count
+            for key, delta in self._replay:
+                counts[key] += delta
+        finally:
+            self._replay = None
+
+        previous = self._counts or Counter()
+        drift = sum(abs(counts[key] - previous[key]) for key in set(counts) | set(previous))
+        totals: Counter = Counter()
+        by_equipment: Dict[Optional[str], Counter] = {}
+        for (severity, equipment_id, acknowledged), count in counts.items():
+            if count > 0:
+                totals[severity, acknowledged] += count
+                by_equipment.setdefault(equipment_id, Counter())[severity, acknowledged] += count
+
+        self._counts = +counts
+        self._totals = totals
+        self._by_equipment = by_equipment
+        self.reconciliations += 1
+        return drift if previous else 0
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self.is_loaded:
+            async with self._lock:
+                if not self.is_loaded:
+                    await self._reload(db)
+
+    def _apply(self, key: CounterKey, delta: int):
+        if self._replay is not None:
+            self._replay.append((key, delta))
+        if self._counts is not None:
+            severity, equipment_id, acknowledged = key
+            _bump(self._counts, key, delta)
+            _bump(self._totals, (severity, acknowledged), delta)
+            _bump(self._by_equipment.setdefault(equipment_id, Counter()), (severity, acknowledged), delta)
+
+    def record_created(self, alerts: Iterable[Tuple[AlertSeverity, Optional[str]]]):
+        """Count committed new alerts given as (severity, equipment_id)"""
+        for severity, equipment_id in alerts:
+            self._apply((severity, equipment_id, False), 1)
+
+    def record_acknowledged(self, alerts: Iterable[Tuple[AlertSeverity, Optional[str]]]):
+        """Move committed acknowledgements from unacknowledged to acknowledged"""
+        for severity, equipment_id in alerts:
+            self._apply((severity, equipment_id, False), -1)
+            self._apply((severity, equipment_id, True), 1)
+
+    def summary(self, equipment_id: Optional[str] = None) -> Dict:
+        """Totals by severity and unacknowledged count, optionally for one equipment"""
+        counts = self._totals if equipment_id is None else self._by_equipment.get(equipment_id, Counter())
+        by_severity: Dict[str, int] = {}
+        unacknowledged = 0
+        for (severity, acknowledged), count in counts.items():
+            by_severity[severity.name] = by_severity.get(severity.name, 0) + count
+            if not acknowledged:
+                unacknowledged += count
+        return {
+            "total_alerts": sum(by_severity.values()),
+            "by_severity": by_severity,
+            "unacknowledged": unacknowledged
+        }
+
+alert_counters = AlertCounters()
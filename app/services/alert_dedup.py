@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from app.db import AlertSeverity
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# (equipment_id, issue bits, severity)
+IncidentKey = Tuple[str, int, AlertSeverity]
+
+@dataclass
+class OpenIncident:
+    alert_id: int
+    last_seen: datetime
+
+class AlertDeduplicator:
+    """Tracks the open alert per incident so repeats can be coalesced into it.
+
+    An incident is an (equipment_id, issue bits, severity) combination. It
+    stays open while anomalies keep recurring less than ``window`` apart;
+    a higher severity is a different incident and raises a new alert.
+    State lives in the process, so after a restart the first repeat of an
+    ongoing incident opens a new alert.
+    """
+
+    def __init__(self, window_seconds: float, max_incidents: int):
+        self.window = timedelta(seconds=window_seconds)
+        self.max_incidents = max_incidents
+        # Least recently recorded first, so eviction pops from the front
+        self._open: "OrderedDict[IncidentKey, OpenIncident]" = OrderedDict()
+        self._keys_by_alert: Dict[int, IncidentKey] = {}
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > timedelta(0)
+
+    def match(self, key: IncidentKey, seen: datetime) -> Optional[int]:
+        """Id of the open alert for this incident, if the anomaly falls in its window"""
+        if not self.enabled:
+            return None
+        incident = self._open.get(key)
+        if incident is None or seen - incident.last_seen > self.window:
+            return None
+        return incident.alert_id
+
+    def record(self, key: IncidentKey, alert_id: int, last_seen: datetime, occurrences: int = 0):
+        """Remember a committed alert as the open one for its incident"""
+        if not self.enabled:
+            return
+        previous = self._open.get(key)
+        if previous is not None and previous.alert_id != alert_id:
+            self._keys_by_alert.pop(previous.alert_id, None)
+        self._open[key] = OpenIncident(alert_id, last_seen)
+        self._open.move_to_end(key)
+        self._keys_by_alert[alert_id] = key
+        self.coalesced += occurrences
+        while len(self._open) > self.max_incidents:
+            _, evicted = self._open.popitem(last=False)
+            self._keys_by_alert.pop(evicted.alert_id, None)
+
+    def close(self, alert_ids: Iterable[int]):
+        """Stop coalescing into these alerts, e.g. once acknowledged"""
+        for alert_id in alert_ids:
+            key = self._keys_by_alert.pop(alert_id, None)
+            if key is not None:
+                self._open.pop(key, None)
+
+alert_deduplicator = AlertDeduplicator(
+    window_seconds=settings.ALERT_DEDUP_WINDOW_SECONDS,
+    max_incidents=settings.ALERT_DEDUP_MAX_INCIDENTS
+)
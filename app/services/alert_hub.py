@@ -0,0 +1,114 @@
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Iterable, List, Optional, Set
+from app.core.config import get_settings
+
+settings = get_settings()
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """An alert as pushed to subscribers; the JSON payload is encoded once"""
+    id: int
+    severity: str
+    equipment_id: str
+    payload: str
+
+    @classmethod
+    def from_dict(cls, alert: dict) -> "AlertEvent":
+        return cls(
+            id=alert["id"],
+            severity=alert["severity"],
+            equipment_id=alert["equipment_id"],
+            payload=json.dumps(alert, default=str)
+        )
+
+class AlertSubscription:
+    """A subscriber's filtered, bounded queue of alert events.
+
+    Slow consumers never block publishers: when the queue is full the
+    oldest event is dropped and counted so the client can resync.
+    """
+
+    def __init__(
+        self,
+        severities: Optional[Iterable[str]],
+        equipment_ids: Optional[Iterable[str]],
+        max_queue: int
+    ):
+        self.severities: Optional[Set[str]] = set(severities) if severities else None
+        self.equipment_ids: Optional[Set[str]] = set(equipment_ids) if equipment_ids else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def matches(self, event: AlertEvent) -> bool:
+        if self.severities is not None and event.severity not in self.severities:
+            return False
+        if self.equipment_ids is not None and event.equipment_id not in self.equipment_ids:
+            return False
+        return True
+
+    def offer(self, event: AlertEvent):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> AlertEvent:
+        return await self.queue.get()
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+class AlertHub:
+    """In-process fan-out of newly committed alerts to live subscribers.
+
+    Only alerts committed by this process are published and kept in the
+    replay history; alerts raised by other workers never reach it.
+    """
+
+    def __init__(self, history_size: int, subscriber_queue_size: int):
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers: Set[AlertSubscription] = set()
+        self._history: Deque[AlertEvent] = deque(maxlen=history_size)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(
+        self,
+        severities: Optional[Iterable[str]] = None,
+        equipment_ids: Optional[Iterable[str]] = None
+    ) -> AlertSubscription:
+        subscription = AlertSubscription(severities, equipment_ids, self.subscriber_queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, alerts: List[dict]):
+        """Publish committed alerts to matching subscribers"""
+        for alert in alerts:
+            event = AlertEvent.from_dict(alert)
+            self._history.append(event)
+            for subscription in self._subscribers:
+                if subscription.matches(event):
+                    subscription.offer(event)
+
+    def replay(self, last_id: int, subscription: AlertSubscription) -> Optional[List[AlertEvent]]:
+        """Events after last_id from recent history, or None if history no longer reaches back that far"""
+        if not self._history or self._history[0].id > last_id + 1:
+            return None
+        return [
+            event for event in self._history
+            if event.id > last_id and subscription.matches(event)
+        ]
+
+alert_hub = AlertHub(
+    history_size=settings.ALERT_STREAM_HISTORY_SIZE,
+    subscriber_queue_size=settings.ALERT_STREAM_QUEUE_SIZE
+)
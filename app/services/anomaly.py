@@ -0,0 +1,168 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from app.db.models import AlertSeverity
+
+# Issue bitmask flags
+ISSUE_VOLTAGE = 1
+ISSUE_CURRENT = 2
+ISSUE_FREQUENCY = 4
+ISSUE_POWER_FACTOR = 8
+# Set by the streaming detectors from per-equipment history
+ISSUE_RATE_OF_CHANGE = 16
+ISSUE_ZSCORE = 32
+ISSUE_SUSTAINED = 64
+
+# Severity codes index into this tuple
+SEVERITY_LEVELS = (
+    AlertSeverity.LOW,
+    AlertSeverity.MEDIUM,
+    AlertSeverity.HIGH,
+    AlertSeverity.CRITICAL,
+)
+
+@dataclass
+class AnomalyResult:
+    """Per-reading results of a batch evaluation"""
+    is_anomaly: np.ndarray  # bool
+    severity: np.ndarray    # int8 code into SEVERITY_LEVELS
+    issues: np.ndarray      # uint8 bitmask of ISSUE_* flags
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+    def severity_of(self, index: int) -> AlertSeverity:
+        return SEVERITY_LEVELS[self.severity[index]]
+
+    def merge(self, other: "AnomalyResult") -> "AnomalyResult":
+        """Combine with another evaluation of the same readings"""
+        return AnomalyResult(
+            is_anomaly=self.is_anomaly | other.is_anomaly,
+            severity=np.maximum(self.severity, other.severity),
+            issues=self.issues | other.issues
+        )
+
+def describe_issues(issues: int, voltage: float, current: float, frequency: float,
+                    power_factor: Optional[float] = None) -> str:
+    """Generate the alert description for an issue bitmask"""
+    parts = []
+
+    if issues & ISSUE_VOLTAGE:
+        parts.append(f"Voltage deviation: {voltage}V")
+    if issues & ISSUE_CURRENT:
+        parts.append(f"High current: {current}A")
+    if issues & ISSUE_FREQUENCY:
+        parts.append(f"Frequency issue: {frequency}Hz")
+    if issues & ISSUE_POWER_FACTOR:
+        parts.append(f"Low power factor: {power_factor}")
+    if issues & ISSUE_RATE_OF_CHANGE:
+        parts.append("Abrupt change from previous reading")
+    if issues & ISSUE_ZSCORE:
+        parts.append("Outside rolling baseline")
+    if issues & ISSUE_SUSTAINED:
+        parts.append(f"Sustained voltage deviation: {voltage}V")
+
+    return "Issues detected: " + "; ".join(parts)
+
+class AnomalyEngine:
+    """Threshold rules evaluated over columnar arrays of readings"""
+
+    def __init__(
+        self,
+        voltage_nominal: float,
+        current_limit: float,
+        voltage_tolerance: float = 10.0,
+        frequency_min: float = 45.0,
+        frequency_max: float = 65.0,
+        power_factor_min: Optional[float] = None
+    ):
+        self.voltage_nominal = voltage_nominal
+        self.current_limit = current_limit
+        self.voltage_tolerance = voltage_tolerance
+        self.frequency_min = frequency_min
+        self.frequency_max = frequency_max
+        self.power_factor_min = power_factor_min
+
+    @classmethod
+    def from_settings(cls, settings) -> "AnomalyEngine":
+        return cls(
+            voltage_nominal=settings.ALERT_THRESHOLD_VOLTAGE,
+            current_limit=settings.ALERT_THRESHOLD_CURRENT
+        )
+
+    def evaluate(
+        self,
+        voltage: np.ndarray,
+        current: np.ndarray,
+        frequency: np.ndarray,
+        power_factor: Optional[np.ndarray] = None
+    ) -> AnomalyResult:
+        """Compute anomaly mask, severity codes and issue bitmask in one pass"""
+        voltage = np.asarray(voltage, dtype=np.float64)
+        current = np.asarray(current, dtype=np.float64)
+        frequency = np.asarray(frequency, dtype=np.float64)
+
+        deviation = np.abs(voltage - self.voltage_nominal)
+
+        issues = (deviation > self.voltage_tolerance) * np.uint8(ISSUE_VOLTAGE)
+        issues |= (current > self.current_limit) * np.uint8(ISSUE_CURRENT)
+        issues |= ~((frequency >= self.frequency_min) & (frequency <= self.frequency_max)) * np.uint8(ISSUE_FREQUENCY)
+        if self.power_factor_min is not None and power_factor is not None:
+            # Missing power factor is NaN and never compares below the limit
+            power_factor = np.asarray(power_factor, dtype=np.float64)
+            issues |= (power_factor < self.power_factor_min) * np.uint8(ISSUE_POWER_FACTOR)
+
+        # Severity from voltage deviation percentage and current overload
+        deviation_pct = deviation / self.voltage_nominal * 100
+        severity = np.select(
+            [
+                (deviation_pct > 20) | (current > self.current_limit * 1.5),
+                (deviation_pct > 15) | (current > self.current_limit * 1.2),
+                (deviation_pct > 10) | (current > self.current_limit),
+            ],
+            [3, 2, 1],
+            default=0
+        ).astype(np.int8)
+
+        return AnomalyResult(
+            is_anomaly=issues != 0,
+            severity=severity,
+            issues=issues
+        )
+
+    def evaluate_readings(self, readings: Sequence) -> AnomalyResult:
+        """Evaluate reading objects (ORM rows or schemas) as one columnar batch"""
+        count = len(readings)
+        return self.evaluate(
+            np.fromiter((r.voltage for r in readings), dtype=np.float64, count=count),
+            np.fromiter((r.current for r in readings), dtype=np.float64, count=count),
+            np.fromiter((r.frequency for r in readings), dtype=np.float64, count=count),
+            np.fromiter(
+                (np.nan if r.power_factor is None else r.power_factor for r in readings),
+                dtype=np.float64,
+                count=count
+            )
+        )
+
+def evaluate_with_engines(readings: Sequence, engines: Sequence[AnomalyEngine]) -> AnomalyResult:
+    """Evaluate readings where each reading has its own engine (threshold profile)"""
+    first = engines[0] if engines else None
+    if all(engine is first for engine in engines):
+        return first.evaluate_readings(readings)
+
+    # Group rows by engine, evaluate each group columnar and scatter back
+    groups = {}
+    for index, engine in enumerate(engines):
+        groups.setdefault(id(engine), (engine, []))[1].append(index)
+
+    count = len(readings)
+    is_anomaly = np.zeros(count, dtype=bool)
+    severity = np.zeros(count, dtype=np.int8)
+    issues = np.zeros(count, dtype=np.uint8)
+    for engine, indices in groups.values():
+        result = engine.evaluate_readings([readings[i] for i in indices])
+        is_anomaly[indices] = result.is_anomaly
+        severity[indices] = result.severity
+        issues[indices] = result.issues
+
+    return AnomalyResult(is_anomaly=is_anomaly, severity=severity, issues=issues)
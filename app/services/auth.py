@@ -1,15 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 from fastapi import HTTPException, status
 from app.db import User, UserRole
-from app.core import verify_password, get_password_hash, create_access_token
+from app.core import verify_password_async, get_password_hash_async, create_access_token, decode_access_token
 from app.models import UserCreate
 from datetime import timedelta
 from app.core import get_settings
-from jose import JWTError, jwt
 
 settings = get_settings()
 
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
 class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -24,7 +25,7 @@ class AuthService:
         
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
         return user
@@ -50,7 +51,7 @@ class AuthService:
         db_user = User(
             email=user_create.email,
             username=user_create.username,
-            hashed_password=get_password_hash(user_create.password),
+            hashed_password=await get_password_hash_async(user_create.password),
             role=user_create.role
         )
         self.db.add(db_user)
@@ -64,8 +65,7 @@ class AuthService:
         username: str
     ) -> User:
         """Get a user by username"""
-        query = select(User).where(User.username == username)
-        result = await self.db.execute(query)
+        result = await self.db.execute(_USER_BY_USERNAME, {"username": username})
         return result.scalar_one_or_none()
 
     def create_user_token(
@@ -97,7 +97,7 @@ class AuthService:
         user = await self.get_user_by_username(username)
         if not user:
             return False
-        return verify_password(password, user.hashed_password)
+        return await verify_password_async(password, user.hashed_password)
 
     async def update_password(
         self, 
@@ -109,7 +109,7 @@ class AuthService:
         if not user:
             raise ValueError("User not found")
             
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
         await self.db.commit()
 
     async def reset_password(
@@ -122,7 +122,7 @@ class AuthService:
         if not user:
             raise ValueError("User not found")
             
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
         await self.db.commit()
 
     async def verify_admin_token(
@@ -130,12 +130,5 @@ class AuthService:
         token: str
     ) -> bool:
         """Verify if the token belongs to an admin user"""
-        try:
-            payload = jwt.decode(
-                token, 
-                settings.SECRET_KEY, 
-                algorithms=["HS256"]
-            )
-            return payload.get("role") == UserRole.ADMIN.value
-        except JWTError:
-            return False
+        payload = decode_access_token(token)
+        return payload is not None and payload.get("role") == UserRole.ADMIN.value
@@ -0,0 +1,354 @@
+import math
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import DetectorState as DetectorStateModel
+from app.core.config import get_settings
+from app.services.anomaly import (
+    AnomalyEngine,
+    AnomalyResult,
+    ISSUE_RATE_OF_CHANGE,
+    ISSUE_SUSTAINED,
+    ISSUE_ZSCORE,
+)
+
+settings = get_settings()
+
+# Severity codes (into SEVERITY_LEVELS) raised by each streaming rule.
+# These flag readings that are unusual but still inside the band, so they
+# stay below the static thresholds' HIGH and CRITICAL
+STREAM_SEVERITY = {
+    ISSUE_RATE_OF_CHANGE: 0,
+    ISSUE_ZSCORE: 0,
+    ISSUE_SUSTAINED: 1,
+}
+
+# Floor on the rolling stddev as a fraction of the nominal value, so a
+# perfectly flat signal does not turn every small wobble into an outlier
+_MIN_STDDEV_FRACTION = 0.002
+
+# Keeps multi-row upserts under the PostgreSQL bind parameter limit
+_UPSERT_CHUNK = 1000
+
+class Observation(NamedTuple):
+    """One reading as it enters a meter's state"""
+    equipment_id: str
+    voltage: float
+    current: float
+    violated: bool  # outside the soft voltage band
+    seen: float  # reading time, seconds since the epoch
+
+class RollingWindow:
+    """Fixed-size ring buffer with a running mean and variance.
+
+    push() is O(1): Welford's update while filling, then the oldest value
+    is swapped out of the running moments as it is overwritten.
+    """
+    __slots__ = ("size", "values", "count", "head", "mean", "m2", "last")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = array("d", bytes(8 * size))
+        self.count = 0
+        self.head = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.last: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, size: int, values: Sequence[float]) -> "RollingWindow":
+        window = cls(size)
+        for value in values[-size:]:
+            window.push(value)
+        return window
+
+    def push(self, value: float):
+        if self.count < self.size:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            oldest = self.values[self.head]
+            mean = self.mean + (value - oldest) / self.size
+            self.m2 = max(self.m2 + (value - oldest) * (value - mean + oldest - self.mean), 0.0)
+            self.mean = mean
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.last = value
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def copy(self) -> "RollingWindow":
+        window = RollingWindow.__new__(RollingWindow)
+        window.size = self.size
+        window.values = array("d", self.values)
+        window.count = self.count
+        window.head = self.head
+        window.mean = self.mean
+        window.m2 = self.m2
+        window.last = self.last
+        return window
+
+    def ordered(self) -> List[float]:
+        """Buffered values, oldest first"""
+        if self.count < self.size:
+            return self.values[:self.count].tolist()
+        return self.values[self.head:].tolist() + self.values[:self.head].tolist()
+
+class MeterState:
+    """Streaming state of one piece of equipment"""
+    __slots__ = ("voltage", "current", "violation_since", "last_seen")
+
+    def __init__(self, window_size: int, last_seen: float):
+        self.voltage = RollingWindow(window_size)
+        self.current = RollingWindow(window_size)
+        # Time of the first reading of the current run outside the soft voltage band
+        self.violation_since: Optional[float] = None
+        self.last_seen = last_seen
+
+    def copy(self) -> "MeterState":
+        state = MeterState.__new__(MeterState)
+        state.voltage = self.voltage.copy()
+        state.current = self.current.copy()
+        state.violation_since = self.violation_since
+        state.last_seen = self.last_seen
+        return state
+
+    def apply(self, observation: "Observation"):
+        """Fold one observed reading into the state"""
+        self.voltage.push(observation.voltage)
+        self.current.push(observation.current)
+        if not observation.violated:
+            self.violation_since = None
+        elif self.violation_since is None:
+            self.violation_since = observation.seen
+        self.last_seen = observation.seen
+
+    def to_dict(self) -> Dict:
+        return {
+            "voltage": self.voltage.ordered(),
+            "current": self.current.ordered(),
+            "violation_since": self.violation_since,
+            "last_seen": self.last_seen
+        }
+
+    @classmethod
+    def from_dict(cls, window_size: int, data: Dict) -> "MeterState":
+        state = cls(window_size, data["last_seen"])
+        state.voltage = RollingWindow.from_values(window_size, data["voltage"])
+        state.current = RollingWindow.from_values(window_size, data["current"])
+        # Snapshots taken before violations were timed restart the run
+        state.violation_since = data.get("violation_since")
+        return state
+
+class StreamDetectors:
+    """Stateful per-equipment rules evaluated alongside the static thresholds.
+
+    Each meter keeps the last ``window_size`` voltage and current readings
+    with their rolling mean and variance, so memory per meter is fixed and
+    every reading is an O(1) update. Three rules run on that state:
+
+    - rate of change: a step between consecutive readings larger than
+      ``max_step_pct`` percent of nominal voltage or the current limit
+    - rolling z-score: a reading more than ``zscore_threshold`` standard
+      deviations from the rolling mean, once ``min_samples`` are buffered
+    - sustained violation: readings deviating from nominal voltage by more
+      than ``sustained_fraction`` of the profile's tolerance for at least
+      ``sustained_seconds`` without a reading back inside, catching drift
+      that stays inside the band whatever the meter's reporting rate
+
+    evaluate() works on copies of the meters' state and returns the
+    observations it made; the caller passes them to record() once the
+    readings commit, so a rolled back batch never enters the baselines.
+
+    Meters are held in an LRU capped at ``max_meters``; a meter silent for
+    ``max_age`` seconds starts a fresh baseline. State is per process and is
+    snapshotted to the detector_states table, from which it is restored on
+    first use after a restart.
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        min_samples: int,
+        zscore_threshold: float,
+        max_step_pct: float,
+        sustained_fraction: float,
+        sustained_seconds: float,
+        max_meters: int,
+        max_age: float
+    ):
+        self.window_size = window_size
+        self.min_samples = min(max(min_samples, 2), window_size)
+        self.zscore_threshold = zscore_threshold
+        self.max_step = max_step_pct / 100
+        self.sustained_fraction = sustained_fraction
+        self.sustained_seconds = sustained_seconds
+        self.max_meters = max_meters
+        self.max_age = max_age
+        self._meters: "OrderedDict[str, MeterState]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._loaded = False
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_size > 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def evaluate(
+        self,
+        readings: Sequence,
+        engines: Sequence[AnomalyEngine],
+        now: Optional[float] = None
+    ) -> Tuple[AnomalyResult, List[Observation]]:
+        """Run the streaming rules over a batch in order, without changing any meter's state.
+
+        ``now`` is the time the readings were taken. Readings are stamped
+        as they are inserted, so it defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        working: Dict[str, MeterState] = {}
+        observations = []
+        issues = []
+        severity = []
+        for reading, engine in zip(readings, engines):
+            state = working.get(reading.equipment_id)
+            if state is None:
+                state = working[reading.equipment_id] = self._working_state(reading.equipment_id, now)
+            flags, observation = self._observe(state, reading, engine, now)
+            state.apply(observation)
+            observations.append(observation)
+            issues.append(flags)
+            severity.append(max((code for issue, code in STREAM_SEVERITY.items() if flags & issue), default=0))
+
+        issues = np.array(issues, dtype=np.uint8)
+        result = AnomalyResult(
+            is_anomaly=issues != 0,
+            severity=np.array(severity, dtype=np.int8),
+            issues=issues
+        )
+        return result, observations
+
+    def record(self, observations: Sequence[Observation]):
+        """Apply the observations of a committed batch to the meters' state"""
+        for observation in observations:
+            self._state(observation.equipment_id, observation.seen).apply(observation)
+
+    def _working_state(self, equipment_id: str, now: float) -> MeterState:
+        state = self._meters.get(equipment_id)
+        if state is None or now - state.last_seen > self.max_age:
+            return MeterState(self.window_size, now)
+        return state.copy()
+
+    def _state(self, equipment_id: str, now: float) -> MeterState:
+        state = self._meters.get(equipment_id)
+        if state is None or now - state.last_seen > self.max_age:
+            state = self._meters[equipment_id] = MeterState(self.window_size, now)
+        self._meters.move_to_end(equipment_id)
+        self._dirty.add(equipment_id)
+        while len(self._meters) > self.max_meters:
+            evicted, _ = self._meters.popitem(last=False)
+            self._dirty.discard(evicted)
+            self.evictions += 1
+        return state
+
+    def _observe(
+        self,
+        state: MeterState,
+        reading,
+        engine: AnomalyEngine,
+        now: float
+    ) -> Tuple[int, Observation]:
+        flags = 0
+        for window, value, scale in (
+            (state.voltage, reading.voltage, engine.voltage_nominal),
+            (state.current, reading.current, engine.current_limit)
+        ):
+            # Compare against the history before this reading joins it
+            if window.last is not None and abs(value - window.last) > scale * self.max_step:
+                flags |= ISSUE_RATE_OF_CHANGE
+            if window.count >= self.min_samples:
+                stddev = max(window.stddev, scale * _MIN_STDDEV_FRACTION)
+                if abs(value - window.mean) > self.zscore_threshold * stddev:
+                    flags |= ISSUE_ZSCORE
+
+        violated = abs(reading.voltage - engine.voltage_nominal) > engine.voltage_tolerance * self.sustained_fraction
+        since = now if state.violation_since is None else state.violation_since
+        if violated and now - since >= self.sustained_seconds:
+            flags |= ISSUE_SUSTAINED
+
+        return flags, Observation(reading.equipment_id, reading.voltage, reading.current, violated, now)
+
+    async def load(self, db: AsyncSession) -> int:
+        """Restore snapshotted meters that are still fresh; live state wins"""
+        cutoff = datetime.fromtimestamp(time.time() - self.max_age, tz=timezone.utc)
+        query = select(DetectorStateModel.equipment_id, DetectorStateModel.state).where(
+            DetectorStateModel.updated_at >= cutoff
+        ).order_by(DetectorStateModel.updated_at.desc()).limit(self.max_meters)
+        result = await db.execute(query)
+
+        restored = 0
+        for equipment_id, data in result.all():
+            if equipment_id not in self._meters and len(self._meters) < self.max_meters:
+                self._meters[equipment_id] = MeterState.from_dict(self.window_size, data)
+                self._meters.move_to_end(equipment_id, last=False)
+                restored += 1
+        self._loaded = True
+        return restored
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self._loaded:
+            await self.load(db)
+
+    async def snapshot(self, db: AsyncSession) -> int:
+        """Upsert the state of meters updated since the last snapshot and drop expired ones"""
+        dirty, self._dirty = self._dirty, set()
+        rows = [
+            {
+                "equipment_id": equipment_id,
+                "state": self._meters[equipment_id].to_dict(),
+                "updated_at": datetime.fromtimestamp(self._meters[equipment_id].last_seen, tz=timezone.utc)
+            }
+            for equipment_id in sorted(dirty)
+            if equipment_id in self._meters
+        ]
+        try:
+            for offset in range(0, len(rows), _UPSERT_CHUNK):
+                stmt = insert(DetectorStateModel).values(rows[offset:offset + _UPSERT_CHUNK])
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[DetectorStateModel.equipment_id],
+                    set_={"state": stmt.excluded.state, "updated_at": stmt.excluded.updated_at}
+                ))
+            await db.execute(delete(DetectorStateModel).where(
+                DetectorStateModel.updated_at < datetime.fromtimestamp(time.time() - self.max_age, tz=timezone.utc)
+            ))
+            await db.commit()
+        except Exception:
+            # Retry these meters on the next snapshot
+            self._dirty |= dirty
+            raise
+        return len(rows)
+
+stream_detectors = StreamDetectors(
+    window_size=settings.STREAM_WINDOW_SIZE,
+    min_samples=settings.STREAM_MIN_SAMPLES,
+    zscore_threshold=settings.STREAM_ZSCORE_THRESHOLD,
+    max_step_pct=settings.STREAM_MAX_STEP_PCT,
+    sustained_fraction=settings.STREAM_SUSTAINED_FRACTION,
+    sustained_seconds=settings.STREAM_SUSTAINED_SECONDS,
+    max_meters=settings.STREAM_MAX_METERS,
+    max_age=settings.STREAM_STATE_MAX_AGE_SECONDS
+)
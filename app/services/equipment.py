@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import Equipment as EquipmentModel, Location as LocationModel, after_commit
+from app.models import PowerReadingCreate
+
+class EquipmentRegistry:
+    """Interning cache from equipment_id and location names to the registry's integer keys.
+
+    The registry is loaded once; after that resolving the keys of known
+    equipment and locations is a dict lookup. Keys never change once
+    assigned, so the cache cannot go stale and equipment moving between
+    locations registers nothing new. Unknown names are inserted in the
+    caller's transaction and cached once it commits, so a rolled back
+    registration is never used.
+    """
+
+    def __init__(self):
+        self._equipment: Optional[Dict[str, int]] = None
+        self._locations: Optional[Dict[str, int]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._equipment is not None
+
+    def __len__(self) -> int:
+        return len(self._equipment or {})
+
+    async def load(self, db: AsyncSession):
+        equipment = await db.execute(select(EquipmentModel.equipment_id, EquipmentModel.id))
+        locations = await db.execute(select(LocationModel.name, LocationModel.id))
+        self._equipment = dict(equipment.all())
+        self._locations = dict(locations.all())
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self.is_loaded:
+            await self.load(db)
+
+    def _remember(self, equipment: Dict[str, int], locations: Dict[str, int]):
+        if self.is_loaded:
+            self._equipment.update(equipment)
+            self._locations.update(locations)
+
+    async def _register(self, db: AsyncSession, model, column, names: List[str]) -> Dict[str, int]:
+        # Sorted so concurrent registrations lock rows in the same order; the
+        # no-op update makes RETURNING include names another worker inserted
+        stmt = insert(model).values([{column.key: name} for name in sorted(names)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[column],
+            set_={column.key: stmt.excluded[column.key]}
+        ).returning(column, model.id)
+        result = await db.execute(stmt)
+        return dict(result.all())
+
+    async def resolve(self, db: AsyncSession, readings: Sequence[PowerReadingCreate]) -> List[Tuple[int, int]]:
+        """Return the (equipment key, location key) of each reading, registering new names (no commit)"""
+        await self.ensure_loaded(db)
+        missing_equipment = {r.equipment_id for r in readings if r.equipment_id not in self._equipment}
+        missing_locations = {r.location for r in readings if r.location not in self._locations}
+        misses = sum(
+            1 for r in readings if r.equipment_id in missing_equipment or r.location in missing_locations
+        )
+        self.misses += misses
+        self.hits += len(readings) - misses
+
+        equipment: Dict[str, int] = {}
+        locations: Dict[str, int] = {}
+        if missing_equipment:
+            equipment = await self._register(db, EquipmentModel, EquipmentModel.equipment_id, missing_equipment)
+        if missing_locations:
+            locations = await self._register(db, LocationModel, LocationModel.name, missing_locations)
+        if equipment or locations:
+            after_commit(db, lambda: self._remember(equipment, locations))
+
+        return [
+            (
+                equipment.get(reading.equipment_id) or self._equipment[reading.equipment_id],
+                locations.get(reading.location) or self._locations[reading.location]
+            )
+            for reading in readings
+        ]
+
+equipment_registry = EquipmentRegistry()
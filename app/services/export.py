@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set
+from urllib.parse import quote
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import PowerReading as PowerReadingModel, Alert as AlertModel, Equipment as EquipmentModel, Location as LocationModel
+from app.db.session import AsyncSessionLocal
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("parquet", "arrow")
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+MANIFEST_FILE = "manifest.json"
+
+# Hive's marker for a null partition value; pyarrow reads it back as null
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Partition keys live in the directory names, not in the files
+PARTITIONING = ds.HivePartitioning(
+    pa.schema([("date", pa.string()), ("equipment_id", pa.string())]),
+    null_fallback=NULL_PARTITION
+)
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+# table -> (model, arrow schema of the exported columns in file order)
+EXPORT_TABLES = {
+    "readings": (PowerReadingModel, pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", _TIMESTAMP),
+        ("voltage", pa.float64()),
+        ("current", pa.float64()),
+        ("frequency", pa.float64()),
+        ("power_factor", pa.float64()),
+        ("location", pa.string()),
+        ("is_anomaly", pa.bool_()),
+    ])),
+    "alerts": (AlertModel, pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", _TIMESTAMP),
+        ("severity", pa.string()),
+        ("message", pa.string()),
+        ("description", pa.string()),
+        ("power_reading_id", pa.int64()),
+        ("equipment_id", pa.string()),
+        ("occurrence_count", pa.int64()),
+        ("last_seen", _TIMESTAMP),
+        ("is_acknowledged", pa.bool_()),
+        ("acknowledged_by", pa.string()),
+        ("acknowledged_at", _TIMESTAMP),
+    ])),
+}
+
+@dataclass
+class ExportTableStats:
+    files: int = 0
+    rows: int = 0
+
+@dataclass
+class ExportManifest:
+    path: str
+    format: str
+    tables: Dict[str, ExportTableStats] = field(default_factory=dict)
+
+_EXPORT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+def export_path(name: Optional[str] = None) -> str:
+    """Resolve a new export directory under EXPORT_DIR; defaults to a UTC timestamp"""
+    name = name or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if not _EXPORT_NAME.match(name):
+        raise ValueError("Export name may only contain letters, digits, '.', '_' and '-'")
+    path = os.path.join(settings.EXPORT_DIR, name)
+    if os.path.exists(path):
+        raise ValueError(f"Export '{name}' already exists")
+    return path
+
+def check_export_options(
+    fmt: str,
+    tables: Optional[List[str]],
+    start: Optional[datetime],
+    end: Optional[datetime]
+) -> List[str]:
+    """Validate export options, returning the tables to export"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    tables = tables or list(EXPORT_TABLES)
+    for table in tables:
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table '{table}', expected one of {', '.join(EXPORT_TABLES)}")
+    if start and end and start >= end:
+        raise ValueError("start must be before end")
+    return tables
+
+def _partition_path(root: str, table: str, day: Optional[str], equipment_id: Optional[str]) -> str:
+    return os.path.join(
+        root,
+        table,
+        f"date={day or NULL_PARTITION}",
+        f"equipment_id={quote(equipment_id, safe='') if equipment_id is not None else NULL_PARTITION}"
+    )
+
+class _PartitionFile:
+    """A single Parquet or Arrow IPC file receiving record batches"""
+
+    def __init__(self, path: str, schema: pa.Schema, fmt: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            # Uncompressed so readers can memory-map buffers without copying
+            self._writer = ipc.new_file(path, schema)
+
+    def write(self, batch: pa.RecordBatch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+class ArchiveExporter:
+    """Streams readings and alerts out of PostgreSQL into columnar files.
+
+    Rows are fetched server-side in chunks ordered by equipment and time,
+    so each date/equipment partition is written by one open file at a
+    time and memory stays bounded by the chunk size. Output layout:
+
+        <path>/<table>/date=YYYY-MM-DD/equipment_id=<id>/part-0.<ext>
+    """
+
+    def __init__(self, db: AsyncSession, path: str, fmt: str = "parquet", chunk_size: Optional[int] = None):
+        check_export_options(fmt, None, None, None)
+        self.db = db
+        self.path = path
+        self.fmt = fmt
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    async def export(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equipment_ids: Optional[List[str]] = None,
+        tables: Optional[List[str]] = None
+    ) -> ExportManifest:
+        """Export the tables, then write <path>/manifest.json describing them"""
+        tables = check_export_options(self.fmt, tables, start, end)
+
+        manifest = ExportManifest(path=self.path, format=self.fmt)
+        for table in tables:
+            manifest.tables[table] = await self._export_table(table, start, end, equipment_ids)
+        await asyncio.to_thread(write_manifest, manifest)
+        return manifest
+
+    async def _export_table(
+        self,
+        table: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        equipment_ids: Optional[List[str]]
+    ) -> ExportTableStats:
+        model, schema = EXPORT_TABLES[table]
+        if model is PowerReadingModel:
+            # Readings reference the equipment and location registries; export their strings,
+            # but walk the (equipment_key, timestamp, id) index order
+            equipment_id = EquipmentModel.equipment_id
+            columns = [LocationModel.name if name == "location" else getattr(model, name) for name in schema.names]
+            query = select(equipment_id, *columns).join_from(model, EquipmentModel).join(LocationModel)
+            order = model.equipment_key
+        else:
+            equipment_id = order = model.equipment_id
+            query = select(equipment_id, *(getattr(model, name) for name in schema.names))
+        if start:
+            query = query.where(model.timestamp >= start)
+        if end:
+            query = query.where(model.timestamp < end)
+        if equipment_ids:
+            query = query.where(equipment_id.in_(equipment_ids))
+        query = query.order_by(order, model.timestamp, model.id)
+
+        stats = ExportTableStats()
+        current_key = None
+        current_file: Optional[_PartitionFile] = None
+        try:
+            result = await self.db.stream(query.execution_options(yield_per=self.chunk_size))
+            async for rows in result.partitions(self.chunk_size):
+                for key, group in self._split(rows):
+                    if key != current_key:
+                        if current_file:
+                            await asyncio.to_thread(current_file.close)
+                            current_file = None
+                        path = os.path.join(
+                            _partition_path(self.path, table, *key),
+                            f"part-0.{FILE_EXTENSIONS[self.fmt]}"
+                        )
+                        current_file = await asyncio.to_thread(_PartitionFile, path, schema, self.fmt)
+                        current_key = key
+                        stats.files += 1
+                    batch = self._to_batch(group, schema)
+                    await asyncio.to_thread(current_file.write, batch)
+                    stats.rows += len(group)
+        finally:
+            if current_file:
+                await asyncio.to_thread(current_file.close)
+        return stats
+
+    @staticmethod
+    def _split(rows: Sequence) -> List[tuple]:
+        """Split a chunk into runs of rows sharing (date, equipment_id)"""
+        groups = []
+        current_key = None
+        for row in rows:
+            timestamp = row[2]
+            day = timestamp.astimezone(timezone.utc).date().isoformat() if timestamp else None
+            key = (day, row[0])
+            if key != current_key:
+                groups.append((key, []))
+                current_key = key
+            groups[-1][1].append(row[1:])
+        return groups
+
+    @staticmethod
+    def _to_batch(rows: List[tuple], schema: pa.Schema) -> pa.RecordBatch:
+        columns = list(zip(*rows))
+        arrays = []
+        for values, column in zip(columns, schema):
+            if pa.types.is_string(column.type):
+                # Enum members (alert severity) are stored by value
+                values = [getattr(value, "value", value) for value in values]
+            arrays.append(pa.array(values, type=column.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_manifest(manifest: ExportManifest):
+    os.makedirs(manifest.path, exist_ok=True)
+    with open(os.path.join(manifest.path, MANIFEST_FILE), "w") as f:
+        json.dump(asdict(manifest), f)
+
+def read_manifest(path: str) -> Optional[ExportManifest]:
+    """The manifest of a finished export, None if it has not finished"""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    tables = {table: ExportTableStats(**stats) for table, stats in data["tables"].items()}
+    return ExportManifest(path=data["path"], format=data["format"], tables=tables)
+
+@dataclass
+class ExportJob:
+    """An archive export running in the background; its id is the export name"""
+    id: str
+    path: str
+    format: str
+    status: str = "queued"  # queued, running, completed or failed
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    tables: Optional[Dict[str, ExportTableStats]] = None
+    error: Optional[str] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+
+class ExportJobs:
+    """Archive exports run as background tasks of this process.
+
+    An export can take minutes, so requests only start it and return the
+    job; its own session streams the rows, and at most ``max_running``
+    exports hold a pooled connection at once while the rest queue.
+    Finished exports leave manifest.json in their directory, so any worker
+    sharing EXPORT_DIR can report them.
+    """
+
+    def __init__(self, max_running: int, max_history: int):
+        self.max_history = max_history
+        self._slots = asyncio.Semaphore(max_running)
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(
+        self,
+        name: Optional[str] = None,
+        fmt: str = "parquet",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equipment_ids: Optional[List[str]] = None,
+        tables: Optional[List[str]] = None
+    ) -> ExportJob:
+        """Validate the options, claim the export directory and start exporting"""
+        tables = check_export_options(fmt, tables, start, end)
+        path = export_path(name)
+        try:
+            # Claims the name before the job starts writing
+            os.makedirs(path)
+        except FileExistsError:
+            raise ValueError(f"Export '{os.path.basename(path)}' already exists")
+
+        job = ExportJob(id=os.path.basename(path), path=path, format=fmt, created_at=datetime.now(timezone.utc))
+        self._jobs[job.id] = job
+        finished = [job_id for job_id, known in self._jobs.items() if known.finished_at is not None]
+        for job_id in finished[:len(self._jobs) - self.max_history]:
+            del self._jobs[job_id]
+        task = asyncio.create_task(self._run(job, start, end, equipment_ids, tables))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """A job started by this process, or a finished export found on disk"""
+        job = self._jobs.get(job_id)
+        if job is not None or not _EXPORT_NAME.match(job_id):
+            return job
+        path = os.path.join(settings.EXPORT_DIR, job_id)
+        manifest = read_manifest(path)
+        if manifest is None:
+            return None
+        return ExportJob(id=job_id, path=path, format=manifest.format, status="completed", tables=manifest.tables)
+
+    async def stop(self):
+        """Cancel running exports, e.g. at shutdown"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            if job.status in ("queued", "running"):
+                job.status = "failed"
+                job.error = "cancelled"
+                job.finished_at = datetime.now(timezone.utc)
+
+    async def _run(
+        self,
+        job: ExportJob,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        equipment_ids: Optional[List[str]],
+        tables: List[str]
+    ):
+        try:
+            async with self._slots:
+                job.status = "running"
+                async with AsyncSessionLocal() as db:
+                    manifest = await ArchiveExporter(db, job.path, job.format).export(start, end, equipment_ids, tables)
+            job.tables = manifest.tables
+            job.status = "completed"
+            job.finished_at = datetime.now(timezone.utc)
+        except Exception as e:
+            logger.exception("Export %s failed", job.id)
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.now(timezone.utc)
+
+export_jobs = ExportJobs(max_running=settings.EXPORT_MAX_RUNNING, max_history=settings.EXPORT_JOB_HISTORY)
+
+def open_archive(path: str, table: str = "readings", fmt: Optional[str] = None) -> ds.Dataset:
+    """Open an exported table as a pyarrow dataset backed by memory-mapped files.
+
+    The date and equipment_id partition columns are restored from the
+    directory layout, so filters on them only touch matching files:
+
+        dataset = open_archive("exports/2024-06", "readings")
+        table = dataset.to_table(filter=ds.field("equipment_id") == "PUMP-1")
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table '{table}', expected one of {', '.join(EXPORT_TABLES)}")
+    root = os.path.join(path, table)
+    if fmt is None:
+        fmt = "arrow" if any(name.endswith(".arrow") for _, _, files in os.walk(root) for name in files) else "parquet"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+    return ds.dataset(
+        root,
+        format="parquet" if fmt == "parquet" else "ipc",
+        partitioning=PARTITIONING,
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy.exc import DBAPIError
+from app.db.session import AsyncSessionLocal
+from app.models import PowerReadingCreate
+from app.core.config import get_settings
+from app.services.monitoring import MonitoringService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# SQLSTATE classes of errors caused by the data itself: data exceptions
+# and integrity constraint violations
+_DATA_ERROR_CLASSES = ("22", "23")
+
+class IngestWriter:
+    """Bounded queue of readings written to the database in batches.
+
+    Producers get a future per reading that resolves to its
+    PowerReadingBatchItem once the batch containing it is committed.
+    A batch is flushed when it reaches ``batch_size`` readings or when
+    ``flush_interval`` seconds have passed since its first reading.
+    A batch that fails is retried one reading at a time, so a reading
+    the database rejects fails only its own future.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything queued so far and stop the writer"""
+        if self.is_running:
+            await self.queue.put(_STOP)
+            await self._task
+        self._task = None
+
+    def try_submit(self, reading: PowerReadingCreate) -> Optional[asyncio.Future]:
+        """Queue a reading without waiting; returns None when the queue is full"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((reading, future))
+        except asyncio.QueueFull:
+            return None
+        return future
+
+    async def submit(self, reading: PowerReadingCreate) -> asyncio.Future:
+        """Queue a reading, waiting for space when the queue is full"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((reading, future))
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _write(self, batch: List[Tuple[PowerReadingCreate, asyncio.Future]]):
+        async with AsyncSessionLocal() as db:
+            result = await MonitoringService(db).create_readings([reading for reading, _ in batch])
+        for (_, future), item in zip(batch, result.results):
+            if not future.done():
+                future.set_result(item)
+
+    async def _flush(self, batch: List[Tuple[PowerReadingCreate, asyncio.Future]]):
+        try:
+            await self._write(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                logger.exception("Failed to write reading of %s", batch[0][0].equipment_id)
+                _fail(batch, e)
+                return
+            logger.warning("Failed to write batch of %d readings, retrying one by one: %r", len(batch), e)
+
+        for index, item in enumerate(batch):
+            try:
+                await self._write([item])
+            except Exception as e:
+                if _rejects_data(e):
+                    # Only this reading fails
+                    logger.warning("Reading of %s rejected: %s", item[0].equipment_id, e.orig)
+                    _fail([item], e)
+                    continue
+                # Not the data (e.g. the database is unreachable): fail the rest at once
+                logger.exception("Failed to write batch of %d readings", len(batch))
+                _fail(batch[index:], e)
+                return
+
+def _rejects_data(error: Exception) -> bool:
+    if not isinstance(error, DBAPIError):
+        return False
+    code = getattr(error.orig, "pgcode", None)
+    return code is not None and code[:2] in _DATA_ERROR_CLASSES
+
+def _fail(batch: List[Tuple[PowerReadingCreate, asyncio.Future]], error: Exception):
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+ingest_writer = IngestWriter(
+    max_queue=settings.INGEST_QUEUE_SIZE,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL_MS / 1000
+)
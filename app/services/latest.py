@@ -0,0 +1,162 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set
+import orjson
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import PowerReading as PowerReadingModel, Equipment as EquipmentModel, Location as LocationModel
+from app.db.session import AsyncSessionLocal
+from app.models import PowerReadingCreate, PowerReadingBatchItem
+
+logger = logging.getLogger(__name__)
+
+# Refreshes re-read this far behind the previous one, covering readings
+# whose transaction started before it but committed after
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+_READING_COLUMNS = (
+    PowerReadingModel.id,
+    PowerReadingModel.timestamp,
+    PowerReadingModel.voltage,
+    PowerReadingModel.current,
+    PowerReadingModel.frequency,
+    PowerReadingModel.power_factor,
+    PowerReadingModel.is_anomaly,
+    PowerReadingModel.location_key
+)
+
+class LatestReadingIndex:
+    """The most recent reading of every equipment, held in memory.
+
+    Warmed with one query that probes each registered equipment's latest
+    reading and then kept current by ingest in this process; refresh()
+    picks up readings written by other workers.
+    Each entry's JSON is encoded once and reused until the entry changes,
+    so listing thousands of meters is a join of cached fragments.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, dict] = {}
+        self._fragments: Dict[str, bytes] = {}
+        self._by_location: Dict[str, Set[str]] = {}
+        # Sorted equipment ids per location filter (None = all), rebuilt on membership changes
+        self._views: Dict[Optional[str], List[str]] = {}
+        self._loaded = False
+        self._refreshed_at: Optional[datetime] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, entry: dict):
+        equipment_id = entry["equipment_id"]
+        current = self._entries.get(equipment_id)
+        if current is not None:
+            if (entry["timestamp"], entry["id"]) <= (current["timestamp"], current["id"]):
+                return
+            if current["location"] != entry["location"]:
+                self._by_location[current["location"]].discard(equipment_id)
+                self._views = {}
+        else:
+            self._views = {}
+        self._entries[equipment_id] = entry
+        self._fragments.pop(equipment_id, None)
+        self._by_location.setdefault(entry["location"], set()).add(equipment_id)
+
+    def record(self, readings: Sequence[PowerReadingCreate], items: Sequence[PowerReadingBatchItem]):
+        """Apply committed readings; older ones than an entry's current reading are ignored"""
+        for reading, item in zip(readings, items):
+            self._put({
+                "id": item.id,
+                "timestamp": item.timestamp,
+                "voltage": reading.voltage,
+                "current": reading.current,
+                "frequency": reading.frequency,
+                "power_factor": reading.power_factor,
+                "equipment_id": reading.equipment_id,
+                "location": reading.location,
+                "is_anomaly": item.is_anomaly
+            })
+
+    async def load(self, db: AsyncSession, since: Optional[datetime] = None) -> int:
+        """Merge in the latest stored reading per equipment, optionally only readings since a time"""
+        started = datetime.now(timezone.utc)
+        # One backward probe of the (equipment_key, timestamp, id) index per
+        # registered equipment, rather than reading and sorting every partition
+        latest = select(*_READING_COLUMNS).where(
+            PowerReadingModel.equipment_key == EquipmentModel.id
+        ).order_by(
+            PowerReadingModel.timestamp.desc(),
+            PowerReadingModel.id.desc()
+        ).limit(1)
+        if since is not None:
+            latest = latest.where(PowerReadingModel.timestamp >= since)
+        latest = latest.lateral("latest")
+        query = select(
+            latest.c.id,
+            latest.c.timestamp,
+            latest.c.voltage,
+            latest.c.current,
+            latest.c.frequency,
+            latest.c.power_factor,
+            EquipmentModel.equipment_id,
+            LocationModel.name.label("location"),
+            latest.c.is_anomaly
+        ).select_from(EquipmentModel).join(latest, true()).join(
+            LocationModel, LocationModel.id == latest.c.location_key
+        )
+        result = await db.execute(query)
+
+        rows = result.mappings().all()
+        for row in rows:
+            self._put(dict(row))
+        self._loaded = True
+        self._refreshed_at = started
+        return len(rows)
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self._loaded:
+            await self.load(db)
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Pick up readings committed since the previous load, e.g. by other workers"""
+        if self._refreshed_at is None:
+            return await self.load(db)
+        return await self.load(db, self._refreshed_at - _REFRESH_OVERLAP)
+
+    async def warm(self):
+        """Load the index at startup; on failure the first request loads it"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+        except Exception:
+            logger.exception("Failed to warm the latest reading index")
+
+    def _view(self, location: Optional[str]) -> List[str]:
+        view = self._views.get(location)
+        if view is None:
+            members = self._entries if location is None else self._by_location.get(location, ())
+            view = self._views[location] = sorted(members)
+        return view
+
+    def get(self, location: Optional[str] = None) -> List[dict]:
+        """Latest readings ordered by equipment_id"""
+        return [self._entries[equipment_id] for equipment_id in self._view(location)]
+
+    def to_json(self, location: Optional[str] = None) -> bytes:
+        """Latest readings as a JSON array, ordered by equipment_id"""
+        fragments = []
+        for equipment_id in self._view(location):
+            fragment = self._fragments.get(equipment_id)
+            if fragment is None:
+                # Timestamps end in Z, as in the other JSON list responses
+                fragment = self._fragments[equipment_id] = orjson.dumps(
+                    self._entries[equipment_id], option=orjson.OPT_UTC_Z
+                )
+            fragments.append(fragment)
+        return b"[" + b",".join(fragments) + b"]"
+
+latest_readings = LatestReadingIndex()
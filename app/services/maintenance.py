@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.db.session import AsyncSessionLocal
+from app.core.config import get_settings
+from app.core.token_cache import token_cache, token_revocations
+from app.services.alert_counters import alert_counters
+from app.services.detectors import stream_detectors
+from app.services.latest import latest_readings
+from app.services.partitions import PartitionManager, partition_maintenance_lock
+from app.services.session import SessionService
+from app.services.thresholds import threshold_cache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MaintenanceJob:
+    """A periodic task returning the number of rows or objects it affected"""
+    name: str
+    interval: float
+    run: Callable[[], Awaitable[int]]
+    runs: int = 0
+    last_started: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_rows: Optional[int] = None
+    last_error: Optional[str] = None
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "last_rows": self.last_rows,
+            "last_error": self.last_error
+        }
+
+class MaintenanceScheduler:
+    """Runs maintenance jobs on fixed intervals in the background.
+
+    Each job runs once at startup and then every ``interval`` seconds.
+    A failing run is logged and retried on the next interval; it never
+    stops the scheduler or other jobs.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, MaintenanceJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval: float, run: Callable[[], Awaitable[int]]):
+        self.jobs[name] = MaintenanceJob(name=name, interval=interval, run=run)
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        if not self.is_running:
+            self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_job(self, name: str) -> MaintenanceJob:
+        """Run a job now and record its outcome"""
+        job = self.jobs[name]
+        job.last_started = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            job.last_rows = await job.run()
+            job.last_error = None
+        except Exception as e:
+            job.last_rows = None
+            job.last_error = str(e)
+            logger.exception("Maintenance job %s failed", name)
+        job.last_duration = time.perf_counter() - started
+        job.runs += 1
+        if job.last_error is None:
+            logger.info("Maintenance job %s: %s rows in %.3fs", name, job.last_rows, job.last_duration)
+        return job
+
+    def status(self) -> List[dict]:
+        return [job.status() for job in self.jobs.values()]
+
+    async def _loop(self, job: MaintenanceJob):
+        while True:
+            await self.run_job(job.name)
+            await asyncio.sleep(job.interval)
+
+async def purge_expired_sessions() -> int:
+    async with AsyncSessionLocal() as db:
+        return await SessionService(db).cleanup_expired_sessions(settings.SESSION_CLEANUP_BATCH_SIZE)
+
+async def sync_revoked_tokens() -> int:
+    # Revocations within the token lifetime are re-read, which also covers
+    # sessions ended while this job was between runs
+    since = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    async with AsyncSessionLocal() as db:
+        tokens = await SessionService(db).get_revoked_tokens(since)
+    for token in tokens:
+        token_revocations.revoke(token)
+        token_cache.invalidate(token)
+    token_revocations.prune()
+    return len(tokens)
+
+async def maintain_partitions() -> int:
+    # Every worker schedules this job; the one holding the lock runs it
+    async with partition_maintenance_lock() as acquired:
+        if not acquired:
+            logger.debug("Partition maintenance is running in another process")
+            return 0
+        async with AsyncSessionLocal() as db:
+            manager = PartitionManager(db)
+            created = await manager.ensure_partitions()
+            retired = await manager.apply_retention()
+    return len(created) + len(retired)
+
+async def reconcile_alert_counters() -> int:
+    async with AsyncSessionLocal() as db:
+        return await alert_counters.reconcile(db)
+
+async def snapshot_stream_detectors() -> int:
+    async with AsyncSessionLocal() as db:
+        return await stream_detectors.snapshot(db)
+
+async def refresh_latest_readings() -> int:
+    async with AsyncSessionLocal() as db:
+        return await latest_readings.refresh(db)
+
+async def refresh_thresholds() -> int:
+    async with AsyncSessionLocal() as db:
+        return await threshold_cache.refresh(db)
+
+maintenance_scheduler = MaintenanceScheduler()
+maintenance_scheduler.add_job("purge_expired_sessions", settings.SESSION_CLEANUP_INTERVAL_SECONDS, purge_expired_sessions)
+maintenance_scheduler.add_job("sync_revoked_tokens", settings.TOKEN_REVOCATION_SYNC_SECONDS, sync_revoked_tokens)
+maintenance_scheduler.add_job("maintain_partitions", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, maintain_partitions)
+maintenance_scheduler.add_job("reconcile_alert_counters", settings.ALERT_SUMMARY_RECONCILE_SECONDS, reconcile_alert_counters)
+if stream_detectors.enabled:
+    maintenance_scheduler.add_job("snapshot_stream_detectors", settings.STREAM_SNAPSHOT_INTERVAL_SECONDS, snapshot_stream_detectors)
+if settings.LATEST_READINGS_REFRESH_SECONDS > 0:
+    maintenance_scheduler.add_job("refresh_latest_readings", settings.LATEST_READINGS_REFRESH_SECONDS, refresh_latest_readings)
+if settings.THRESHOLD_RELOAD_SECONDS > 0:
+    maintenance_scheduler.add_job("refresh_thresholds", settings.THRESHOLD_RELOAD_SECONDS, refresh_thresholds)
@@ -0,0 +1,95 @@
+import asyncio
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+READ_HOLDING_REGISTERS = 3
+READ_INPUT_REGISTERS = 4
+FUNCTION_CODES = {"holding": READ_HOLDING_REGISTERS, "input": READ_INPUT_REGISTERS}
+
+_STRUCT_FORMATS = {"uint16": "H", "int16": "h", "uint32": "I", "int32": "i", "float32": "f"}
+
+# MBAP header: transaction id, protocol id (0), length of the rest, unit id
+_HEADER = struct.Struct(">HHHB")
+
+class ModbusError(Exception):
+    """A failed Modbus request: transport failure, timeout or exception response"""
+
+def decode_value(registers: Sequence[int], data_type: str, word_order: str = "big") -> float:
+    """Value of a 16- or 32-bit point from its registers"""
+    words = list(registers)
+    if word_order == "little":
+        words.reverse()
+    return struct.unpack(">" + _STRUCT_FORMATS[data_type], struct.pack(f">{len(words)}H", *words))[0]
+
+def encode_value(value: float, data_type: str, word_order: str = "big") -> List[int]:
+    """Registers holding a 16- or 32-bit point, the inverse of decode_value"""
+    if data_type != "float32":
+        value = int(round(value))
+    data = struct.pack(">" + _STRUCT_FORMATS[data_type], value)
+    words = list(struct.unpack(f">{len(data) // 2}H", data))
+    if word_order == "little":
+        words.reverse()
+    return words
+
+class ModbusClient:
+    """Modbus TCP client for one host:port, shared by the units behind it.
+
+    Requests are sent one at a time over a single connection, which is
+    opened on first use and dropped after any transport error or timeout
+    so the next request starts from a clean stream.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._transaction = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None
+
+    async def close(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def read_registers(self, unit_id: int, function: int, address: int, count: int) -> Tuple[int, ...]:
+        """Read ``count`` holding or input registers starting at ``address``"""
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._request(unit_id, function, address, count), self.timeout)
+            except ModbusError:
+                raise
+            except asyncio.TimeoutError:
+                await self.close()
+                raise ModbusError(f"{self.host}:{self.port} unit {unit_id}: no response within {self.timeout}s")
+            except (OSError, asyncio.IncompleteReadError) as e:
+                await self.close()
+                raise ModbusError(f"{self.host}:{self.port} unit {unit_id}: {e!r}") from e
+
+    async def _request(self, unit_id: int, function: int, address: int, count: int) -> Tuple[int, ...]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._transaction = (self._transaction + 1) & 0xFFFF
+        self._writer.write(_HEADER.pack(self._transaction, 0, 6, unit_id) + struct.pack(">BHH", function, address, count))
+        await self._writer.drain()
+
+        transaction, protocol, length, _ = _HEADER.unpack(await self._reader.readexactly(_HEADER.size))
+        if transaction != self._transaction or protocol != 0 or length < 3:
+            await self.close()
+            raise ModbusError(f"{self.host}:{self.port} unit {unit_id}: response does not match the request")
+        pdu = await self._reader.readexactly(length - 1)
+        if pdu[0] == function | 0x80:
+            raise ModbusError(f"{self.host}:{self.port} unit {unit_id}: exception code {pdu[1]}")
+        if pdu[0] != function or len(pdu) != 2 + 2 * count or pdu[1] != 2 * count:
+            await self.close()
+            raise ModbusError(f"{self.host}:{self.port} unit {unit_id}: malformed response")
+        return struct.unpack(f">{count}H", pdu[2:])
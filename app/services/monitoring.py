@@ -1,118 +1,406 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
-from app.db import PowerReading as PowerReadingModel, Alert as AlertModel, AlertSeverity
-from app.models import PowerReadingCreate
+from sqlalchemy import select, insert, update, tuple_, func, literal, bindparam, lambda_stmt, column, values, DateTime, Integer, Interval, Row, Select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import re
+from app.db import PowerReading as PowerReadingModel, Alert as AlertModel, Equipment as EquipmentModel, Location as LocationModel, after_commit
+from app.models import PowerReadingCreate, PowerReading, PowerReadingBatchItem, PowerReadingBatchResult
 from app.core.config import get_settings
+from app.core.pagination import decode_cursor
+from app.services.anomaly import AnomalyResult, describe_issues, evaluate_with_engines
+from app.services.thresholds import threshold_cache
+from app.services.alert_hub import alert_hub
+from app.services.alert_counters import alert_counters
+from app.services.alert_dedup import IncidentKey, alert_deduplicator
+from app.services.detectors import stream_detectors
+from app.services.equipment import equipment_registry
+from app.services.latest import latest_readings
+from app.services.rollup import RollupService
 
 settings = get_settings()
 
+# Fixed hot-path statements, built once; values are supplied as bind params
+_READING_BY_ID = select(PowerReadingModel).where(PowerReadingModel.id == bindparam("reading_id"))
+
+# PowerReading schema fields, selected as plain columns for the fast list path
+_READING_COLUMNS = (
+    PowerReadingModel.voltage,
+    PowerReadingModel.current,
+    PowerReadingModel.frequency,
+    PowerReadingModel.power_factor,
+    EquipmentModel.equipment_id,
+    LocationModel.name.label("location"),
+    PowerReadingModel.id,
+    PowerReadingModel.timestamp,
+    PowerReadingModel.is_anomaly
+)
+
+AGGREGATE_FIELDS = ("voltage", "current", "frequency", "power_factor")
+AGGREGATE_STATS = ("count", "min", "max", "avg", "sum", "stddev", "p50", "p90", "p95", "p99")
+_BUCKET_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+_BUCKET_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+def parse_bucket_width(bucket: str) -> timedelta:
+    """Parse a bucket width such as '30s', '15m', '1h' or '1d'"""
+    match = re.fullmatch(r"(\d+)([smhd])", bucket.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid bucket width '{bucket}', expected e.g. 15m, 1h or 1d")
+    return timedelta(**{_BUCKET_UNITS[match.group(2)]: int(match.group(1))})
+
 class MonitoringService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_reading(self, reading: PowerReadingCreate) -> PowerReadingModel:
+    async def create_reading(self, reading: PowerReadingCreate) -> PowerReading:
         """Create a new power reading and check for anomalies"""
-        # Create new reading
-        db_reading = PowerReadingModel(
-            voltage=reading.voltage,
-            current=reading.current,
-            frequency=reading.frequency,
-            power_factor=reading.power_factor,
-            equipment_id=reading.equipment_id,
-            location=reading.location
+        item = (await self._ingest([reading]))[0]
+        await self.db.commit()
+
+        return PowerReading(
+            **reading.model_dump(),
+            id=item.id,
+            timestamp=item.timestamp,
+            is_anomaly=item.is_anomaly
         )
-        
-        # Check for anomalies and set flag
-        is_anomaly = self._check_anomalies(db_reading)
-        db_reading.is_anomaly = is_anomaly
-        
-        # Add to database
-        self.db.add(db_reading)
-        await self.db.flush()
-        
-        # Generate alert if anomaly detected
-        if is_anomaly:
-            await self._generate_alert(db_reading)
-        
+
+    async def create_readings(self, readings: List[PowerReadingCreate]) -> PowerReadingBatchResult:
+        """Create a batch of power readings and check them for anomalies"""
+        items = await self._ingest(readings)
         await self.db.commit()
-        return db_reading
-
-    # basically this is a safety checker
-    def _check_anomalies(self, reading: PowerReadingModel) -> bool:
-        """Check for anomalies in power readings"""
-        # Voltage check
-        if abs(reading.voltage - settings.ALERT_THRESHOLD_VOLTAGE) > 10:
-            return True
-        
-        # Current check
-        if reading.current > settings.ALERT_THRESHOLD_CURRENT:
-            return True
-        
-        # Frequency check (standard 50/60 Hz)
-        if not (45 <= reading.frequency <= 65):
-            return True
-        
-        return False
-
-    async def _generate_alert(self, reading: PowerReadingModel):
-        """Generate alert for anomalous reading"""
-        severity = self._determine_severity(reading)
-        
-        alert = AlertModel(
-            severity=severity,
-            message=f"Anomaly detected in {reading.equipment_id}",
-            description=self._generate_alert_description(reading),
-            power_reading_id=reading.id
+
+        return PowerReadingBatchResult(
+            created=len(items),
+            anomalies=sum(1 for item in items if item.is_anomaly),
+            results=items
         )
-        
-        self.db.add(alert)
-
-    def _determine_severity(self, reading: PowerReadingModel) -> AlertSeverity:
-        """Determine alert severity based on reading values"""
-        # Voltage deviation percentage
-        voltage_dev = abs(reading.voltage - settings.ALERT_THRESHOLD_VOLTAGE) / settings.ALERT_THRESHOLD_VOLTAGE * 100
-        
-        if voltage_dev > 20 or reading.current > settings.ALERT_THRESHOLD_CURRENT * 1.5:
-            return AlertSeverity.CRITICAL
-        elif voltage_dev > 15 or reading.current > settings.ALERT_THRESHOLD_CURRENT * 1.2:
-            return AlertSeverity.HIGH
-        elif voltage_dev > 10 or reading.current > settings.ALERT_THRESHOLD_CURRENT:
-            return AlertSeverity.MEDIUM
-        else:
-            return AlertSeverity.LOW
-
-    def _generate_alert_description(self, reading: PowerReadingModel) -> str:
-        """Generate detailed alert description"""
-        issues = []
-        
-        if abs(reading.voltage - settings.ALERT_THRESHOLD_VOLTAGE) > 10:
-            issues.append(f"Voltage deviation: {reading.voltage}V")
-        if reading.current > settings.ALERT_THRESHOLD_CURRENT:
-            issues.append(f"High current: {reading.current}A")
-        if not (45 <= reading.frequency <= 65):
-            issues.append(f"Frequency issue: {reading.frequency}Hz")
-            
-        return "Issues detected: " + "; ".join(issues)
+
+    async def _ingest(self, readings: List[PowerReadingCreate]) -> List[PowerReadingBatchItem]:
+        """Insert readings and the alerts derived from them without committing"""
+        if not readings:
+            return []
+
+        # Resolve per-equipment rules from the in-memory cache, then check
+        # the whole batch for anomalies in one vectorised pass per rule
+        await threshold_cache.ensure_loaded(self.db)
+        engines = [
+            threshold_cache.lookup(reading.equipment_id, reading.location)
+            for reading in readings
+        ]
+        evaluation = evaluate_with_engines(readings, engines)
+
+        # Then run the stateful per-equipment rules over the batch in order
+        if stream_detectors.enabled:
+            await stream_detectors.ensure_loaded(self.db)
+            stream_evaluation, observations = stream_detectors.evaluate(readings, engines)
+            evaluation = evaluation.merge(stream_evaluation)
+            after_commit(self.db, lambda: stream_detectors.record(observations))
+        # Readings store the registry's integer keys instead of the strings
+        keys = await equipment_registry.resolve(self.db, readings)
+        rows = []
+        for reading, (equipment_key, location_key), is_anomaly in zip(readings, keys, evaluation.is_anomaly.tolist()):
+            row = reading.model_dump(exclude={"equipment_id", "location"})
+            row["equipment_key"] = equipment_key
+            row["location_key"] = location_key
+            row["is_anomaly"] = is_anomaly
+            rows.append(row)
+
+        # Bulk insert; RETURNING rows come back in parameter order
+        result = await self.db.execute(
+            insert(PowerReadingModel).returning(
+                PowerReadingModel.id,
+                PowerReadingModel.timestamp,
+                sort_by_parameter_order=True
+            ),
+            rows
+        )
+        items = [
+            PowerReadingBatchItem(
+                index=index,
+                id=reading_id,
+                timestamp=timestamp,
+                is_anomaly=row["is_anomaly"]
+            )
+            for index, ((reading_id, timestamp), row) in enumerate(zip(result.all(), rows))
+        ]
+
+        after_commit(self.db, lambda: latest_readings.record(readings, items))
+
+        # Fold the batch into the 1m/1h/1d rollups in the same transaction
+        if settings.ROLLUPS_ENABLED:
+            await RollupService(self.db).apply(
+                readings,
+                [equipment_key for equipment_key, _ in keys],
+                [item.timestamp for item in items],
+                [item.is_anomaly for item in items]
+            )
+
+        # Generate alerts for anomalous readings
+        anomalous = [item for item in items if item.is_anomaly]
+        if anomalous:
+            alert_ids = await self._generate_alerts(anomalous, readings, evaluation)
+            for item, alert_id in zip(anomalous, alert_ids):
+                item.alert_id = alert_id
+
+        return items
+
+    async def _generate_alerts(
+        self,
+        anomalous: List[PowerReadingBatchItem],
+        readings: List[PowerReadingCreate],
+        evaluation: AnomalyResult
+    ) -> List[int]:
+        """Generate alerts for anomalous readings, returning the alert id of each.
+
+        Anomalies of the same incident (equipment, issues, severity) are
+        coalesced: one alert per incident carries an occurrence count and
+        last_seen, and repeats within ALERT_DEDUP_WINDOW_SECONDS of the
+        open alert update it instead of inserting a new one.
+        """
+        item_keys: List[IncidentKey] = []
+        incidents: Dict[IncidentKey, List[PowerReadingBatchItem]] = {}
+        for item in anomalous:
+            key = (
+                readings[item.index].equipment_id,
+                int(evaluation.issues[item.index]),
+                evaluation.severity_of(item.index)
+            )
+            item_keys.append(key)
+            incidents.setdefault(key, []).append(item)
+
+        alert_by_incident: Dict[IncidentKey, int] = {}
+        new_incidents = []  # (key, items, last_seen)
+        repeated = []  # (key, alert_id, occurrences, last_seen)
+        for key, items in incidents.items():
+            last_seen = max(item.timestamp for item in items)
+            open_alert_id = alert_deduplicator.match(key, items[0].timestamp)
+            if open_alert_id is None:
+                new_incidents.append((key, items, last_seen))
+            else:
+                alert_by_incident[key] = open_alert_id
+                repeated.append((key, open_alert_id, len(items), last_seen))
+
+        if repeated:
+            # Only unacknowledged alerts take repeats; one acknowledged by
+            # another worker matches no row and its incident opens a new alert
+            alerts = AlertModel.__table__
+            repeats = values(
+                column("alert_id", Integer),
+                column("occurrences", Integer),
+                column("seen", DateTime(timezone=True)),
+                name="repeats"
+            ).data([(alert_id, occurrences, last_seen) for _, alert_id, occurrences, last_seen in repeated])
+            result = await self.db.execute(
+                update(alerts).where(
+                    alerts.c.id == repeats.c.alert_id,
+                    alerts.c.is_acknowledged.is_not(True)
+                ).values(
+                    occurrence_count=alerts.c.occurrence_count + repeats.c.occurrences,
+                    last_seen=func.greatest(alerts.c.last_seen, repeats.c.seen)
+                ).returning(alerts.c.id)
+            )
+            updated = set(result.scalars().all())
+            for key, alert_id, _, last_seen in repeated:
+                if alert_id not in updated:
+                    del alert_by_incident[key]
+                    new_incidents.append((key, incidents[key], last_seen))
+            repeated = [repeat for repeat in repeated if repeat[1] in updated]
+
+        alert_rows = []
+        for (_, _, severity), items, last_seen in new_incidents:
+            item = items[0]
+            reading = readings[item.index]
+            alert_rows.append({
+                "severity": severity,
+                "message": f"Anomaly detected in {reading.equipment_id}",
+                "description": describe_issues(
+                    int(evaluation.issues[item.index]),
+                    reading.voltage,
+                    reading.current,
+                    reading.frequency,
+                    reading.power_factor
+                ),
+                "power_reading_id": item.id,
+                "equipment_id": reading.equipment_id,
+                "occurrence_count": len(items),
+                "last_seen": last_seen
+            })
+
+        events = []
+        if alert_rows:
+            result = await self.db.execute(
+                insert(AlertModel).returning(
+                    AlertModel.id,
+                    AlertModel.timestamp,
+                    sort_by_parameter_order=True
+                ),
+                alert_rows
+            )
+            for (alert_id, timestamp), alert_row, (key, _, _) in zip(result.all(), alert_rows, new_incidents):
+                alert_by_incident[key] = alert_id
+                events.append({
+                    "id": alert_id,
+                    "timestamp": timestamp.isoformat(),
+                    "severity": alert_row["severity"].value,
+                    "message": alert_row["message"],
+                    "description": alert_row["description"],
+                    "power_reading_id": alert_row["power_reading_id"],
+                    "equipment_id": alert_row["equipment_id"],
+                    "occurrence_count": alert_row["occurrence_count"]
+                })
+
+        # Publish, count and track incidents only once the alerts are committed
+        def on_commit():
+            alert_hub.publish(events)
+            alert_counters.record_created((row["severity"], row["equipment_id"]) for row in alert_rows)
+            for key, _, last_seen in new_incidents:
+                alert_deduplicator.record(key, alert_by_incident[key], last_seen)
+            for key, alert_id, occurrences, last_seen in repeated:
+                alert_deduplicator.record(key, alert_id, last_seen, occurrences)
+
+        after_commit(self.db, on_commit)
+        return [alert_by_incident[key] for key in item_keys]
 
     async def get_readings(
         self, 
         skip: int = 0, 
         limit: int = 100,
-        equipment_id: Optional[str] = None
+        equipment_id: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[PowerReadingModel]:
-        """Get list of power readings"""
-        query = select(PowerReadingModel)
-        
-        if equipment_id:
-            query = query.where(PowerReadingModel.equipment_id == equipment_id)
-            
-        query = query.offset(skip).limit(limit)
+        """Get list of power readings, newest first.
+
+        With a cursor the page starts after that (timestamp, id) position
+        and skip is ignored.
+        """
+        query = self._readings_page(
+            lambda_stmt(lambda: select(PowerReadingModel)), skip, limit, equipment_id, cursor
+        )
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_reading_rows(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        equipment_id: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], List[Row]]:
+        """Get the same page as get_readings as column names and plain Core rows"""
+        query = self._readings_page(
+            lambda_stmt(lambda: select(*_READING_COLUMNS).join_from(PowerReadingModel, EquipmentModel).join(LocationModel)),
+            skip, limit, equipment_id, cursor
+        )
+        result = await self.db.execute(query)
+        return list(result.keys()), result.all()
+
+    @staticmethod
+    def _readings_page(
+        query: StatementLambdaElement,
+        skip: int,
+        limit: int,
+        equipment_id: Optional[str],
+        cursor: Optional[str]
+    ) -> StatementLambdaElement:
+        # Each filter combination compiles once; values become bind params
+        if equipment_id:
+            query += lambda s: s.where(PowerReadingModel.equipment_key == select(EquipmentModel.id).where(
+                EquipmentModel.equipment_id == equipment_id
+            ).scalar_subquery())
+
+        if cursor:
+            timestamp, reading_id = decode_cursor(cursor)
+            query += lambda s: s.where(
+                tuple_(PowerReadingModel.timestamp, PowerReadingModel.id) < tuple_(timestamp, reading_id)
+            )
+        else:
+            query += lambda s: s.offset(skip)
+            
+        query += lambda s: s.order_by(
+            PowerReadingModel.timestamp.desc(),
+            PowerReadingModel.id.desc()
+        ).limit(limit)
+        return query
+
+    @staticmethod
+    def build_aggregate_query(
+        equipment_ids: List[str],
+        start: datetime,
+        end: datetime,
+        bucket: str,
+        stats: List[str],
+        fields: List[str]
+    ) -> Tuple[Select, List[str]]:
+        """Build the time-bucketed aggregation query and its column names"""
+        width = parse_bucket_width(bucket)
+        if end <= start:
+            raise ValueError("end must be after start")
+        if (end - start) / width > settings.AGGREGATE_MAX_BUCKETS:
+            raise ValueError(
+                f"Range spans more than {settings.AGGREGATE_MAX_BUCKETS} buckets, use a wider bucket"
+            )
+        for stat in stats:
+            if stat not in AGGREGATE_STATS:
+                raise ValueError(f"Unknown statistic '{stat}', expected one of {', '.join(AGGREGATE_STATS)}")
+        for field in fields:
+            if field not in AGGREGATE_FIELDS:
+                raise ValueError(f"Unknown field '{field}', expected one of {', '.join(AGGREGATE_FIELDS)}")
+
+        bucket_start = func.date_bin(
+            literal(width, Interval()),
+            PowerReadingModel.timestamp,
+            literal(_BUCKET_ORIGIN, DateTime(timezone=True))
+        )
+        columns = [
+            EquipmentModel.equipment_id.label("equipment_id"),
+            bucket_start.label("bucket")
+        ]
+        for field in fields:
+            column = getattr(PowerReadingModel, field)
+            for stat in stats:
+                if stat == "count":
+                    expression = func.count(column)
+                elif stat == "stddev":
+                    expression = func.stddev_samp(column)
+                elif stat.startswith("p"):
+                    expression = func.percentile_cont(int(stat[1:]) / 100).within_group(column)
+                else:
+                    expression = getattr(func, stat)(column)
+                columns.append(expression.label(f"{field}_{stat}"))
+
+        # Group by output column names so date_bin is not re-bound in GROUP BY
+        query = select(*columns).join_from(PowerReadingModel, EquipmentModel).where(
+            EquipmentModel.equipment_id.in_(equipment_ids),
+            PowerReadingModel.timestamp >= start,
+            PowerReadingModel.timestamp < end
+        ).group_by("equipment_id", "bucket").order_by("equipment_id", "bucket")
+
+        return query, [column.name for column in columns]
+
+    async def aggregate_readings(
+        self,
+        equipment_ids: List[str],
+        start: datetime,
+        end: datetime,
+        bucket: str = "1h",
+        stats: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, list]]:
+        """Aggregate readings per equipment and time bucket in SQL.
+
+        Results are streamed from the server in columnar chunks of at
+        most AGGREGATE_CHUNK_SIZE rows, so large ranges never sit in
+        memory at once.
+        """
+        query, names = self.build_aggregate_query(
+            equipment_ids, start, end, bucket, stats or ["avg"], fields or ["voltage"]
+        )
+        result = await self.db.stream(query)
+        async for rows in result.partitions(settings.AGGREGATE_CHUNK_SIZE):
+            columns = list(zip(*rows))
+            yield {name: list(values) for name, values in zip(names, columns)}
+
     async def get_reading(self, reading_id: int) -> Optional[PowerReadingModel]:
         """Get a specific power reading"""
-        query = select(PowerReadingModel).where(PowerReadingModel.id == reading_id)
-        result = await self.db.execute(query)
+        result = await self.db.execute(_READING_BY_ID, {"reading_id": reading_id})
         return result.scalar_one_or_none()
\ No newline at end of file
@@ -0,0 +1,179 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, text
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional
+import logging
+import re
+from app.core.config import get_settings
+from app.db import PowerReading as PowerReadingModel
+from app.db.session import engine
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "power_readings"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+ARCHIVE_SCHEMA = "archive"
+
+# Session-level advisory lock held while a process maintains partitions
+_MAINTENANCE_LOCK_KEY = 0x4F5450415254
+
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+@dataclass
+class Partition:
+    name: str
+    start: datetime
+    end: datetime
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the UTC day or month containing moment"""
+    moment = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        moment = moment.replace(day=1)
+    return moment
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def partition_name(start: datetime, interval: str) -> str:
+    suffix = start.strftime("%Y%m") if interval == "month" else start.strftime("%Y%m%d")
+    return f"{PARENT_TABLE}_p{suffix}"
+
+@asynccontextmanager
+async def partition_maintenance_lock() -> AsyncIterator[bool]:
+    """Yield whether this process may maintain partitions.
+
+    Creating partitions detaches and re-attaches the default partition and
+    retention detaches and drops partitions, so only one process at a time
+    runs them; the others skip the run instead of waiting for the lock.
+    """
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(select(func.pg_try_advisory_lock(_MAINTENANCE_LOCK_KEY)))
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.scalar(select(func.pg_advisory_unlock(_MAINTENANCE_LOCK_KEY)))
+
+class PartitionManager:
+    """Creates and retires the range partitions of power_readings.
+
+    Retention detaches whole partitions and drops them (or moves them to
+    the archive schema), which is O(1) regardless of row count and leaves
+    no dead tuples behind for vacuum.
+    """
+
+    def __init__(self, db: AsyncSession, interval: Optional[str] = None):
+        self.db = db
+        self.interval = interval or settings.PARTITION_INTERVAL
+        if self.interval not in ("day", "month"):
+            raise ValueError("PARTITION_INTERVAL must be 'day' or 'month'")
+
+    async def list_partitions(self) -> List[Partition]:
+        """Get the bounded partitions of power_readings, oldest first"""
+        result = await self.db.execute(text("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+        """), {"parent": PARENT_TABLE})
+
+        partitions = []
+        for name, bound in result.all():
+            match = _BOUND_PATTERN.search(bound or "")
+            if match:
+                partitions.append(Partition(
+                    name=name,
+                    start=datetime.fromisoformat(match.group(1)),
+                    end=datetime.fromisoformat(match.group(2))
+                ))
+        return sorted(partitions, key=lambda partition: partition.start)
+
+    async def ensure_partitions(self, ahead: Optional[int] = None) -> List[str]:
+        """Create the current partition, the next `ahead` ones and the default partition"""
+        ahead = settings.PARTITION_PREMAKE if ahead is None else ahead
+        existing = {partition.start for partition in await self.list_partitions()}
+        has_default = await self.db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION})
+
+        created = []
+        start = period_start(datetime.now(timezone.utc), self.interval)
+        for _ in range(ahead + 1):
+            end = next_period(start, self.interval)
+            if start not in existing:
+                name = partition_name(start, self.interval)
+                if has_default:
+                    await self._create_from_default(name, start, end)
+                else:
+                    await self._create(name, start, end)
+                created.append(name)
+            start = end
+
+        # Catches out-of-range timestamps instead of failing the insert
+        await self.db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF {PARENT_TABLE} DEFAULT'
+        ))
+        await self.db.commit()
+        return created
+
+    async def _create(self, name: str, start: datetime, end: datetime):
+        await self.db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+
+    async def _create_from_default(self, name: str, start: datetime, end: datetime):
+        """Create a partition, first moving its rows out of the default partition.
+
+        PostgreSQL refuses to create a partition whose range has rows in the
+        default partition. In one transaction the default is detached, the
+        partition created, the rows moved into it and the default re-attached.
+        """
+        in_range = f"timestamp >= '{start.isoformat()}' AND timestamp < '{end.isoformat()}'"
+        stray = await self.db.scalar(text(f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE {in_range})'))
+        if not stray:
+            await self._create(name, start, end)
+            return
+
+        columns = ", ".join(f'"{column.name}"' for column in PowerReadingModel.__table__.columns)
+        await self.db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{DEFAULT_PARTITION}"'))
+        await self._create(name, start, end)
+        result = await self.db.execute(text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range} RETURNING {columns}) '
+            f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+        ))
+        await self.db.execute(text(f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT'))
+        logger.info("Moved %s rows from %s into new partition %s", result.rowcount, DEFAULT_PARTITION, name)
+
+    async def apply_retention(
+        self,
+        retention_days: Optional[int] = None,
+        archive: Optional[bool] = None
+    ) -> List[str]:
+        """Detach and drop (or archive) partitions entirely older than the retention window"""
+        retention_days = settings.READINGS_RETENTION_DAYS if retention_days is None else retention_days
+        archive = settings.READINGS_RETENTION_ARCHIVE if archive is None else archive
+        if retention_days <= 0:
+            return []
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        expired = [p for p in await self.list_partitions() if p.end <= cutoff]
+        if archive and expired:
+            await self.db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+
+        for partition in expired:
+            await self.db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{partition.name}"'))
+            if archive:
+                # Detached tables keep the id default, which would pin the parent's sequence
+                await self.db.execute(text(f'ALTER TABLE "{partition.name}" ALTER COLUMN id DROP DEFAULT'))
+                await self.db.execute(text(f'ALTER TABLE "{partition.name}" SET SCHEMA {ARCHIVE_SCHEMA}'))
+            else:
+                await self.db.execute(text(f'DROP TABLE "{partition.name}"'))
+        await self.db.commit()
+
+        return [partition.name for partition in expired]
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from app.core.config import get_settings
+from app.db.session import engine
+from app.models import PollDevice, PowerReadingCreate
+from app.services.ingest import IngestWriter, ingest_writer
+from app.services.modbus import FUNCTION_CODES, ModbusClient, ModbusError, decode_value
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_DEVICES = TypeAdapter(List[PollDevice])
+
+# Session-level advisory lock held by the one worker that polls
+_LEADER_LOCK_KEY = 0x4F54504F4C4C
+
+def load_devices(path: str) -> List[PollDevice]:
+    """Read the device list, a JSON array of PollDevice objects"""
+    with open(path) as f:
+        return _DEVICES.validate_json(f.read())
+
+def check_devices(devices: List[PollDevice]):
+    """Reject device lists naming the same equipment twice"""
+    counts = Counter(device.equipment_id for device in devices)
+    duplicates = sorted(equipment_id for equipment_id, count in counts.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate equipment_id in device list: {', '.join(duplicates)}")
+
+@dataclass
+class DeviceStatus:
+    equipment_id: str
+    polls: int = 0
+    errors: int = 0
+    failures: int = 0  # consecutive, drives the retry backoff
+    last_polled: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+class DevicePoller:
+    """Polls Modbus TCP devices concurrently and feeds their readings to the ingest writer.
+
+    Every device runs its own loop on its interval (``default_interval``
+    unless the device sets one), paced by the event loop clock so slow
+    responses do not shift the cadence; first polls are spread over one
+    interval. Devices behind the same host:port share a connection. A
+    failing device is retried with doubling delays up to ``max_backoff``
+    seconds, and a device loop that crashes is logged and restarted.
+    Readings are queued on the IngestWriter, which writes them through
+    MonitoringService in batches, so polling many devices costs one
+    insert per batch rather than one request per reading.
+
+    With ``elect_leader`` only the worker holding a PostgreSQL advisory
+    lock polls; the others retry every ``leader_retry`` seconds and take
+    over when the leader's connection goes away.
+    """
+
+    def __init__(
+        self,
+        devices_file: str,
+        default_interval: float,
+        timeout: float,
+        max_backoff: float,
+        writer: IngestWriter,
+        elect_leader: bool = False,
+        leader_retry: float = 15.0
+    ):
+        self.devices_file = devices_file
+        self.default_interval = default_interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.writer = writer
+        self.elect_leader = elect_leader
+        self.leader_retry = leader_retry
+        self.devices: List[PollDevice] = []
+        self.statuses: Dict[str, DeviceStatus] = {}
+        self.is_leader = False
+        self.write_failures = 0
+        self._clients: Dict[Tuple[str, int], ModbusClient] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._device_tasks: List[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks + self._device_tasks)
+
+    def start(self, devices: Optional[List[PollDevice]] = None):
+        """Start polling ``devices``, by default those listed in devices_file"""
+        if self.is_running:
+            return
+        if devices is None:
+            devices = load_devices(self.devices_file) if self.devices_file else []
+        check_devices(devices)
+        self.devices = devices
+        self.statuses = {device.equipment_id: DeviceStatus(device.equipment_id) for device in devices}
+        if not devices:
+            return
+        if self.elect_leader:
+            self._tasks = [asyncio.create_task(self._lead())]
+        else:
+            self._start_polling()
+
+    async def stop(self):
+        """Stop polling; readings already queued are left to the ingest writer"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._stop_polling()
+
+    def _start_polling(self):
+        self._device_tasks = [asyncio.create_task(self._supervise(device)) for device in self.devices]
+        logger.info(
+            "Polling %d devices on %d endpoints",
+            len(self.devices), len({(device.host, device.port) for device in self.devices})
+        )
+
+    async def _stop_polling(self):
+        for task in self._device_tasks:
+            task.cancel()
+        await asyncio.gather(*self._device_tasks, return_exceptions=True)
+        self._device_tasks = []
+        for client in self._clients.values():
+            await client.close()
+        self._clients = {}
+
+    async def _lead(self):
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    if await conn.scalar(select(func.pg_try_advisory_lock(_LEADER_LOCK_KEY))):
+                        self.is_leader = True
+                        self._start_polling()
+                        try:
+                            # The lock lives as long as this connection; check it is still there
+                            while True:
+                                await asyncio.sleep(self.leader_retry)
+                                await conn.execute(select(1))
+                        finally:
+                            self.is_leader = False
+                            await self._stop_polling()
+                            # Returned to the pool the connection would keep the lock
+                            await conn.invalidate()
+                            logger.info("Gave up the poller lock")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Poller leader election failed", exc_info=True)
+            await asyncio.sleep(self.leader_retry)
+
+    def status(self) -> List[dict]:
+        return [asdict(status) for status in self.statuses.values()]
+
+    def _client(self, device: PollDevice) -> ModbusClient:
+        key = (device.host, device.port)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = ModbusClient(device.host, device.port, self.timeout)
+        return client
+
+    async def poll(self, device: PollDevice) -> PowerReadingCreate:
+        """Read one reading from a device with a single register request"""
+        block = device.block
+        registers = await self._client(device).read_registers(
+            device.unit_id, FUNCTION_CODES[device.register_type], block.start, len(block)
+        )
+        values = {}
+        for name, point in device.points.items():
+            offset = point.address - block.start
+            raw = decode_value(registers[offset:offset + point.width], point.data_type, device.word_order)
+            values[name] = raw * point.scale
+        return PowerReadingCreate(equipment_id=device.equipment_id, location=device.location, **values)
+
+    def retry_delay(self, interval: float, failures: int) -> float:
+        """Delay before retrying a device after ``failures`` consecutive failures"""
+        # The exponent is capped so long outages cannot overflow the float
+        return min(interval * 2 ** min(failures, 32), max(self.max_backoff, interval))
+
+    def _written(self, future: asyncio.Future):
+        # The ingest writer logs failed batches; retrieve the error and count it
+        if not future.cancelled() and future.exception() is not None:
+            self.write_failures += 1
+
+    async def _supervise(self, device: PollDevice):
+        interval = device.interval or self.default_interval
+        while True:
+            try:
+                await self._loop(device)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = self.statuses[device.equipment_id]
+                status.errors += 1
+                status.last_error = repr(e)
+                logger.exception("Polling loop of %s crashed, restarting", device.equipment_id)
+                await asyncio.sleep(interval)
+
+    async def _loop(self, device: PollDevice):
+        loop = asyncio.get_running_loop()
+        status = self.statuses[device.equipment_id]
+        interval = device.interval or self.default_interval
+        await asyncio.sleep(random.uniform(0, interval))
+        next_poll = loop.time()
+        while True:
+            try:
+                reading = await self.poll(device)
+            except (ModbusError, ValueError) as e:
+                # ValueError covers values the reading schema rejects
+                status.errors += 1
+                status.failures += 1
+                status.last_error = str(e)
+                if status.failures == 1:
+                    logger.warning("Polling %s failed: %s", device.equipment_id, e)
+                next_poll = loop.time() + self.retry_delay(interval, status.failures)
+            else:
+                if status.failures:
+                    logger.info("Polling %s recovered after %d failures", device.equipment_id, status.failures)
+                status.polls += 1
+                status.failures = 0
+                status.last_error = None
+                status.last_polled = datetime.now(timezone.utc)
+                # Waits while the writer's queue is full
+                future = await self.writer.submit(reading)
+                future.add_done_callback(self._written)
+
+                next_poll += interval
+                behind = loop.time() - next_poll
+                if behind > 0:
+                    # Skip the polls missed while busy rather than bursting to catch up
+                    next_poll += interval * (behind // interval + 1)
+            await asyncio.sleep(max(next_poll - loop.time(), 0))
+
+device_poller = DevicePoller(
+    devices_file=settings.POLLER_DEVICES_FILE,
+    default_interval=settings.POWER_READING_INTERVAL,
+    timeout=settings.POLLER_TIMEOUT_SECONDS,
+    max_backoff=settings.POLLER_MAX_BACKOFF_SECONDS,
+    writer=ingest_writer,
+    elect_leader=True,
+    leader_retry=settings.POLLER_LEADER_RETRY_SECONDS
+)
@@ -0,0 +1,196 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, literal
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from app.db import PowerReading as PowerReadingModel, Equipment as EquipmentModel, ReadingRollupMinute, ReadingRollupHour, ReadingRollupDay
+from app.models import PowerReadingCreate
+
+ROLLUP_FIELDS = ("voltage", "current", "frequency")
+
+# resolution -> (model, date_trunc unit)
+ROLLUP_TABLES = {
+    "1m": (ReadingRollupMinute, "minute"),
+    "1h": (ReadingRollupHour, "hour"),
+    "1d": (ReadingRollupDay, "day"),
+}
+
+def truncate_timestamp(timestamp: datetime, unit: str) -> datetime:
+    """Truncate a timestamp to the start of its UTC minute, hour or day"""
+    timestamp = timestamp.astimezone(timezone.utc)
+    if unit == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if unit == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class RollupService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(
+        self,
+        readings: Sequence[PowerReadingCreate],
+        equipment_keys: Sequence[int],
+        timestamps: Sequence[datetime],
+        anomalies: Sequence[bool]
+    ):
+        """Fold newly inserted readings into every rollup table (no commit)"""
+        for model, unit in ROLLUP_TABLES.values():
+            buckets: Dict[tuple, dict] = {}
+            for reading, equipment_key, timestamp, is_anomaly in zip(readings, equipment_keys, timestamps, anomalies):
+                key = (equipment_key, truncate_timestamp(timestamp, unit))
+                row = buckets.get(key)
+                if row is None:
+                    row = buckets[key] = {
+                        "equipment_key": key[0],
+                        "bucket_start": key[1],
+                        "count": 0,
+                        "anomaly_count": 0
+                    }
+                    for field in ROLLUP_FIELDS:
+                        value = getattr(reading, field)
+                        row.update({
+                            f"{field}_sum": 0.0,
+                            f"{field}_sumsq": 0.0,
+                            f"{field}_min": value,
+                            f"{field}_max": value
+                        })
+
+                row["count"] += 1
+                row["anomaly_count"] += int(is_anomaly)
+                for field in ROLLUP_FIELDS:
+                    value = getattr(reading, field)
+                    row[f"{field}_sum"] += value
+                    row[f"{field}_sumsq"] += value * value
+                    row[f"{field}_min"] = min(row[f"{field}_min"], value)
+                    row[f"{field}_max"] = max(row[f"{field}_max"], value)
+
+            # Consistent key order avoids deadlocks between concurrent writers
+            # Executemany of one statement, so the compiled upsert is cached
+            # instead of a new multi-VALUES statement per batch shape
+            rows = [buckets[key] for key in sorted(buckets)]
+            await self.db.execute(self._upsert(model), rows)
+
+    @staticmethod
+    def _upsert(model):
+        stmt = insert(model)
+        excluded = stmt.excluded
+        merged = {
+            "count": model.count + excluded.count,
+            "anomaly_count": model.anomaly_count + excluded.anomaly_count
+        }
+        for field in ROLLUP_FIELDS:
+            merged.update({
+                f"{field}_sum": getattr(model, f"{field}_sum") + getattr(excluded, f"{field}_sum"),
+                f"{field}_sumsq": getattr(model, f"{field}_sumsq") + getattr(excluded, f"{field}_sumsq"),
+                f"{field}_min": func.least(getattr(model, f"{field}_min"), getattr(excluded, f"{field}_min")),
+                f"{field}_max": func.greatest(getattr(model, f"{field}_max"), getattr(excluded, f"{field}_max"))
+            })
+        return stmt.on_conflict_do_update(
+            index_elements=[model.equipment_key, model.bucket_start],
+            set_=merged
+        )
+
+    async def rebuild(
+        self,
+        start: datetime,
+        end: datetime,
+        resolutions: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """Recompute rollups from power_readings one UTC day at a time.
+
+        The range is widened to whole days. Rebuilding a period that is
+        still receiving readings can lose concurrent increments, so
+        backfills should stop at the start of the current day.
+        """
+        resolutions = resolutions or list(ROLLUP_TABLES)
+        day = truncate_timestamp(start, "day")
+        last_day = truncate_timestamp(end, "day")
+        if last_day < end:
+            last_day += timedelta(days=1)
+        written = {resolution: 0 for resolution in resolutions}
+
+        while day < last_day:
+            next_day = day + timedelta(days=1)
+            for resolution in resolutions:
+                model, unit = ROLLUP_TABLES[resolution]
+                await self.db.execute(
+                    delete(model).where(model.bucket_start >= day, model.bucket_start < next_day)
+                )
+                result = await self.db.execute(self._backfill(model, unit, day, next_day))
+                written[resolution] += result.rowcount
+            await self.db.commit()
+            day = next_day
+
+        return written
+
+    @staticmethod
+    def _backfill(model, unit: str, start: datetime, end: datetime):
+        columns = [
+            PowerReadingModel.equipment_key.label("equipment_key"),
+            func.date_trunc(unit, PowerReadingModel.timestamp, literal("UTC")).label("bucket_start"),
+            func.count().label("count"),
+            func.count().filter(PowerReadingModel.is_anomaly == True).label("anomaly_count")  # noqa: E712
+        ]
+        for field in ROLLUP_FIELDS:
+            column = getattr(PowerReadingModel, field)
+            columns += [
+                func.sum(column).label(f"{field}_sum"),
+                func.sum(column * column).label(f"{field}_sumsq"),
+                func.min(column).label(f"{field}_min"),
+                func.max(column).label(f"{field}_max")
+            ]
+
+        query = select(*columns).where(
+            PowerReadingModel.timestamp >= start,
+            PowerReadingModel.timestamp < end
+        ).group_by("equipment_key", "bucket_start")
+
+        return insert(model).from_select([column.name for column in columns], query)
+
+    async def get_rollups(
+        self,
+        equipment_ids: List[str],
+        start: datetime,
+        end: datetime,
+        resolution: str = "1h",
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, list]:
+        """Get rollup statistics as columns (count, avg, min, max, stddev per field)"""
+        if resolution not in ROLLUP_TABLES:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {', '.join(ROLLUP_TABLES)}")
+        fields = fields or list(ROLLUP_FIELDS)
+        for field in fields:
+            if field not in ROLLUP_FIELDS:
+                raise ValueError(f"Unknown field '{field}', expected one of {', '.join(ROLLUP_FIELDS)}")
+
+        model, _ = ROLLUP_TABLES[resolution]
+        columns = [
+            EquipmentModel.equipment_id.label("equipment_id"),
+            model.bucket_start.label("bucket"),
+            model.count.label("count"),
+            model.anomaly_count.label("anomaly_count")
+        ]
+        for field in fields:
+            total = getattr(model, f"{field}_sum")
+            squares = getattr(model, f"{field}_sumsq")
+            variance = (squares - total * total / model.count) / func.nullif(model.count - 1, 0)
+            columns += [
+                (total / model.count).label(f"{field}_avg"),
+                getattr(model, f"{field}_min").label(f"{field}_min"),
+                getattr(model, f"{field}_max").label(f"{field}_max"),
+                # Rounding can push the variance of a flat signal just below zero
+                func.sqrt(case((variance > 0, variance), else_=0.0)).label(f"{field}_stddev")
+            ]
+
+        query = select(*columns).join_from(model, EquipmentModel).where(
+            EquipmentModel.equipment_id.in_(equipment_ids),
+            model.bucket_start >= start,
+            model.bucket_start < end
+        ).order_by(EquipmentModel.equipment_id, model.bucket_start)
+
+        result = await self.db.execute(query)
+        rows = result.all()
+        names = [column.name for column in columns]
+        return {name: [row[i] for row in rows] for i, name in enumerate(names)}
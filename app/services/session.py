@@ -1,10 +1,24 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, delete
+from sqlalchemy import select, update, and_, or_, delete, bindparam
+from sqlalchemy.orm import contains_eager
 from datetime import datetime, timedelta, timezone
 from app.db import Session, User
+from app.core.config import get_settings
+from app.core.token_cache import token_cache, token_revocations
+from app.services.session_store import session_store
 from typing import Optional, List
 from fastapi import Request
 
+settings = get_settings()
+
+_ACTIVE_SESSION_BY_TOKEN = select(Session).where(
+    and_(
+        Session.token == bindparam("token"),
+        Session.is_active == True,  # noqa: E712
+        Session.expires_at > bindparam("now")
+    )
+).join(Session.user).options(contains_eager(Session.user))
+
 class SessionService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -65,6 +79,9 @@ class SessionService:
         if session:
             session.is_active = False
             await self.db.commit()
+            await session_store.invalidate(token)
+            token_revocations.revoke(token)
+            token_cache.invalidate(token)
             return True
         return False
 
@@ -72,54 +89,86 @@ class SessionService:
         self,
         user_id: int,
         current_token: Optional[str] = None
-    ):
+    ) -> int:
         """Invalidate all sessions for a user except current"""
-        query = select(Session).where(
+        query = update(Session).where(
             and_(
                 Session.user_id == user_id,
                 Session.is_active == True,  # noqa: E712
                 Session.token != current_token if current_token else True
             )
-        )
+        ).values(is_active=False).returning(Session.token)
         result = await self.db.execute(query)
-        sessions = result.scalars().all()
-        
-        for session in sessions:
-            session.is_active = False
+        revoked = result.scalars().all()
         
         await self.db.commit()
+        await session_store.invalidate_user(user_id, current_token)
+        for token in revoked:
+            token_revocations.revoke(token)
+            token_cache.invalidate(token)
+        return len(revoked)
 
-    async def cleanup_expired_sessions(self):
-        """Clean up expired sessions"""
-        query = delete(Session).where(
-            or_(
-                Session.expires_at < datetime.now(timezone.utc),
-                Session.is_active == False  # noqa: E712
+    async def cleanup_expired_sessions(self, batch_size: int = 1000) -> int:
+        """Delete expired and inactive sessions in batches, committing after each.
+
+        Each batch locks at most batch_size rows and skips rows locked by
+        other transactions, so the sweep never blocks logins for long.
+        Inactive sessions are kept until their access tokens have expired,
+        so every worker can still learn that they were revoked.
+        """
+        purged = 0
+        while True:
+            now = datetime.now(timezone.utc)
+            batch = select(Session.id).where(
+                or_(
+                    Session.expires_at < now,
+                    and_(
+                        Session.is_active == False,  # noqa: E712
+                        Session.last_activity < now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+                    )
+                )
+            ).limit(batch_size).with_for_update(skip_locked=True)
+            result = await self.db.execute(delete(Session).where(Session.id.in_(batch)))
+            await self.db.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+
+    async def get_revoked_tokens(self, since: datetime) -> List[str]:
+        """Tokens of sessions ended since the given time, by any worker"""
+        result = await self.db.execute(
+            select(Session.token).where(
+                and_(
+                    Session.is_active == False,  # noqa: E712
+                    Session.last_activity >= since
+                )
             )
         )
-        await self.db.execute(query)
-        await self.db.commit()
+        return result.scalars().all()
 
     async def validate_session(
         self,
         token: str
     ) -> Optional[User]:
-        """Validate a session and return the user"""
-        query = select(Session).where(
-            and_(
-                Session.token == token,
-                Session.is_active == True,  # noqa: E712
-                Session.expires_at > datetime.now(timezone.utc)
-            )
-        ).join(Session.user)
-        
-        result = await self.db.execute(query)
+        """Validate a session and return the user.
+
+        Served from the session store when possible; last_activity is
+        recorded there and written to the database in batches.
+        """
+        record = await session_store.get(token)
+        if record is not None:
+            session_store.touch(record.id)
+            return record.user
+
+        result = await self.db.execute(
+            _ACTIVE_SESSION_BY_TOKEN,
+            {"token": token, "now": datetime.now(timezone.utc)}
+        )
         session = result.scalar_one_or_none()
         
         if session:
-            # Update last activity
-            session.last_activity = datetime.now(timezone.utc)
-            await self.db.commit()
-            return session.user
+            record = await session_store.put(session)
+            session_store.touch(record.id)
+            return record.user
         
         return None
\ No newline at end of file
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+from sqlalchemy import update
+from app.db import Session, User
+from app.db.session import AsyncSessionLocal
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SessionRecord:
+    """An active session as held in the store, with a detached copy of its user"""
+    id: int
+    user_id: int
+    token: str
+    expires_at: datetime
+    user: User
+    cached_at: float
+
+    @classmethod
+    def from_session(cls, session: Session) -> "SessionRecord":
+        user = session.user
+        return cls(
+            id=session.id,
+            user_id=session.user_id,
+            token=session.token,
+            expires_at=session.expires_at,
+            user=User(
+                id=user.id,
+                email=user.email,
+                username=user.username,
+                role=user.role,
+                is_active=user.is_active
+            ),
+            cached_at=time.monotonic()
+        )
+
+class SessionBackend(ABC):
+    """Storage for cached sessions.
+
+    The default backend is local to the process. Implement this interface
+    over a shared store (e.g. Redis) so several uvicorn workers see each
+    other's invalidations immediately instead of after the cache TTL.
+    """
+
+    @abstractmethod
+    async def get(self, token: str) -> Optional[SessionRecord]:
+        ...
+
+    @abstractmethod
+    async def set(self, record: SessionRecord):
+        ...
+
+    @abstractmethod
+    async def delete(self, token: str):
+        ...
+
+    @abstractmethod
+    async def delete_user(self, user_id: int, keep_token: Optional[str] = None):
+        """Remove all of a user's sessions except keep_token"""
+
+class MemorySessionBackend(SessionBackend):
+    """Per-process LRU of sessions indexed by token and by user id"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._by_token: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+
+    async def get(self, token: str) -> Optional[SessionRecord]:
+        record = self._by_token.get(token)
+        if record is not None:
+            self._by_token.move_to_end(token)
+        return record
+
+    async def set(self, record: SessionRecord):
+        self._by_token[record.token] = record
+        self._by_token.move_to_end(record.token)
+        self._by_user.setdefault(record.user_id, set()).add(record.token)
+        while len(self._by_token) > self.max_size:
+            _, evicted = self._by_token.popitem(last=False)
+            self._forget_user_token(evicted.user_id, evicted.token)
+
+    async def delete(self, token: str):
+        record = self._by_token.pop(token, None)
+        if record is not None:
+            self._forget_user_token(record.user_id, token)
+
+    async def delete_user(self, user_id: int, keep_token: Optional[str] = None):
+        for token in list(self._by_user.get(user_id, ())):
+            if token != keep_token:
+                await self.delete(token)
+
+    def _forget_user_token(self, user_id: int, token: str):
+        tokens = self._by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[user_id]
+
+class SessionStore:
+    """Read-through cache of active sessions with write-behind activity tracking.
+
+    Cached sessions are trusted for at most ``ttl`` seconds before being
+    re-read from the database, which bounds how long an invalidation made
+    by another worker can go unnoticed with a per-process backend.
+    ``last_activity`` updates are coalesced per session and written in a
+    single batch every ``flush_interval`` seconds.
+    """
+
+    def __init__(self, backend: SessionBackend, ttl: float, flush_interval: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, token: str) -> Optional[SessionRecord]:
+        """Get a cached session that is still fresh and unexpired"""
+        record = await self.backend.get(token)
+        if record is None:
+            return None
+        if (
+            time.monotonic() - record.cached_at > self.ttl
+            or record.expires_at <= datetime.now(timezone.utc)
+        ):
+            await self.backend.delete(token)
+            return None
+        return record
+
+    async def put(self, session: Session) -> SessionRecord:
+        """Cache an active session; its user must already be loaded"""
+        record = SessionRecord.from_session(session)
+        await self.backend.set(record)
+        return record
+
+    async def invalidate(self, token: str):
+        await self.backend.delete(token)
+
+    async def invalidate_user(self, user_id: int, keep_token: Optional[str] = None):
+        await self.backend.delete_user(user_id, keep_token)
+
+    def touch(self, session_id: int):
+        """Record activity on a session; written on the next flush"""
+        self._pending[session_id] = datetime.now(timezone.utc)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write coalesced last_activity updates in one statement"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Session),
+                    [{"id": session_id, "last_activity": at} for session_id, at in pending.items()]
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to flush activity for %d sessions", len(pending))
+            # Keep newer touches that arrived while flushing
+            for session_id, at in pending.items():
+                self._pending.setdefault(session_id, at)
+            return 0
+        return len(pending)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write any remaining activity"""
+        if self.is_running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+session_store = SessionStore(
+    backend=MemorySessionBackend(max_size=settings.SESSION_CACHE_SIZE),
+    ttl=settings.SESSION_CACHE_TTL_SECONDS,
+    flush_interval=settings.SESSION_ACTIVITY_FLUSH_SECONDS
+)
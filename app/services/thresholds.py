@@ -0,0 +1,203 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from fnmatch import fnmatchcase
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.db import ThresholdProfile as ThresholdProfileModel
+from app.models import ThresholdProfileCreate, ThresholdProfileUpdate
+from app.core.config import get_settings
+from app.services.anomaly import AnomalyEngine
+
+settings = get_settings()
+
+class ThresholdRuleCache:
+    """Compiled per-equipment anomaly rules built from threshold profiles.
+
+    Profiles are loaded from the database once; after that resolving the
+    rule for a reading is a dict lookup keyed by (equipment_id, location).
+    Changes made through this worker invalidate the cache directly;
+    ``refresh`` picks up changes made through other workers.
+    """
+
+    def __init__(self, default_engine: AnomalyEngine):
+        self.default_engine = default_engine
+        self._by_equipment: Optional[Dict[str, AnomalyEngine]] = None
+        self._patterns: List[Tuple[str, AnomalyEngine]] = []
+        self._rules: Dict[Tuple[str, str], AnomalyEngine] = {}
+        # (id, updated_at) of every profile at the last load, active or not
+        self._version: Optional[Tuple[Tuple[int, datetime], ...]] = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._by_equipment is not None
+
+    async def load(self, db: AsyncSession):
+        """Load active profiles and compile them into engines"""
+        generation = self._generation
+        query = select(ThresholdProfileModel).order_by(
+            ThresholdProfileModel.priority.desc(),
+            ThresholdProfileModel.id
+        ).execution_options(populate_existing=True)  # profiles the session already holds may be stale
+        result = await db.execute(query)
+        profiles = result.scalars().all()
+
+        by_equipment = {}
+        patterns = []
+        for profile in profiles:
+            if not profile.is_active:
+                continue
+            engine = self._compile(profile)
+            if profile.equipment_id is not None:
+                by_equipment[profile.equipment_id] = engine
+            else:
+                patterns.append((profile.location_pattern, engine))
+
+        # A profile update raced with this load; leave the cache for the next caller
+        if generation != self._generation:
+            return
+
+        self._by_equipment = by_equipment
+        self._patterns = patterns
+        self._rules = {}
+        self._version = tuple(sorted((profile.id, profile.updated_at) for profile in profiles))
+        self.loads += 1
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self.is_loaded:
+            await self.load(db)
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Reload if any profile was created, changed or deleted since the last load; returns 1 if reloaded"""
+        if not self.is_loaded:
+            return 0
+        result = await db.execute(
+            select(ThresholdProfileModel.id, ThresholdProfileModel.updated_at).order_by(ThresholdProfileModel.id)
+        )
+        if tuple(tuple(row) for row in result.all()) == self._version:
+            return 0
+        await self.load(db)
+        return 1
+
+    def lookup(self, equipment_id: str, location: str) -> AnomalyEngine:
+        """Return the compiled rule for a piece of equipment"""
+        key = (equipment_id, location)
+        engine = self._rules.get(key)
+        if engine is not None:
+            self.hits += 1
+            return engine
+
+        self.misses += 1
+        engine = self._resolve(equipment_id, location)
+        self._rules[key] = engine
+        return engine
+
+    def invalidate(self):
+        """Drop compiled rules; the next ingest reloads profiles"""
+        self._generation += 1
+        self._by_equipment = None
+        self._patterns = []
+        self._rules = {}
+        self._version = None
+        self.invalidations += 1
+
+    def stats(self) -> Dict:
+        return {
+            "loaded": self.is_loaded,
+            "profiles": len(self._by_equipment or {}) + len(self._patterns),
+            "compiled_rules": len(self._rules),
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "invalidations": self.invalidations
+        }
+
+    def _resolve(self, equipment_id: str, location: str) -> AnomalyEngine:
+        engine = (self._by_equipment or {}).get(equipment_id)
+        if engine is not None:
+            return engine
+        for pattern, engine in self._patterns:
+            if fnmatchcase(location, pattern):
+                return engine
+        return self.default_engine
+
+    @staticmethod
+    def _compile(profile: ThresholdProfileModel) -> AnomalyEngine:
+        return AnomalyEngine(
+            voltage_nominal=profile.voltage_nominal,
+            current_limit=profile.current_limit,
+            voltage_tolerance=profile.voltage_tolerance,
+            frequency_min=profile.frequency_min,
+            frequency_max=profile.frequency_max,
+            power_factor_min=profile.power_factor_min
+        )
+
+threshold_cache = ThresholdRuleCache(AnomalyEngine.from_settings(settings))
+
+class ThresholdProfileService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_profiles(self) -> List[ThresholdProfileModel]:
+        """Get all threshold profiles"""
+        query = select(ThresholdProfileModel).order_by(
+            ThresholdProfileModel.priority.desc(),
+            ThresholdProfileModel.id
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def create_profile(self, profile: ThresholdProfileCreate) -> ThresholdProfileModel:
+        """Create a threshold profile"""
+        if profile.equipment_id is not None:
+            query = select(ThresholdProfileModel).where(
+                ThresholdProfileModel.equipment_id == profile.equipment_id
+            )
+            result = await self.db.execute(query)
+            if result.scalar_one_or_none():
+                raise ValueError(f"A profile for {profile.equipment_id} already exists")
+
+        db_profile = ThresholdProfileModel(**profile.model_dump())
+        self.db.add(db_profile)
+        await self.db.commit()
+        await self.db.refresh(db_profile)
+
+        threshold_cache.invalidate()
+        return db_profile
+
+    async def update_profile(
+        self,
+        profile_id: int,
+        update: ThresholdProfileUpdate
+    ) -> Optional[ThresholdProfileModel]:
+        """Update a threshold profile"""
+        db_profile = await self.db.get(ThresholdProfileModel, profile_id)
+        if db_profile is None:
+            return None
+
+        for field, value in update.model_dump(exclude_unset=True).items():
+            setattr(db_profile, field, value)
+        if db_profile.frequency_min > db_profile.frequency_max:
+            raise ValueError("frequency_min must not exceed frequency_max")
+
+        await self.db.commit()
+        await self.db.refresh(db_profile)
+
+        threshold_cache.invalidate()
+        return db_profile
+
+    async def delete_profile(self, profile_id: int) -> bool:
+        """Delete a threshold profile"""
+        db_profile = await self.db.get(ThresholdProfileModel, profile_id)
+        if db_profile is None:
+            return False
+
+        await self.db.delete(db_profile)
+        await self.db.commit()
+
+        threshold_cache.invalidate()
+        return True
@@ -0,0 +1,100 @@
+"""Compare the vectorised AnomalyEngine with the former per-row checks.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_anomaly
+"""
+import os
+import time
+
+import numpy as np
+
+for key, value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from app.services.anomaly import AnomalyEngine  # noqa: E402
+
+VOLTAGE = 230.0
+CURRENT = 100.0
+SIZES = (1, 1_000, 1_000_000)
+
+class Reading:
+    __slots__ = ("voltage", "current", "frequency", "power_factor", "equipment_id")
+
+    def __init__(self, voltage, current, frequency, power_factor):
+        self.voltage = voltage
+        self.current = current
+        self.frequency = frequency
+        self.power_factor = power_factor
+        self.equipment_id = "TX-1"
+
+def legacy_check(reading):
+    """Per-row logic of the former _check_anomalies / _determine_severity / _generate_alert_description"""
+    if not (
+        abs(reading.voltage - VOLTAGE) > 10
+        or reading.current > CURRENT
+        or not (45 <= reading.frequency <= 65)
+    ):
+        return None
+
+    voltage_dev = abs(reading.voltage - VOLTAGE) / VOLTAGE * 100
+    if voltage_dev > 20 or reading.current > CURRENT * 1.5:
+        severity = "critical"
+    elif voltage_dev > 15 or reading.current > CURRENT * 1.2:
+        severity = "high"
+    elif voltage_dev > 10 or reading.current > CURRENT:
+        severity = "medium"
+    else:
+        severity = "low"
+
+    issues = []
+    if abs(reading.voltage - VOLTAGE) > 10:
+        issues.append(f"Voltage deviation: {reading.voltage}V")
+    if reading.current > CURRENT:
+        issues.append(f"High current: {reading.current}A")
+    if not (45 <= reading.frequency <= 65):
+        issues.append(f"Frequency issue: {reading.frequency}Hz")
+    return severity, "Issues detected: " + "; ".join(issues)
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    rng = np.random.default_rng(42)
+    engine = AnomalyEngine(voltage_nominal=VOLTAGE, current_limit=CURRENT)
+
+    print(f"{'readings':>10} {'legacy':>12} {'engine(obj)':>12} {'engine(col)':>12} {'speedup':>8}")
+    for size in SIZES:
+        voltage = rng.normal(VOLTAGE, 8, size)
+        current = rng.normal(70, 20, size)
+        frequency = rng.normal(50, 5, size)
+        power_factor = rng.uniform(0.7, 1.0, size)
+        readings = [
+            Reading(v, c, f, p)
+            for v, c, f, p in zip(voltage.tolist(), current.tolist(), frequency.tolist(), power_factor.tolist())
+        ]
+        repeat = 1 if size >= 1_000_000 else 20
+
+        legacy = timed(lambda: [legacy_check(r) for r in readings], repeat)
+        from_objects = timed(lambda: engine.evaluate_readings(readings), repeat)
+        columnar = timed(lambda: engine.evaluate(voltage, current, frequency, power_factor), repeat)
+
+        print(
+            f"{size:>10} {legacy * 1e3:>10.3f}ms {from_objects * 1e3:>10.3f}ms "
+            f"{columnar * 1e3:>10.3f}ms {legacy / columnar:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
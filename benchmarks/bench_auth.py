@@ -0,0 +1,47 @@
+"""Measure per-request token verification cost with and without the claims cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_auth
+"""
+import asyncio
+import os
+import time
+
+for key, value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from app.core.security import create_access_token, get_current_user_role  # noqa: E402
+from app.core.token_cache import token_cache  # noqa: E402
+
+REQUESTS = 20_000
+TOKENS = (1, 100, 1_000)
+
+async def run(tokens, cached: bool) -> float:
+    token_cache.clear()
+    token_cache.max_size = 10_000 if cached else 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        await get_current_user_role(tokens[i % len(tokens)])
+    return time.perf_counter() - start
+
+def main():
+    print(f"{'tokens':>8} {'decode':>12} {'cached':>12} {'speedup':>8}")
+    for count in TOKENS:
+        tokens = [create_access_token({"sub": f"user-{i}", "role": "operator"}) for i in range(count)]
+        uncached = asyncio.run(run(tokens, cached=False))
+        cached = asyncio.run(run(tokens, cached=True))
+        print(
+            f"{count:>8} {uncached / REQUESTS * 1e6:>10.2f}us {cached / REQUESTS * 1e6:>10.2f}us "
+            f"{uncached / cached:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
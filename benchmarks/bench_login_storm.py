@@ -0,0 +1,77 @@
+"""Measure ingest latency on the event loop while 50 logins hash passwords.
+
+An ingest loop evaluates a small batch of readings every 10 ms and
+records how late each tick runs. The same login storm is run with
+bcrypt called inline (as before) and on the password hashing pool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_login_storm
+"""
+import asyncio
+import os
+import time
+
+import numpy as np
+
+for key, value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from app.core.security import get_password_hash, verify_password, verify_password_async  # noqa: E402
+from app.services.anomaly import AnomalyEngine  # noqa: E402
+
+LOGINS = 50
+TICK = 0.010
+BATCH = 500
+
+async def ingest(stop: asyncio.Event, latencies: list):
+    rng = np.random.default_rng(1)
+    engine = AnomalyEngine(voltage_nominal=230.0, current_limit=100.0)
+    voltage = rng.normal(230, 8, BATCH)
+    current = rng.normal(70, 20, BATCH)
+    frequency = rng.normal(50, 5, BATCH)
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        scheduled = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        engine.evaluate(voltage, current, frequency)
+        latencies.append(loop.time() - scheduled)
+
+async def login_inline(hashed: str):
+    await asyncio.sleep(0)
+    verify_password("correct horse", hashed)
+
+async def login_pooled(hashed: str):
+    await verify_password_async("correct horse", hashed)
+
+async def scenario(login, hashed: str):
+    stop = asyncio.Event()
+    latencies: list = []
+    task = asyncio.create_task(ingest(stop, latencies))
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    if login is not None:
+        await asyncio.gather(*(login(hashed) for _ in range(LOGINS)))
+    else:
+        await asyncio.sleep(2)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return elapsed, np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3, max(latencies) * 1e3
+
+def main():
+    hashed = get_password_hash("correct horse")
+    print(f"{'scenario':>16} {'logins took':>12} {'ingest p50':>11} {'ingest p99':>11} {'worst':>10}")
+    for name, login in (("idle", None), ("inline bcrypt", login_inline), ("hashing pool", login_pooled)):
+        elapsed, p50, p99, worst = asyncio.run(scenario(login, hashed))
+        print(f"{name:>16} {elapsed:>11.2f}s {p50:>9.2f}ms {p99:>9.2f}ms {worst:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
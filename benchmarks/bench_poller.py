@@ -0,0 +1,135 @@
+"""Poll simulated Modbus TCP meters and compare direct ingest with re-POSTing.
+
+Requires the database configured in .env / the environment. Starts
+--endpoints local Modbus TCP simulators with --devices meters spread over
+them, then for each mode polls every meter on --interval for --seconds:
+
+- direct: the built-in DevicePoller, readings batched by the ingest writer
+- repost: the same Modbus reads, each reading sent to POST /readings/ the
+  way an external scraper would (in-process over ASGI, so it understates
+  the real network hop)
+
+and reports readings written per second and process CPU per reading
+(simulators included, so compare the modes rather than the absolutes).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_poller [--devices 500] [--endpoints 5] [--interval 1] [--seconds 10]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import monitoring
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.db.session import engine
+from app.models import PollDevice
+from app.services.ingest import IngestWriter
+from app.services.poller import DevicePoller
+from tests.modbus_sim import ModbusSimulator
+
+settings = get_settings()
+
+async def start_simulators(endpoints: int, devices: int, interval: float):
+    simulators = []
+    ports = []
+    for _ in range(endpoints):
+        simulator = ModbusSimulator()
+        ports.append(await simulator.start())
+        simulators.append(simulator)
+
+    meters = []
+    for i in range(devices):
+        simulator_index = i % endpoints
+        unit_id = i // endpoints + 1
+        simulator = simulators[simulator_index]
+        simulator.set_value(unit_id, 0, random.gauss(230, 2))
+        simulator.set_value(unit_id, 2, random.uniform(5, 90))
+        simulator.set_value(unit_id, 4, 5000, "uint16")
+        simulator.set_value(unit_id, 5, 95, "int16")
+        meters.append(PollDevice(
+            equipment_id=f"SIM-{i:05d}",
+            location=f"SIM-SUBSTATION-{simulator_index}",
+            host="127.0.0.1",
+            port=ports[simulator_index],
+            unit_id=unit_id,
+            interval=interval,
+            voltage={"address": 0},
+            current={"address": 2},
+            frequency={"address": 4, "data_type": "uint16", "scale": 0.01},
+            power_factor={"address": 5, "data_type": "int16", "scale": 0.01}
+        ))
+    return simulators, meters
+
+async def run_direct(meters, interval: float, seconds: float) -> int:
+    writer = IngestWriter(
+        max_queue=settings.INGEST_QUEUE_SIZE,
+        batch_size=settings.INGEST_BATCH_SIZE,
+        flush_interval=settings.INGEST_FLUSH_INTERVAL_MS / 1000
+    )
+    poller = DevicePoller("", interval, settings.POLLER_TIMEOUT_SECONDS, settings.POLLER_MAX_BACKOFF_SECONDS, writer)
+    writer.start()
+    poller.start(meters)
+    await asyncio.sleep(seconds)
+    await poller.stop()
+    await writer.stop()
+    return sum(status["polls"] for status in poller.status()) - poller.write_failures
+
+async def run_repost(meters, interval: float, seconds: float) -> int:
+    app = FastAPI()
+    app.include_router(monitoring.router)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench", "role": "operator"})}
+    poller = DevicePoller("", interval, settings.POLLER_TIMEOUT_SECONDS, settings.POLLER_MAX_BACKOFF_SECONDS, None)
+    written = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        deadline = time.perf_counter() + seconds
+        # A scraper keeps its POSTs within what the server's pool can serve
+        in_flight = asyncio.Semaphore(settings.DB_POOL_SIZE)
+
+        async def scrape(meter: PollDevice):
+            nonlocal written
+            await asyncio.sleep(random.uniform(0, interval))
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                reading = await poller.poll(meter)
+                async with in_flight:
+                    response = await http.post("/readings/", json=reading.model_dump(), headers=headers)
+                if response.status_code == 200:
+                    written += 1
+                await asyncio.sleep(max(interval - (time.perf_counter() - started), 0))
+
+        # Let in-flight requests finish; cancelling them mid-query stalls the pool
+        await asyncio.gather(*(scrape(meter) for meter in meters))
+    await poller.stop()
+    return written
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--endpoints", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    simulators, meters = await start_simulators(args.endpoints, args.devices, args.interval)
+    target = args.devices / args.interval
+    print(f"{args.devices} meters on {args.endpoints} endpoints, target {target:.0f} readings/s")
+    print(f"{'mode':>8} {'readings/s':>12} {'cpu us/reading':>16}")
+    for mode, run in (("direct", run_direct), ("repost", run_repost)):
+        cpu_started = time.process_time()
+        written = await run(meters, args.interval, args.seconds)
+        cpu = time.process_time() - cpu_started
+        print(f"{mode:>8} {written / args.seconds:>12.0f} {cpu * 1e6 / max(written, 1):>16.0f}")
+
+    for simulator in simulators:
+        await simulator.stop()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
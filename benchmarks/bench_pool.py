@@ -0,0 +1,105 @@
+"""Measure read endpoint throughput across connection pool sizes.
+
+Requires the database configured in .env / the environment. Runs the
+monitoring and alert routers in-process and drives them with concurrent
+clients over ASGI, so the pool is the only shared limit. Pass --seed N
+to insert N synthetic readings first (do not use on production data).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pool [--seed 20000] [--clients 64] [--seconds 5]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints import alerts, monitoring
+from app.db import get_db
+from app.db.session import AsyncSessionLocal, make_engine
+from app.models import PowerReadingCreate
+from app.services import MonitoringService
+
+POOL_SIZES = (1, 5, 10, 20, 40)
+PATHS = ("/readings/?limit=50", "/alerts/?limit=50", "/alerts/summary")
+
+async def seed(count: int):
+    async with AsyncSessionLocal() as db:
+        service = MonitoringService(db)
+        for offset in range(0, count, 1000):
+            await service.create_readings([
+                PowerReadingCreate(
+                    voltage=230 + (i % 40) - 20,
+                    current=60 + i % 70,
+                    frequency=50,
+                    power_factor=0.95,
+                    equipment_id=f"BENCH-{i % 50}",
+                    location="bench"
+                )
+                for i in range(offset, min(offset + 1000, count))
+            ])
+
+async def run(pool_size: int, clients: int, seconds: float) -> dict:
+    engine = make_engine(pool_size=pool_size, max_overflow=0)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_db():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(monitoring.router)
+    app.include_router(alerts.router)
+    app.dependency_overrides[get_db] = bench_db
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(index: int):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            i = index
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await http.get(PATHS[i % len(PATHS)])
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    stats = engine.pool.stats()
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "wait": stats["wait_avg_ms"]
+    }
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.seed:
+        await seed(args.seed)
+
+    print(f"{'pool':>6} {'req/s':>9} {'p50':>9} {'p99':>9} {'avg wait':>10}")
+    for size in POOL_SIZES:
+        result = await run(size, args.clients, args.seconds)
+        print(
+            f"{size:>6} {result['rps']:>9.0f} {result['p50']:>7.1f}ms "
+            f"{result['p99']:>7.1f}ms {result['wait']:>8.1f}ms"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
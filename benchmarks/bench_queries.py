@@ -0,0 +1,116 @@
+"""Compare hot queries built per call with the cached statements the services use.
+
+Requires the database configured in .env / the environment, with some
+readings, alerts and at least one user and session present (see
+bench_pool --seed). Each query runs sequentially on one connection so
+the per-request Python overhead (statement construction, cache key and
+compile lookup, asyncpg prepare) dominates the difference.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_queries [--seconds 3]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import contains_eager
+
+from app.api.v1.endpoints import alerts, monitoring
+from app.core.pagination import encode_cursor
+from app.db import Alert, Equipment, PowerReading, Session, User
+from app.db.session import AsyncSessionLocal, engine
+from app.services import AlertService, AuthService, MonitoringService, SessionService
+from app.services.session_store import session_store
+
+def legacy_readings(equipment_id):
+    query = select(PowerReading)
+    if equipment_id:
+        query = query.where(PowerReading.equipment_key == select(Equipment.id).where(
+            Equipment.equipment_id == equipment_id
+        ).scalar_subquery())
+    return query.order_by(PowerReading.timestamp.desc(), PowerReading.id.desc()).offset(0).limit(50)
+
+def legacy_reading(reading_id):
+    return select(PowerReading).where(PowerReading.id == reading_id)
+
+def legacy_alerts(cursor):
+    query = select(Alert).filter(Alert.is_acknowledged == False)  # noqa: E712
+    query = query.filter(tuple_(Alert.timestamp, Alert.id) < tuple_(*cursor))
+    return query.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(50)
+
+def legacy_user(username):
+    return select(User).where(User.username == username)
+
+def legacy_session(token):
+    return select(Session).where(
+        Session.token == token,
+        Session.is_active == True,  # noqa: E712
+        Session.expires_at > datetime.now(timezone.utc)
+    ).join(Session.user).options(contains_eager(Session.user))
+
+async def rate(func, seconds: float) -> float:
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        await func()
+        calls += 1
+    return calls / seconds
+
+async def endpoint_rates(seconds: float, reading_id: int):
+    app = FastAPI()
+    app.include_router(monitoring.router)
+    app.include_router(alerts.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        for path in ("/readings/?limit=50", f"/readings/{reading_id}", "/alerts/?limit=50&is_acknowledged=false"):
+            async def call():
+                response = await http.get(path)
+                response.raise_for_status()
+            print(f"{path:>44} {await rate(call, seconds):>9.0f} req/s")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        reading = (await db.execute(select(PowerReading).limit(1))).scalar_one()
+        alert = (await db.execute(select(Alert).order_by(Alert.id.desc()).limit(1))).scalar_one()
+        user = (await db.execute(select(User).limit(1))).scalar_one()
+        session = (await db.execute(select(Session).where(Session.user_id == user.id).limit(1))).scalar_one()
+        cursor = (alert.timestamp, alert.id + 1)
+        cursor_token = encode_cursor(*cursor)
+
+        async def validate():
+            await session_store.invalidate(session.token)  # measure the database path
+            await SessionService(db).validate_session(session.token)
+
+        cases = [
+            ("readings list", lambda: db.execute(legacy_readings(reading.equipment_id)),
+             lambda: MonitoringService(db).get_readings(limit=50, equipment_id=reading.equipment_id)),
+            ("reading by id", lambda: db.execute(legacy_reading(reading.id)),
+             lambda: MonitoringService(db).get_reading(reading.id)),
+            ("alerts page", lambda: db.execute(legacy_alerts(cursor)),
+             lambda: AlertService(db).get_alerts(limit=50, is_acknowledged=False, cursor=cursor_token)),
+            ("user by name", lambda: db.execute(legacy_user(user.username)),
+             lambda: AuthService(db).get_user_by_username(user.username)),
+            ("session lookup", lambda: db.execute(legacy_session(session.token)), validate),
+        ]
+
+        print(f"{'query':>16} {'per-call':>11} {'cached':>11} {'speedup':>8}")
+        for name, legacy, cached in cases:
+            before = await rate(legacy, args.seconds)
+            after = await rate(cached, args.seconds)
+            print(f"{name:>16} {before:>9.0f}/s {after:>9.0f}/s {after / before:>7.2f}x")
+
+    print()
+    await endpoint_rates(args.seconds, reading.id)
+    await session_store.flush()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
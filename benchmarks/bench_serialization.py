@@ -0,0 +1,68 @@
+"""Compare list endpoint throughput of the ORM/Pydantic path and the fast paths.
+
+Requires the database configured in .env / the environment with at least
+--limit readings and some alerts (see bench_pool --seed). Runs the routers
+in-process over ASGI, one request at a time, and reports rows/sec for the
+default response, format=rows (Core tuples + orjson, identical JSON) and
+format=columns (one array per field). The rows output is checked against
+the default response before timing.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization [--limit 10000] [--seconds 5]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import alerts, monitoring
+from app.db.session import engine
+
+PATHS = ("/readings/", "/alerts/")
+FORMATS = (None, "rows", "columns")
+
+async def rows_per_second(http: httpx.AsyncClient, path: str, params: dict, seconds: float) -> float:
+    rows = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        response = await http.get(path, params=params)
+        response.raise_for_status()
+        rows += params["limit"]
+    return rows / (time.perf_counter() - started)
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(monitoring.router)
+    app.include_router(alerts.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        print(f"{'path':>10} {'format':>8} {'rows/s':>10} {'speedup':>8}")
+        for path in PATHS:
+            default = await http.get(path, params={"limit": args.limit})
+            fast = await http.get(path, params={"limit": args.limit, "format": "rows"})
+            assert fast.content == default.content, f"{path} rows output differs from the default"
+            available = len(default.json())
+            if available < args.limit:
+                print(f"{path:>10} only {available} rows available")
+                continue
+
+            baseline = None
+            for fmt in FORMATS:
+                params = {"limit": args.limit}
+                if fmt:
+                    params["format"] = fmt
+                rate = await rows_per_second(http, path, params, args.seconds)
+                baseline = baseline or rate
+                print(f"{path:>10} {fmt or 'default':>8} {rate:>10.0f} {rate / baseline:>7.2f}x")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""Compare wire formats for reading batches: bytes on the wire and decode CPU.
+
+Runs in-process without a database. Ingest bodies (POST /readings/batch)
+are decoded and validated with the server's own decoder; list responses
+(GET /readings/) are encoded with the server's encoder and decoded the way
+a client would (orjson, msgpack, or msgpack plus numpy views for packed).
+Each format is measured uncompressed and with gzip and zstd; figures are
+per 1k readings.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_wire [--readings 5000] [--equipment 500] [--seconds 2]
+"""
+import argparse
+import gzip
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import msgpack
+import numpy as np
+import orjson
+import zstandard
+from starlette.requests import Request
+
+from app.api.formats import JSON, MSGPACK, PACKED, decode_reading_batch_body, list_response
+
+ENCODINGS = {
+    "identity": lambda data: data,
+    "gzip": lambda data: gzip.compress(data, compresslevel=6),
+    "zstd": lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+}
+DECOMPRESS = {
+    "identity": lambda data: data,
+    "gzip": gzip.decompress,
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+}
+
+def make_readings(count: int, equipment: int) -> list:
+    return [
+        {
+            "voltage": round(random.gauss(230, 2), 2),
+            "current": round(random.uniform(5, 90), 2),
+            "frequency": round(random.gauss(50, 0.02), 3),
+            "power_factor": round(random.uniform(0.8, 1.0), 3) if i % 4 else None,
+            "equipment_id": f"METER-{i % equipment:05d}",
+            "location": f"SUBSTATION-{i % equipment // 50:03d}"
+        }
+        for i in range(count)
+    ]
+
+def pack_batch(readings: list) -> bytes:
+    """Client-side encoding of an ingest batch in the packed columnar layout"""
+    dictionary = {}
+    index = [
+        dictionary.setdefault((reading["equipment_id"], reading["location"]), len(dictionary))
+        for reading in readings
+    ]
+    document = {
+        "count": len(readings),
+        "equipment": [list(pair) for pair in dictionary],
+        "equipment_index": np.array(index, dtype="<u4").tobytes(),
+    }
+    for field in ("voltage", "current", "frequency", "power_factor"):
+        document[field] = np.array(
+            [np.nan if reading[field] is None else reading[field] for reading in readings], dtype="<f8"
+        ).tobytes()
+    return msgpack.packb(document)
+
+def unpack_list(content: bytes) -> dict:
+    """Client-side decoding of a packed list response into numpy columns"""
+    document = msgpack.unpackb(content)
+    for field, dtype in (
+        ("equipment_index", "<u4"), ("id", "<i8"), ("timestamp", "<i8"), ("is_anomaly", "u1"),
+        ("voltage", "<f8"), ("current", "<f8"), ("frequency", "<f8"), ("power_factor", "<f8")
+    ):
+        document[field] = np.frombuffer(document[field], dtype=dtype)
+    return document
+
+def cpu_per_call(fn: Callable[[], object], seconds: float) -> float:
+    calls = 0
+    started = time.process_time()
+    while time.process_time() - started < seconds:
+        fn()
+        calls += 1
+    return (time.process_time() - started) / calls
+
+def report(label: str, fmt: str, body: bytes, decode: Callable[[bytes], object], count: int, seconds: float):
+    for encoding, compress in ENCODINGS.items():
+        wire = compress(body)
+        cpu = cpu_per_call(lambda: decode(DECOMPRESS[encoding](wire)), seconds)
+        print(
+            f"{label:>8} {fmt:>8} {encoding:>9} {len(wire) * 1000 / count:>12.0f} "
+            f"{cpu * 1e6 * 1000 / count:>16.0f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readings", type=int, default=5000)
+    parser.add_argument("--equipment", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    random.seed(1)
+
+    readings = make_readings(args.readings, args.equipment)
+    print(f"{'':>8} {'format':>8} {'encoding':>9} {'bytes/1k':>12} {'decode us/1k':>16}")
+
+    # Ingest: server decode + validation, the CPU a worker spends per batch
+    for fmt, content_type, body in (
+        ("json", JSON, orjson.dumps(readings)),
+        ("msgpack", MSGPACK, msgpack.packb(readings)),
+        ("packed", PACKED, pack_batch(readings)),
+    ):
+        decoded = decode_reading_batch_body(body, content_type)
+        assert [reading.model_dump() for reading in decoded] == readings, f"{fmt} round trip differs"
+        report("ingest", fmt, body, lambda data, ct=content_type: decode_reading_batch_body(data, ct), len(readings), args.seconds)
+
+    # List responses: server encoding, client decode
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    names = list(readings[0]) + ["id", "timestamp", "is_anomaly"]
+    rows = [
+        tuple(reading.values()) + (i + 1, started + timedelta(seconds=i), i % 50 == 0)
+        for i, reading in enumerate(readings)
+    ]
+    request = Request({"type": "http", "headers": []})
+    for fmt, decode in (
+        ("rows", orjson.loads),
+        ("columns", orjson.loads),
+        ("msgpack", lambda data: msgpack.unpackb(data, timestamp=3)),
+        ("packed", unpack_list),
+    ):
+        body = list_response(request, names, rows, fmt).body
+        report("list", fmt, body, decode, len(rows), args.seconds)
+
+if __name__ == "__main__":
+    main()
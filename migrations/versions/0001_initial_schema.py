@@ -0,0 +1,135 @@
+"""initial schema
+
+Tables as they existed before migrations were introduced. Databases
+created earlier with Base.metadata.create_all() should be marked as
+being at this revision with ``alembic stamp 0001`` and then upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 19:07:14.378756
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _create_rollup_table(table_name):
+    columns = [
+        sa.Column('equipment_id', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('anomaly_count', sa.Integer(), nullable=False),
+    ]
+    for field in ("voltage", "current", "frequency"):
+        columns += [
+            sa.Column(f'{field}_sum', sa.Float(), nullable=False),
+            sa.Column(f'{field}_sumsq', sa.Float(), nullable=False),
+            sa.Column(f'{field}_min', sa.Float(), nullable=True),
+            sa.Column(f'{field}_max', sa.Float(), nullable=True),
+        ]
+    op.create_table(table_name, *columns, sa.PrimaryKeyConstraint('equipment_id', 'bucket_start'))
+
+def upgrade():
+    op.create_table('power_readings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('voltage', sa.Float(), nullable=False),
+    sa.Column('current', sa.Float(), nullable=False),
+    sa.Column('frequency', sa.Float(), nullable=False),
+    sa.Column('power_factor', sa.Float(), nullable=True),
+    sa.Column('equipment_id', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('is_anomaly', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_power_readings_equipment_timestamp_id', 'power_readings', ['equipment_id', 'timestamp', 'id'], unique=False)
+    op.create_index(op.f('ix_power_readings_id'), 'power_readings', ['id'], unique=False)
+    op.create_index(op.f('ix_power_readings_timestamp'), 'power_readings', ['timestamp'], unique=False)
+    for table_name in ("reading_rollups_1m", "reading_rollups_1h", "reading_rollups_1d"):
+        _create_rollup_table(table_name)
+    op.create_table('threshold_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('equipment_id', sa.String(), nullable=True),
+    sa.Column('location_pattern', sa.String(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=True),
+    sa.Column('voltage_nominal', sa.Float(), nullable=False),
+    sa.Column('voltage_tolerance', sa.Float(), nullable=False),
+    sa.Column('current_limit', sa.Float(), nullable=False),
+    sa.Column('frequency_min', sa.Float(), nullable=False),
+    sa.Column('frequency_max', sa.Float(), nullable=False),
+    sa.Column('power_factor_min', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('equipment_id')
+    )
+    op.create_index(op.f('ix_threshold_profiles_id'), 'threshold_profiles', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'OPERATOR', 'VIEWER', name='userrole'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('severity', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='alertseverity'), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('power_reading_id', sa.Integer(), nullable=True),
+    sa.Column('is_acknowledged', sa.Boolean(), nullable=True),
+    sa.Column('acknowledged_by', sa.String(), nullable=True),
+    sa.Column('acknowledged_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['power_reading_id'], ['power_readings.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alerts_id'), 'alerts', ['id'], unique=False)
+    op.create_index('ix_alerts_timestamp_id', 'alerts', ['timestamp', 'id'], unique=False)
+    op.create_table('sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('token', sa.String(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('device_info', sa.String(), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_activity', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sessions_id'), 'sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_sessions_token'), 'sessions', ['token'], unique=True)
+
+def downgrade():
+    op.drop_index(op.f('ix_sessions_token'), table_name='sessions')
+    op.drop_index(op.f('ix_sessions_id'), table_name='sessions')
+    op.drop_table('sessions')
+    op.drop_index('ix_alerts_timestamp_id', table_name='alerts')
+    op.drop_index(op.f('ix_alerts_id'), table_name='alerts')
+    op.drop_table('alerts')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_threshold_profiles_id'), table_name='threshold_profiles')
+    op.drop_table('threshold_profiles')
+    for table_name in ("reading_rollups_1d", "reading_rollups_1h", "reading_rollups_1m"):
+        op.drop_table(table_name)
+    op.drop_index(op.f('ix_power_readings_timestamp'), table_name='power_readings')
+    op.drop_index(op.f('ix_power_readings_id'), table_name='power_readings')
+    op.drop_index('ix_power_readings_equipment_timestamp_id', table_name='power_readings')
+    op.drop_table('power_readings')
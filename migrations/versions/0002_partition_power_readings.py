@@ -0,0 +1,128 @@
+"""partition power_readings by timestamp range
+
+Rebuilds power_readings as a table partitioned by RANGE (timestamp),
+with partitions covering existing history plus PARTITION_PREMAKE
+future periods and a default partition. Alerts lose their foreign key
+to readings (partitions are dropped by retention) and get their own
+equipment_id copied from the reading.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 19:30:00.000000
+"""
+from datetime import datetime, timedelta, timezone
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import get_settings
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+READING_COLUMNS = "id, timestamp, voltage, current, frequency, power_factor, equipment_id, location, is_anomaly"
+
+def _period_start(moment, interval):
+    moment = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1) if interval == "month" else moment
+
+def _next_period(start, interval):
+    if interval == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def _create_partitions(first, interval, premake):
+    start = _period_start(first, interval)
+    last = _period_start(datetime.now(timezone.utc), interval)
+    for _ in range(premake):
+        last = _next_period(last, interval)
+
+    while start <= last:
+        end = _next_period(start, interval)
+        suffix = start.strftime("%Y%m") if interval == "month" else start.strftime("%Y%m%d")
+        op.execute(
+            f"CREATE TABLE power_readings_p{suffix} PARTITION OF power_readings "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    op.execute("CREATE TABLE power_readings_default PARTITION OF power_readings DEFAULT")
+
+def upgrade():
+    settings = get_settings()
+
+    # Alerts keep their equipment even after the reading's partition is gone
+    op.add_column('alerts', sa.Column('equipment_id', sa.String(), nullable=True))
+    op.execute("""
+        UPDATE alerts SET equipment_id = power_readings.equipment_id
+        FROM power_readings WHERE power_readings.id = alerts.power_reading_id
+    """)
+    op.create_index(op.f('ix_alerts_equipment_id'), 'alerts', ['equipment_id'], unique=False)
+    op.drop_constraint('alerts_power_reading_id_fkey', 'alerts', type_='foreignkey')
+
+    # Move the old table aside; its sequence keeps issuing ids
+    op.rename_table('power_readings', 'power_readings_legacy')
+    op.execute("ALTER TABLE power_readings_legacy RENAME CONSTRAINT power_readings_pkey TO power_readings_legacy_pkey")
+    op.drop_index('ix_power_readings_equipment_timestamp_id', table_name='power_readings_legacy')
+    op.drop_index('ix_power_readings_id', table_name='power_readings_legacy')
+    op.drop_index('ix_power_readings_timestamp', table_name='power_readings_legacy')
+
+    op.create_table('power_readings',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('power_readings_id_seq')"), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('voltage', sa.Float(), nullable=False),
+        sa.Column('current', sa.Float(), nullable=False),
+        sa.Column('frequency', sa.Float(), nullable=False),
+        sa.Column('power_factor', sa.Float(), nullable=True),
+        sa.Column('equipment_id', sa.String(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('is_anomaly', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'timestamp'),
+        postgresql_partition_by='RANGE (timestamp)'
+    )
+    op.execute("ALTER SEQUENCE power_readings_id_seq OWNED BY power_readings.id")
+    op.create_index('ix_power_readings_equipment_timestamp_id', 'power_readings', ['equipment_id', 'timestamp', 'id'], unique=False)
+    op.create_index(op.f('ix_power_readings_timestamp'), 'power_readings', ['timestamp'], unique=False)
+
+    first = op.get_bind().execute(sa.text("SELECT min(timestamp) FROM power_readings_legacy")).scalar()
+    _create_partitions(first or datetime.now(timezone.utc), settings.PARTITION_INTERVAL, settings.PARTITION_PREMAKE)
+
+    op.execute(f"""
+        INSERT INTO power_readings ({READING_COLUMNS})
+        SELECT id, coalesce(timestamp, now()), voltage, current, frequency, power_factor,
+               equipment_id, location, is_anomaly
+        FROM power_readings_legacy
+    """)
+    op.drop_table('power_readings_legacy')
+
+def downgrade():
+    op.create_table('power_readings_plain',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('power_readings_id_seq')"), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('voltage', sa.Float(), nullable=False),
+        sa.Column('current', sa.Float(), nullable=False),
+        sa.Column('frequency', sa.Float(), nullable=False),
+        sa.Column('power_factor', sa.Float(), nullable=True),
+        sa.Column('equipment_id', sa.String(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('is_anomaly', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name='power_readings_plain_pkey')
+    )
+    op.execute(f"INSERT INTO power_readings_plain ({READING_COLUMNS}) SELECT {READING_COLUMNS} FROM power_readings")
+    op.execute("ALTER SEQUENCE power_readings_id_seq OWNED BY power_readings_plain.id")
+    op.execute("DROP TABLE power_readings CASCADE")
+
+    op.rename_table('power_readings_plain', 'power_readings')
+    op.execute("ALTER TABLE power_readings RENAME CONSTRAINT power_readings_plain_pkey TO power_readings_pkey")
+    op.create_index('ix_power_readings_equipment_timestamp_id', 'power_readings', ['equipment_id', 'timestamp', 'id'], unique=False)
+    op.create_index(op.f('ix_power_readings_id'), 'power_readings', ['id'], unique=False)
+    op.create_index(op.f('ix_power_readings_timestamp'), 'power_readings', ['timestamp'], unique=False)
+
+    # Alerts whose reading was dropped by retention cannot satisfy the foreign key
+    op.execute("""
+        UPDATE alerts SET power_reading_id = NULL
+        WHERE power_reading_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM power_readings WHERE power_readings.id = alerts.power_reading_id)
+    """)
+    op.create_foreign_key('alerts_power_reading_id_fkey', 'alerts', 'power_readings', ['power_reading_id'], ['id'])
+    op.drop_index(op.f('ix_alerts_equipment_id'), table_name='alerts')
+    op.drop_column('alerts', 'equipment_id')
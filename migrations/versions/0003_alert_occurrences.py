@@ -0,0 +1,22 @@
+"""alert occurrence count and last_seen for deduplication
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 21:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('alerts', sa.Column('occurrence_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('alerts', sa.Column('last_seen', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.execute("UPDATE alerts SET last_seen = timestamp")
+
+def downgrade():
+    op.drop_column('alerts', 'last_seen')
+    op.drop_column('alerts', 'occurrence_count')
@@ -0,0 +1,28 @@
+"""detector_states table for streaming detector snapshots
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 22:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'detector_states',
+        sa.Column('equipment_id', sa.String(), nullable=False),
+        sa.Column('state', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('equipment_id')
+    )
+    op.create_index(op.f('ix_detector_states_updated_at'), 'detector_states', ['updated_at'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_detector_states_updated_at'), table_name='detector_states')
+    op.drop_table('detector_states')
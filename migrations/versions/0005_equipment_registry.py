@@ -0,0 +1,75 @@
+"""equipment and location registries referenced by power_readings
+
+Readings stop repeating equipment_id and location strings and reference
+an equipment row and a location row by integer key instead. Locations
+are a dimension of their own, so every reading keeps the location it
+reported from and the downgrade restores the strings exactly. Rewriting the readings leaves the
+dropped strings as dead space in existing partitions until they are
+rewritten (VACUUM FULL) or expire; new partitions are compact.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 23:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'equipment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('equipment_id', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('equipment_id')
+    )
+    op.create_table(
+        'locations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.execute("INSERT INTO equipment (equipment_id) SELECT DISTINCT equipment_id FROM power_readings ORDER BY 1")
+    op.execute("INSERT INTO locations (name) SELECT DISTINCT location FROM power_readings ORDER BY 1")
+
+    op.add_column('power_readings', sa.Column('equipment_key', sa.Integer(), nullable=True))
+    op.add_column('power_readings', sa.Column('location_key', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE power_readings SET equipment_key = equipment.id, location_key = locations.id
+        FROM equipment, locations
+        WHERE equipment.equipment_id = power_readings.equipment_id AND locations.name = power_readings.location
+    """)
+    op.alter_column('power_readings', 'equipment_key', nullable=False)
+    op.alter_column('power_readings', 'location_key', nullable=False)
+    op.drop_index('ix_power_readings_equipment_timestamp_id', table_name='power_readings')
+    op.drop_column('power_readings', 'location')
+    op.drop_column('power_readings', 'equipment_id')
+    op.create_index('ix_power_readings_equipment_timestamp_id', 'power_readings', ['equipment_key', 'timestamp', 'id'], unique=False)
+    op.create_foreign_key('power_readings_equipment_key_fkey', 'power_readings', 'equipment', ['equipment_key'], ['id'])
+    op.create_foreign_key('power_readings_location_key_fkey', 'power_readings', 'locations', ['location_key'], ['id'])
+
+def downgrade():
+    op.drop_constraint('power_readings_location_key_fkey', 'power_readings', type_='foreignkey')
+    op.drop_constraint('power_readings_equipment_key_fkey', 'power_readings', type_='foreignkey')
+    op.drop_index('ix_power_readings_equipment_timestamp_id', table_name='power_readings')
+    op.add_column('power_readings', sa.Column('equipment_id', sa.String(), nullable=True))
+    op.add_column('power_readings', sa.Column('location', sa.String(), nullable=True))
+    op.execute("""
+        UPDATE power_readings SET equipment_id = equipment.equipment_id, location = locations.name
+        FROM equipment, locations
+        WHERE equipment.id = power_readings.equipment_key AND locations.id = power_readings.location_key
+    """)
+    op.alter_column('power_readings', 'equipment_id', nullable=False)
+    op.alter_column('power_readings', 'location', nullable=False)
+    op.drop_column('power_readings', 'location_key')
+    op.drop_column('power_readings', 'equipment_key')
+    op.create_index('ix_power_readings_equipment_timestamp_id', 'power_readings', ['equipment_id', 'timestamp', 'id'], unique=False)
+    op.drop_table('locations')
+    op.drop_table('equipment')
@@ -0,0 +1,50 @@
+"""key reading rollups by the equipment registry key
+
+Rollup rows reference equipment by integer key like the readings they
+summarise. Equipment that only appears in rollups (its readings already
+expired) is registered first.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLES = ("reading_rollups_1m", "reading_rollups_1h", "reading_rollups_1d")
+
+def upgrade():
+    op.execute(
+        "INSERT INTO equipment (equipment_id) SELECT equipment_id FROM ("
+        + " UNION ".join(f"SELECT equipment_id FROM {table_name}" for table_name in ROLLUP_TABLES)
+        + ") AS rolled_up ORDER BY 1 ON CONFLICT (equipment_id) DO NOTHING"
+    )
+    for table_name in ROLLUP_TABLES:
+        op.add_column(table_name, sa.Column('equipment_key', sa.Integer(), nullable=True))
+        op.execute(f"""
+            UPDATE {table_name} SET equipment_key = equipment.id
+            FROM equipment WHERE equipment.equipment_id = {table_name}.equipment_id
+        """)
+        op.alter_column(table_name, 'equipment_key', nullable=False)
+        op.drop_constraint(f'{table_name}_pkey', table_name, type_='primary')
+        op.drop_column(table_name, 'equipment_id')
+        op.create_primary_key(f'{table_name}_pkey', table_name, ['equipment_key', 'bucket_start'])
+        op.create_foreign_key(f'{table_name}_equipment_key_fkey', table_name, 'equipment', ['equipment_key'], ['id'])
+
+def downgrade():
+    for table_name in ROLLUP_TABLES:
+        op.drop_constraint(f'{table_name}_equipment_key_fkey', table_name, type_='foreignkey')
+        op.add_column(table_name, sa.Column('equipment_id', sa.String(), nullable=True))
+        op.execute(f"""
+            UPDATE {table_name} SET equipment_id = equipment.equipment_id
+            FROM equipment WHERE equipment.id = {table_name}.equipment_key
+        """)
+        op.alter_column(table_name, 'equipment_id', nullable=False)
+        op.drop_constraint(f'{table_name}_pkey', table_name, type_='primary')
+        op.drop_column(table_name, 'equipment_key')
+        op.create_primary_key(f'{table_name}_pkey', table_name, ['equipment_id', 'bucket_start'])
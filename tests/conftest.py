@@ -0,0 +1,17 @@
+import os
+import pytest
+
+# Settings only have to validate; these tests do not open database connections
+for name, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "SECRET_KEY": "test-secret",
+}.items():
+    os.environ.setdefault(name, value)
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
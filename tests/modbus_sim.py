@@ -0,0 +1,86 @@
+import asyncio
+import struct
+from typing import Dict, Optional, Sequence, Set
+from app.services.modbus import READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS, encode_value
+
+# Exception codes of Modbus exception responses
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+ILLEGAL_DATA_VALUE = 3
+
+# MBAP header: transaction id, protocol id (0), length of the rest, unit id
+_HEADER = struct.Struct(">HHHB")
+
+class ModbusSimulator:
+    """Local Modbus TCP server standing in for field devices in tests and benchmarks.
+
+    Serves read holding/input register requests for any unit with a
+    register bank; both register types read the same bank. Unset
+    addresses read as 0, unknown units get a gateway exception, and
+    ``latency`` delays every response.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.banks: Dict[int, Dict[int, int]] = {}
+        self.latency = latency
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    def set_registers(self, unit_id: int, address: int, registers: Sequence[int]):
+        bank = self.banks.setdefault(unit_id, {})
+        for offset, value in enumerate(registers):
+            bank[address + offset] = value & 0xFFFF
+
+    def set_value(self, unit_id: int, address: int, value: float, data_type: str = "float32", word_order: str = "big"):
+        self.set_registers(unit_id, address, encode_value(value, data_type, word_order))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening and return the bound port"""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening and drop open connections, like a device going offline"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                transaction, protocol, length, unit_id = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                if length < 2:
+                    break
+                pdu = await reader.readexactly(length - 1)
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                response = self._respond(unit_id, pdu)
+                writer.write(_HEADER.pack(transaction, protocol, len(response) + 1, unit_id) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _respond(self, unit_id: int, pdu: bytes) -> bytes:
+        function = pdu[0]
+        if function not in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS) or len(pdu) != 5:
+            return bytes([function | 0x80, ILLEGAL_FUNCTION])
+        bank = self.banks.get(unit_id)
+        if bank is None:
+            # Gateway target device failed to respond
+            return bytes([function | 0x80, 0x0B])
+        address, count = struct.unpack(">HH", pdu[1:])
+        if not 1 <= count <= 125:
+            return bytes([function | 0x80, ILLEGAL_DATA_VALUE])
+        if address + count > 0x10000:
+            return bytes([function | 0x80, ILLEGAL_DATA_ADDRESS])
+        registers = [bank.get(address + offset, 0) for offset in range(count)]
+        return struct.pack(f">BB{count}H", function, 2 * count, *registers)
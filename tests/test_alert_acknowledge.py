@@ -0,0 +1,94 @@
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.db import AlertSeverity
+from app.services import alert as alert_module
+from app.services.alert import AlertService
+from app.services.alert_counters import AlertCounters
+from app.services.alert_dedup import AlertDeduplicator
+
+pytestmark = pytest.mark.anyio
+
+HIGH, LOW = AlertSeverity.HIGH, AlertSeverity.LOW
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+class AlertTable:
+    """Stands in for an AsyncSession over alerts held as id -> [severity, equipment_id, acknowledged].
+
+    Answers the acknowledging UPDATE with the listed alerts that were not
+    yet acknowledged, as its WHERE clause does in PostgreSQL, and the
+    follow-up SELECT with the listed alerts that exist.
+    """
+
+    def __init__(self, alerts):
+        self.alerts = alerts
+        self.statements = []
+        self.callbacks = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(str(compiled))
+        ids = [id for id in compiled.params["id_1"] if id in self.alerts]
+        if not self.statements[-1].startswith("UPDATE"):
+            return Rows(ids)
+        updated = []
+        for id in ids:
+            severity, equipment_id, acknowledged = self.alerts[id]
+            if not acknowledged:
+                self.alerts[id][2] = True
+                updated.append(SimpleNamespace(id=id, severity=severity, equipment_id=equipment_id))
+        return Rows(updated)
+
+    async def commit(self):
+        self.commits += 1
+        for callback in self.callbacks:
+            callback()
+
+@pytest.fixture
+def counters(monkeypatch):
+    counters = AlertCounters()
+    counters._counts = Counter()
+    monkeypatch.setattr(alert_module, "alert_counters", counters)
+    monkeypatch.setattr(alert_module, "alert_deduplicator", AlertDeduplicator(window_seconds=60, max_incidents=10))
+    monkeypatch.setattr(alert_module, "after_commit", lambda db, callback: db.callbacks.append(callback))
+    return counters
+
+async def test_acknowledging_skips_alerts_already_acknowledged(counters):
+    db = AlertTable({1: [HIGH, "M1", False], 2: [HIGH, "M1", True], 3: [LOW, "M2", False]})
+    counters.record_created([(HIGH, "M1"), (HIGH, "M1"), (LOW, "M2")])
+    counters.record_acknowledged([(HIGH, "M1")])
+
+    result = await AlertService(db).acknowledge_alerts("alice", ids=[1, 2, 3, 4])
+    assert result == {"acknowledged": [1, 3], "already_acknowledged": [2], "not_found": [4]}
+    assert db.commits == 1
+
+    update, lookup = db.statements
+    assert update.startswith("UPDATE alerts SET is_acknowledged=")
+    assert "WHERE alerts.is_acknowledged IS NOT true AND alerts.id IN" in update
+    assert "RETURNING alerts.id, alerts.severity, alerts.equipment_id" in update
+    assert lookup.startswith("SELECT alerts.id")
+
+async def test_counters_move_only_the_alerts_acknowledged_now(counters):
+    db = AlertTable({1: [HIGH, "M1", False], 2: [HIGH, "M1", True], 3: [LOW, "M2", False]})
+    counters.record_created([(HIGH, "M1"), (HIGH, "M1"), (LOW, "M2")])
+    counters.record_acknowledged([(HIGH, "M1")])
+
+    await AlertService(db).acknowledge_alerts("alice", ids=[1, 2])
+    assert counters.summary() == {"total_alerts": 3, "by_severity": {"HIGH": 2, "LOW": 1}, "unacknowledged": 1}
+
+    # A second acknowledgement of the same alerts changes nothing
+    result = await AlertService(db).acknowledge_alerts("bob", ids=[1, 2])
+    assert result == {"acknowledged": [], "already_acknowledged": [1, 2], "not_found": []}
+    assert counters.summary("M1")["unacknowledged"] == 0
+    assert counters.summary("M2")["unacknowledged"] == 1
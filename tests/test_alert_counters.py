@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.db import AlertSeverity
+from app.services.alert_counters import AlertCounters
+
+pytestmark = pytest.mark.anyio
+
+HIGH, CRITICAL = AlertSeverity.HIGH, AlertSeverity.CRITICAL
+
+class CountRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class CountingSession:
+    """Stands in for an AsyncSession answering the grouped count query.
+
+    When a gate is given, the query waits for it, so a test can commit
+    alerts while a reload is in flight.
+    """
+
+    def __init__(self, rows, gate: asyncio.Event = None):
+        self.rows = rows
+        self.gate = gate
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return CountRows(self.rows)
+
+async def loaded(rows) -> AlertCounters:
+    counters = AlertCounters()
+    await counters.ensure_loaded(CountingSession(rows))
+    return counters
+
+async def test_created_alerts_are_counted_unacknowledged():
+    counters = await loaded([(HIGH, "M1", False, 2)])
+    counters.record_created([(HIGH, "M1"), (CRITICAL, "M2")])
+
+    assert counters.summary() == {"total_alerts": 4, "by_severity": {"HIGH": 3, "CRITICAL": 1}, "unacknowledged": 4}
+    assert counters.summary("M2") == {"total_alerts": 1, "by_severity": {"CRITICAL": 1}, "unacknowledged": 1}
+    assert counters.summary("M3") == {"total_alerts": 0, "by_severity": {}, "unacknowledged": 0}
+
+async def test_acknowledging_moves_counts_without_changing_totals():
+    counters = await loaded([(HIGH, "M1", False, 2), (HIGH, "M1", True, 1)])
+    counters.record_acknowledged([(HIGH, "M1"), (HIGH, "M1")])
+
+    assert counters.summary("M1") == {"total_alerts": 3, "by_severity": {"HIGH": 3}, "unacknowledged": 0}
+    assert counters._counts == {(HIGH, "M1", True): 3}
+
+async def test_changes_before_the_first_load_are_left_to_it():
+    counters = AlertCounters()
+    counters.record_created([(HIGH, "M1")])
+    assert not counters.is_loaded
+    await counters.ensure_loaded(CountingSession([(HIGH, "M1", False, 1)]))
+    assert counters.summary()["total_alerts"] == 1
+
+async def test_concurrent_first_requests_load_once():
+    counters = AlertCounters()
+    gate = asyncio.Event()
+    db = CountingSession([(HIGH, "M1", False, 1)], gate)
+    loads = [asyncio.create_task(counters.ensure_loaded(db)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*loads)
+    assert db.queries == 1
+
+async def test_alerts_committed_during_a_reload_are_replayed():
+    counters = await loaded([(HIGH, "M1", False, 1)])
+    gate = asyncio.Event()
+    # The database snapshot predates both changes below
+    reload = asyncio.create_task(counters.reconcile(CountingSession([(HIGH, "M1", False, 1)], gate)))
+    await asyncio.sleep(0)
+    counters.record_created([(CRITICAL, "M2")])
+    counters.record_acknowledged([(HIGH, "M1")])
+    gate.set()
+
+    # Both changes were already counted live, so the reload finds no drift
+    assert await reload == 0
+    assert counters.summary() == {"total_alerts": 2, "by_severity": {"HIGH": 1, "CRITICAL": 1}, "unacknowledged": 1}
+    assert counters._replay is None
+
+async def test_reconcile_reports_and_corrects_drift():
+    counters = await loaded([(HIGH, "M1", False, 5)])
+    drift = await counters.reconcile(CountingSession([(HIGH, "M1", False, 3), (CRITICAL, "M1", False, 1)]))
+    assert drift == 3
+    assert counters.summary("M1")["by_severity"] == {"HIGH": 3, "CRITICAL": 1}
+    assert counters.reconciliations == 2
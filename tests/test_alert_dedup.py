@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from app.db import AlertSeverity
+from app.services.alert_dedup import AlertDeduplicator
+
+START = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+def key(equipment_id: str = "M1", issues: int = 1, severity: AlertSeverity = AlertSeverity.LOW):
+    return (equipment_id, issues, severity)
+
+def at(seconds: float) -> datetime:
+    return START + timedelta(seconds=seconds)
+
+def test_repeats_inside_the_window_match_the_open_alert():
+    dedup = AlertDeduplicator(window_seconds=60, max_incidents=10)
+    dedup.record(key(), 7, at(0))
+    assert dedup.match(key(), at(60)) == 7
+    assert dedup.match(key(), at(61)) is None
+
+    # Each recorded repeat moves the window along
+    dedup.record(key(), 7, at(60), occurrences=2)
+    assert dedup.match(key(), at(100)) == 7
+    assert dedup.coalesced == 2
+
+def test_a_different_incident_does_not_match():
+    dedup = AlertDeduplicator(window_seconds=60, max_incidents=10)
+    dedup.record(key(), 7, at(0))
+    assert dedup.match(key("M2"), at(1)) is None
+    assert dedup.match(key(issues=2), at(1)) is None
+    assert dedup.match(key(severity=AlertSeverity.HIGH), at(1)) is None
+
+def test_a_zero_window_disables_deduplication():
+    dedup = AlertDeduplicator(window_seconds=0, max_incidents=10)
+    assert not dedup.enabled
+    dedup.record(key(), 7, at(0))
+    assert dedup.match(key(), at(0)) is None
+
+def test_closed_alerts_stop_coalescing():
+    dedup = AlertDeduplicator(window_seconds=60, max_incidents=10)
+    dedup.record(key(), 7, at(0))
+    dedup.record(key("M2"), 8, at(0))
+    dedup.close([7, 99])
+    assert dedup.match(key(), at(1)) is None
+    assert dedup.match(key("M2"), at(1)) == 8
+
+def test_a_replaced_alert_no_longer_closes_the_incident():
+    dedup = AlertDeduplicator(window_seconds=60, max_incidents=10)
+    dedup.record(key(), 7, at(0))
+    dedup.record(key(), 9, at(5))
+    dedup.close([7])
+    assert dedup.match(key(), at(6)) == 9
+
+def test_least_recently_recorded_incidents_are_evicted():
+    dedup = AlertDeduplicator(window_seconds=60, max_incidents=3)
+    for alert_id, equipment_id in enumerate(["A", "B", "C"]):
+        dedup.record(key(equipment_id), alert_id, at(0))
+    dedup.record(key("A"), 0, at(1))
+    dedup.record(key("D"), 3, at(1))
+    assert dedup.match(key("B"), at(2)) is None
+    assert [dedup.match(key(equipment_id), at(2)) for equipment_id in "ACD"] == [0, 2, 3]
+    assert sorted(dedup._keys_by_alert) == [0, 2, 3]
@@ -0,0 +1,61 @@
+import json
+import pytest
+from app.services.alert_hub import AlertHub
+
+pytestmark = pytest.mark.anyio
+
+def alert(id: int, severity: str = "high", equipment_id: str = "M1") -> dict:
+    return {"id": id, "severity": severity, "equipment_id": equipment_id, "message": f"alert {id}"}
+
+def queued(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return [event.id for event in events]
+
+async def test_alerts_reach_matching_subscribers():
+    hub = AlertHub(history_size=10, subscriber_queue_size=10)
+    everything = hub.subscribe()
+    critical = hub.subscribe(severities=["critical"])
+    meter = hub.subscribe(equipment_ids=["M2"])
+    hub.publish([alert(1), alert(2, "critical"), alert(3, equipment_id="M2")])
+    assert queued(everything) == [1, 2, 3]
+    assert queued(critical) == [2]
+    assert queued(meter) == [3]
+
+async def test_events_carry_the_encoded_alert():
+    hub = AlertHub(history_size=10, subscriber_queue_size=10)
+    subscription = hub.subscribe()
+    hub.publish([alert(1)])
+    event = await subscription.get()
+    assert json.loads(event.payload) == alert(1)
+
+async def test_a_full_queue_drops_the_oldest_events():
+    hub = AlertHub(history_size=10, subscriber_queue_size=2)
+    subscription = hub.subscribe()
+    hub.publish([alert(1), alert(2), alert(3), alert(4)])
+    assert queued(subscription) == [3, 4]
+    assert subscription.take_dropped() == 2
+    assert subscription.take_dropped() == 0
+
+async def test_unsubscribed_queues_stop_receiving():
+    hub = AlertHub(history_size=10, subscriber_queue_size=10)
+    subscription = hub.subscribe()
+    hub.unsubscribe(subscription)
+    hub.unsubscribe(subscription)
+    hub.publish([alert(1)])
+    assert hub.subscriber_count == 0
+    assert queued(subscription) == []
+
+async def test_replay_returns_matching_events_after_the_last_id():
+    hub = AlertHub(history_size=3, subscriber_queue_size=10)
+    hub.publish([alert(1), alert(2, "critical"), alert(3), alert(4, "critical")])
+    subscription = hub.subscribe(severities=["critical"])
+    assert [event.id for event in hub.replay(1, subscription)] == [2, 4]
+    assert hub.replay(4, subscription) == []
+    # Alert 1 has left the history, so a client that only saw alert 0 must resync
+    assert hub.replay(0, subscription) is None
+
+async def test_replay_with_no_history_asks_for_a_resync():
+    hub = AlertHub(history_size=3, subscriber_queue_size=10)
+    assert hub.replay(0, hub.subscribe()) is None
@@ -0,0 +1,46 @@
+import pytest
+from app.db import AlertSeverity
+from app.models import PowerReadingCreate
+from app.services.anomaly import (
+    AnomalyEngine,
+    ISSUE_CURRENT,
+    ISSUE_FREQUENCY,
+    ISSUE_POWER_FACTOR,
+    ISSUE_VOLTAGE,
+    describe_issues,
+)
+
+ENGINE = AnomalyEngine(voltage_nominal=230, current_limit=100, power_factor_min=0.8)
+
+def reading(voltage: float = 230.0, current: float = 10.0, equipment_id: str = "M1", **fields) -> PowerReadingCreate:
+    fields = dict(frequency=50.0, location="L", **fields)
+    return PowerReadingCreate(voltage=voltage, current=current, equipment_id=equipment_id, **fields)
+
+def test_engine_flags_each_threshold():
+    result = ENGINE.evaluate(
+        voltage=[230, 245, 230, 230, 230],
+        current=[10, 10, 110, 10, 10],
+        frequency=[50, 50, 50, 70, 50],
+        power_factor=[0.9, 0.9, 0.9, 0.9, 0.5]
+    )
+    assert result.issues.tolist() == [0, ISSUE_VOLTAGE, ISSUE_CURRENT, ISSUE_FREQUENCY, ISSUE_POWER_FACTOR]
+    assert result.is_anomaly.tolist() == [False, True, True, True, True]
+
+def test_engine_ignores_missing_power_factor():
+    result = ENGINE.evaluate_readings([reading(power_factor=None), reading(power_factor=0.95)])
+    assert result.issues.tolist() == [0, 0]
+
+@pytest.mark.parametrize("voltage, current, severity", [
+    (245, 10, AlertSeverity.LOW),
+    (256, 10, AlertSeverity.MEDIUM),
+    (268, 10, AlertSeverity.HIGH),
+    (230, 130, AlertSeverity.HIGH),
+    (180, 10, AlertSeverity.CRITICAL),
+    (230, 151, AlertSeverity.CRITICAL),
+])
+def test_engine_severity_ladder(voltage, current, severity):
+    assert ENGINE.evaluate([voltage], [current], [50]).severity_of(0) == severity
+
+def test_describe_issues():
+    description = describe_issues(ISSUE_VOLTAGE | ISSUE_FREQUENCY, 250.0, 10.0, 52.5)
+    assert description == "Issues detected: Voltage deviation: 250.0V; Frequency issue: 52.5Hz"
@@ -0,0 +1,165 @@
+import random
+import statistics
+import numpy as np
+import pytest
+from app.core.config import Settings
+from app.db import AlertSeverity
+from app.models import PowerReadingCreate
+from app.services.anomaly import (
+    AnomalyEngine,
+    ISSUE_CURRENT,
+    ISSUE_RATE_OF_CHANGE,
+    ISSUE_SUSTAINED,
+    ISSUE_VOLTAGE,
+    ISSUE_ZSCORE,
+    describe_issues,
+)
+from app.services.detectors import MeterState, RollingWindow, StreamDetectors
+
+ENGINE = AnomalyEngine(voltage_nominal=230, current_limit=100, power_factor_min=0.8)
+
+def reading(voltage: float = 230.0, current: float = 10.0, equipment_id: str = "M1", **fields) -> PowerReadingCreate:
+    fields = dict(frequency=50.0, location="L", **fields)
+    return PowerReadingCreate(voltage=voltage, current=current, equipment_id=equipment_id, **fields)
+
+def make_detectors(**overrides) -> StreamDetectors:
+    options = dict(
+        window_size=10,
+        min_samples=5,
+        zscore_threshold=4.0,
+        max_step_pct=3.0,
+        sustained_fraction=0.5,
+        sustained_seconds=60,
+        max_meters=100,
+        max_age=60
+    )
+    options.update(overrides)
+    return StreamDetectors(**options)
+
+def test_merge_combines_flags_and_keeps_the_higher_severity():
+    first = ENGINE.evaluate([245], [10], [50])
+    second = ENGINE.evaluate([230], [160], [50])
+    merged = first.merge(second)
+    assert merged.issues.tolist() == [ISSUE_VOLTAGE | ISSUE_CURRENT]
+    assert merged.severity_of(0) == AlertSeverity.CRITICAL
+
+def test_describe_streaming_issues():
+    description = describe_issues(ISSUE_VOLTAGE | ISSUE_ZSCORE, 250.0, 10.0, 50.0)
+    assert description == "Issues detected: Voltage deviation: 250.0V; Outside rolling baseline"
+
+def test_rolling_window_tracks_the_last_values():
+    random.seed(7)
+    values = [random.gauss(230, 3) for _ in range(500)]
+    window = RollingWindow(50)
+    for value in values:
+        window.push(value)
+    assert window.ordered() == values[-50:]
+    assert window.mean == pytest.approx(statistics.mean(values[-50:]))
+    assert window.stddev == pytest.approx(statistics.stdev(values[-50:]))
+    assert window.last == values[-1]
+
+def test_rolling_window_copy_is_independent():
+    window = RollingWindow.from_values(3, [1.0, 2.0, 3.0])
+    copy = window.copy()
+    copy.push(10.0)
+    assert window.ordered() == [1.0, 2.0, 3.0]
+    assert copy.ordered() == [2.0, 3.0, 10.0]
+
+def test_rate_of_change_is_flagged():
+    result, _ = make_detectors().evaluate([reading(230), reading(231), reading(240)], [ENGINE] * 3, now=0)
+    assert result.issues.tolist() == [0, 0, ISSUE_RATE_OF_CHANGE]
+
+def test_zscore_applies_once_min_samples_are_buffered():
+    detectors = make_detectors()
+    baseline = [reading(230 + 0.2 * (i % 2)) for i in range(5)]
+    result, _ = detectors.evaluate(baseline + [reading(233)], [ENGINE] * 6, now=0)
+    assert result.issues.tolist() == [0, 0, 0, 0, 0, ISSUE_ZSCORE]
+
+    # The same outlier before min_samples is not flagged
+    result, _ = detectors.evaluate(baseline[:3] + [reading(233)], [ENGINE] * 4, now=0)
+    assert not result.is_anomaly.any()
+
+def feed(detectors: StreamDetectors, voltages_at: dict) -> list:
+    """Record one reading per time, returning the sustained flag of each"""
+    flags = []
+    for now, voltage in voltages_at.items():
+        result, observations = detectors.evaluate([reading(voltage)], [ENGINE], now=now)
+        detectors.record(observations)
+        flags.append(int(result.issues[0] & ISSUE_SUSTAINED))
+    return flags
+
+def test_sustained_violation_is_timed_from_the_first_reading_outside():
+    detectors = make_detectors()
+    flags = feed(detectors, {0: 236, 30: 236, 40: 230, 50: 236, 100: 236, 110: 236})
+    assert flags == [0, 0, 0, 0, 0, ISSUE_SUSTAINED]
+
+def test_sustained_violation_does_not_depend_on_the_reading_rate():
+    # Many readings in a short burst are not a sustained deviation
+    result, _ = make_detectors().evaluate([reading(236)] * 20, [ENGINE] * 20, now=0)
+    assert not (result.issues & ISSUE_SUSTAINED).any()
+
+    # Two readings a minute apart are
+    assert feed(make_detectors(), {0: 236, 60: 236}) == [0, ISSUE_SUSTAINED]
+
+def test_state_changes_only_when_recorded():
+    detectors = make_detectors()
+    readings = [reading(236), reading(236)]
+    first, observations = detectors.evaluate(readings, [ENGINE] * 2, now=0)
+    # Not recorded, e.g. the batch rolled back: the same batch sees the same state
+    second, _ = detectors.evaluate(readings, [ENGINE] * 2, now=0)
+    assert first.issues.tolist() == second.issues.tolist() == [0, 0]
+
+    detectors.record(observations)
+    result, _ = detectors.evaluate([reading(236)], [ENGINE], now=60)
+    assert result.issues.tolist() == [ISSUE_SUSTAINED]
+
+def test_silent_meters_restart_their_baseline():
+    detectors = make_detectors(max_age=60)
+    _, observations = detectors.evaluate([reading(230)], [ENGINE], now=0)
+    detectors.record(observations)
+    result, _ = detectors.evaluate([reading(240)], [ENGINE], now=30)
+    assert result.issues.tolist() == [ISSUE_RATE_OF_CHANGE]
+    result, _ = detectors.evaluate([reading(240)], [ENGINE], now=100)
+    assert result.issues.tolist() == [0]
+
+def test_least_recently_seen_meters_are_evicted():
+    detectors = make_detectors(max_meters=2)
+    for now, equipment_id in enumerate(["A", "B", "A", "C"]):
+        detectors.record(detectors.evaluate([reading(equipment_id=equipment_id)], [ENGINE], now=now)[1])
+    assert list(detectors._meters) == ["A", "C"]
+    assert detectors.evictions == 1
+
+def test_meter_state_round_trips_through_a_snapshot():
+    detectors = make_detectors()
+    readings = [reading(230 + i % 3, 10 + i) for i in range(12)] + [reading(236)]
+    detectors.record(detectors.evaluate(readings, [ENGINE] * len(readings), now=5)[1])
+    state = detectors._meters["M1"]
+    restored = MeterState.from_dict(detectors.window_size, state.to_dict())
+    for name in ("voltage", "current"):
+        original, copy = getattr(state, name), getattr(restored, name)
+        assert copy.ordered() == original.ordered()
+        assert copy.mean == pytest.approx(original.mean)
+        assert copy.stddev == pytest.approx(original.stddev)
+    assert (restored.violation_since, restored.last_seen) == (5, 5)
+
+    # Snapshots from before violations were timed restart the run
+    legacy = {**state.to_dict(), "violations": 4}
+    del legacy["violation_since"]
+    assert MeterState.from_dict(detectors.window_size, legacy).violation_since is None
+
+def test_streaming_rules_stay_below_the_static_severities():
+    detectors = make_detectors()
+    result, _ = detectors.evaluate([reading(230), reading(240)], [ENGINE] * 2, now=0)
+    assert result.severity_of(1) == AlertSeverity.LOW
+    assert feed(detectors, {0: 236, 60: 236}) == [0, ISSUE_SUSTAINED]
+    result, _ = detectors.evaluate([reading(236)], [ENGINE], now=61)
+    assert result.severity_of(0) == AlertSeverity.MEDIUM
+
+def test_detectors_are_off_by_default():
+    assert Settings.model_fields["STREAM_WINDOW_SIZE"].default == 0
+
+def test_detectors_result_shapes_match_the_engine():
+    result, observations = make_detectors().evaluate([reading(), reading()], [ENGINE] * 2, now=0)
+    assert len(result) == len(observations) == 2
+    assert result.severity.dtype == np.int8
+    assert result.issues.dtype == np.uint8
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from app.services import export
+from app.services.export import ExportJobs, ExportManifest, ExportTableStats, write_manifest
+
+pytestmark = pytest.mark.anyio
+
+class NoSession:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class GatedExporter:
+    """Stands in for ArchiveExporter, finishing when the test opens its gate"""
+
+    gate: asyncio.Event
+    running = 0
+    most_running = 0
+
+    def __init__(self, db, path, fmt):
+        self.path = path
+        self.fmt = fmt
+
+    async def export(self, start, end, equipment_ids, tables):
+        cls = type(self)
+        cls.running += 1
+        cls.most_running = max(cls.most_running, cls.running)
+        try:
+            await cls.gate.wait()
+            if "fail" in self.path:
+                raise RuntimeError("disk full")
+            manifest = ExportManifest(self.path, self.fmt, {table: ExportTableStats(1, 10) for table in tables})
+            write_manifest(manifest)
+            return manifest
+        finally:
+            cls.running -= 1
+
+@pytest.fixture
+def exporter(monkeypatch, tmp_path):
+    monkeypatch.setattr(export.settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export, "AsyncSessionLocal", NoSession)
+    monkeypatch.setattr(export, "ArchiveExporter", GatedExporter)
+    GatedExporter.gate = asyncio.Event()
+    GatedExporter.running = GatedExporter.most_running = 0
+    return GatedExporter
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def test_exports_run_in_the_background(exporter):
+    jobs = ExportJobs(max_running=1, max_history=10)
+    first = jobs.start("first", tables=["readings"])
+    second = jobs.start("second", fmt="arrow")
+    await settle()
+    assert (first.status, second.status) == ("running", "queued")
+    assert exporter.running == 1
+
+    exporter.gate.set()
+    await settle()
+    assert first.status == second.status == "completed"
+    assert exporter.most_running == 1
+    assert {table: stats.rows for table, stats in second.tables.items()} == {"readings": 10, "alerts": 10}
+
+async def test_failed_exports_keep_their_error(exporter):
+    jobs = ExportJobs(max_running=1, max_history=10)
+    job = jobs.start("will-fail")
+    exporter.gate.set()
+    await settle()
+    assert (job.status, job.error) == ("failed", "disk full")
+    assert job.finished_at is not None
+
+async def test_options_and_names_are_checked_before_starting(exporter):
+    jobs = ExportJobs(max_running=1, max_history=10)
+    jobs.start("taken")
+    for options in (dict(name="taken"), dict(name="../up"), dict(fmt="csv"), dict(tables=["users"])):
+        with pytest.raises(ValueError):
+            jobs.start(**options)
+    await jobs.stop()
+
+async def test_finished_exports_are_found_on_disk(exporter):
+    jobs = ExportJobs(max_running=1, max_history=10)
+    jobs.start("done")
+    exporter.gate.set()
+    await settle()
+
+    # Another worker sharing EXPORT_DIR did not start the job
+    other = ExportJobs(max_running=1, max_history=10)
+    job = other.get("done")
+    assert job.status == "completed"
+    assert job.tables["alerts"].rows == 10
+    assert other.get("missing") is None
+    assert other.get("..") is None
+
+async def test_history_forgets_the_oldest_finished_jobs(exporter):
+    jobs = ExportJobs(max_running=2, max_history=2)
+    jobs.start("a")
+    exporter.gate.set()
+    await settle()
+    exporter.gate.clear()
+    jobs.start("b")
+    jobs.start("c")
+    assert list(jobs._jobs) == ["b", "c"]
+    await jobs.stop()
+    assert jobs._jobs["b"].status == "failed"
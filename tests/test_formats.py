@@ -0,0 +1,143 @@
+import gzip
+from datetime import datetime, timezone
+import msgpack
+import numpy as np
+import orjson
+import pytest
+import zstandard
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+from app.api import formats
+from app.api.formats import MSGPACK, PACKED, PACKED_FLOAT_FIELDS, decode_reading_batch_body, list_response, pack_readings
+
+READINGS = [
+    {"voltage": 230.5, "current": 10.0, "frequency": 50.0, "power_factor": 0.95, "equipment_id": "M1", "location": "A"},
+    {"voltage": 231.0, "current": 12.5, "frequency": 49.9, "power_factor": None, "equipment_id": "M2", "location": "A"},
+    {"voltage": 229.5, "current": 11.0, "frequency": 50.1, "power_factor": 0.9, "equipment_id": "M1", "location": "A"},
+]
+
+NAMES = ["voltage", "current", "frequency", "power_factor", "equipment_id", "location", "id", "timestamp", "is_anomaly"]
+MOMENT = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+ROWS = [
+    (*reading.values(), index + 1, MOMENT, index == 1)
+    for index, reading in enumerate(READINGS)
+]
+
+def request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+def packed_body(readings) -> bytes:
+    equipment = sorted({(reading["equipment_id"], reading["location"]) for reading in readings})
+    document = {
+        "count": len(readings),
+        "equipment": [list(pair) for pair in equipment],
+        "equipment_index": np.array(
+            [equipment.index((reading["equipment_id"], reading["location"])) for reading in readings], dtype="<u4"
+        ).tobytes(),
+    }
+    for field in PACKED_FLOAT_FIELDS:
+        document[field] = np.array(
+            [np.nan if reading[field] is None else reading[field] for reading in readings], dtype="<f8"
+        ).tobytes()
+    return msgpack.packb(document)
+
+@pytest.mark.parametrize("content_type, encode", [
+    ("application/json", orjson.dumps),
+    (MSGPACK, msgpack.packb),
+    (PACKED, packed_body),
+])
+@pytest.mark.parametrize("encoding, compress", [
+    ("", lambda data: data),
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_reading_batches_round_trip(content_type, encode, encoding, compress):
+    batch = decode_reading_batch_body(compress(encode(READINGS)), content_type, encoding)
+    assert [reading.model_dump() for reading in batch] == READINGS
+
+def test_packed_responses_share_the_equipment_dictionary():
+    document = msgpack.unpackb(pack_readings(NAMES, ROWS))
+    assert document["count"] == 3
+    assert document["equipment"] == [["M1", "A"], ["M2", "A"]]
+    assert np.frombuffer(document["equipment_index"], dtype="<u4").tolist() == [0, 1, 0]
+    assert np.frombuffer(document["id"], dtype="<i8").tolist() == [1, 2, 3]
+    timestamps = np.frombuffer(document["timestamp"], dtype="<i8")
+    assert timestamps.tolist() == [int(MOMENT.timestamp() * 1_000_000)] * 3
+    power_factor = np.frombuffer(document["power_factor"], dtype="<f8")
+    assert np.isnan(power_factor[1]) and power_factor[2] == 0.9
+    assert np.frombuffer(document["is_anomaly"], dtype="<u1").tolist() == [0, 1, 0]
+
+def test_empty_packed_response():
+    document = msgpack.unpackb(pack_readings(NAMES, []))
+    assert document["count"] == 0
+    assert document["equipment"] == []
+
+def test_json_list_formats_write_utc_timestamps_with_z():
+    rows = orjson.loads(list_response(request(), NAMES, ROWS, "rows").body)
+    columns = orjson.loads(list_response(request(), NAMES, ROWS, "columns").body)
+    assert rows[0]["timestamp"] == columns["timestamp"][0] == "2026-10-17T12:00:00Z"
+    assert columns["equipment_id"] == ["M1", "M2", "M1"]
+
+def test_large_responses_are_compressed_when_accepted(monkeypatch):
+    monkeypatch.setattr(formats.settings, "WIRE_COMPRESS_MIN_BYTES", 1024)
+    response = list_response(request(accept_encoding="gzip, zstd;q=0.5"), NAMES, ROWS * 10, "rows")
+    assert response.headers["content-encoding"] == "zstd"
+    assert orjson.loads(zstandard.ZstdDecompressor().decompress(response.body))[0]["equipment_id"] == "M1"
+
+    assert "content-encoding" not in list_response(request(accept_encoding="zstd;q=0"), NAMES, ROWS * 10, "rows").headers
+    assert "content-encoding" not in list_response(request(accept_encoding="zstd"), NAMES, ROWS[:1], "rows").headers
+
+@pytest.mark.parametrize("encoding, compress", [
+    ("", lambda data: data),
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_bodies_over_the_size_limit_are_rejected(monkeypatch, encoding, compress):
+    body = orjson.dumps(READINGS * 20)
+    monkeypatch.setattr(formats.settings, "WIRE_MAX_BODY_BYTES", len(body) - 1)
+    with pytest.raises(HTTPException) as error:
+        decode_reading_batch_body(compress(body), "application/json", encoding)
+    assert error.value.status_code == 413
+
+    monkeypatch.setattr(formats.settings, "WIRE_MAX_BODY_BYTES", len(body))
+    assert len(decode_reading_batch_body(compress(body), "application/json", encoding)) == 60
+
+def test_batch_size_limits():
+    with pytest.raises(RequestValidationError):
+        decode_reading_batch_body(b"[]", "application/json")
+    too_many = orjson.dumps(READINGS[:1] * (formats.settings.MAX_READINGS_BATCH_SIZE + 1))
+    with pytest.raises(RequestValidationError):
+        decode_reading_batch_body(too_many, "application/json")
+
+def test_validation_errors_point_into_the_body():
+    body = orjson.dumps([READINGS[0], {**READINGS[1], "voltage": "high"}])
+    with pytest.raises(RequestValidationError) as error:
+        decode_reading_batch_body(body, "application/json")
+    assert error.value.errors()[0]["loc"] == ("body", 1, "voltage")
+
+@pytest.mark.parametrize("body, content_type, encoding, status_code", [
+    (b"\xc1", MSGPACK, "", 400),
+    (msgpack.packb({"count": 1}), PACKED, "", 400),
+    (b"not gzip", "application/json", "gzip", 400),
+    (b"[]", "application/json", "br", 415),
+    (b"<readings/>", "application/xml", "", 415),
+])
+def test_malformed_bodies_are_rejected(body, content_type, encoding, status_code):
+    with pytest.raises(HTTPException) as error:
+        decode_reading_batch_body(body, content_type, encoding)
+    assert error.value.status_code == status_code
+
+def test_packed_bodies_are_checked_against_their_count():
+    document = msgpack.unpackb(packed_body(READINGS))
+    document["count"] = 4
+    with pytest.raises(HTTPException, match="do not match count"):
+        decode_reading_batch_body(msgpack.packb(document), PACKED)
+
+    document = msgpack.unpackb(packed_body(READINGS))
+    document["equipment"] = document["equipment"][:1]
+    with pytest.raises(HTTPException, match="out of range"):
+        decode_reading_batch_body(msgpack.packb(document), PACKED)
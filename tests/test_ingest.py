@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from sqlalchemy.exc import DBAPIError
+from app.models import PowerReadingCreate
+from app.services.ingest import IngestWriter
+
+pytestmark = pytest.mark.anyio
+
+class DatabaseError(Exception):
+    """Stands in for an asyncpg error carrying a SQLSTATE"""
+
+    def __init__(self, pgcode: str):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+class RecordingIngestWriter(IngestWriter):
+    """IngestWriter whose writes are recorded instead of sent to the database"""
+
+    def __init__(self, *args, rejected=(), error_code: str = "22021", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+        self.rejected = set(rejected)
+        self.error_code = error_code
+
+    async def _write(self, batch):
+        ids = [reading.equipment_id for reading, _ in batch]
+        self.batches.append(ids)
+        if self.rejected.intersection(ids):
+            raise DBAPIError("INSERT", None, DatabaseError(self.error_code))
+        for reading, future in batch:
+            future.set_result(reading.equipment_id)
+
+def reading(equipment_id: str) -> PowerReadingCreate:
+    return PowerReadingCreate(voltage=230, current=10, frequency=50, equipment_id=equipment_id, location="L")
+
+async def submit_all(writer: IngestWriter, count: int):
+    return [await writer.submit(reading(f"M{i}")) for i in range(count)]
+
+async def test_full_batches_are_written_together():
+    writer = RecordingIngestWriter(max_queue=100, batch_size=4, flush_interval=10)
+    futures = await submit_all(writer, 10)
+    writer.start()
+    assert await asyncio.gather(*futures[:8]) == [f"M{i}" for i in range(8)]
+    assert [len(batch) for batch in writer.batches] == [4, 4]
+    await writer.stop()
+    assert [len(batch) for batch in writer.batches] == [4, 4, 2]
+    assert await asyncio.gather(*futures) == [f"M{i}" for i in range(10)]
+    assert not writer.is_running
+
+async def test_partial_batches_are_flushed_after_the_interval():
+    writer = RecordingIngestWriter(max_queue=100, batch_size=100, flush_interval=0.05)
+    writer.start()
+    futures = await submit_all(writer, 3)
+    assert await asyncio.wait_for(asyncio.gather(*futures), 1) == ["M0", "M1", "M2"]
+    assert writer.batches == [["M0", "M1", "M2"]]
+    await writer.stop()
+
+async def test_a_full_queue_applies_backpressure():
+    writer = RecordingIngestWriter(max_queue=2, batch_size=1, flush_interval=0)
+    assert writer.try_submit(reading("M0")) is not None
+    assert writer.try_submit(reading("M1")) is not None
+    assert writer.try_submit(reading("M2")) is None
+
+    waiting = asyncio.create_task(writer.submit(reading("M2")))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    writer.start()
+    assert await (await asyncio.wait_for(waiting, 1)) == "M2"
+    await writer.stop()
+    assert writer.batches == [["M0"], ["M1"], ["M2"]]
+
+async def test_a_rejected_reading_fails_only_its_own_future():
+    writer = RecordingIngestWriter(max_queue=100, batch_size=3, flush_interval=10, rejected={"M1"})
+    futures = await submit_all(writer, 3)
+    writer.start()
+    await writer.stop()
+    assert writer.batches == [["M0", "M1", "M2"], ["M0"], ["M1"], ["M2"]]
+    assert futures[0].result() == "M0"
+    assert futures[2].result() == "M2"
+    assert futures[1].exception().orig.pgcode == "22021"
+
+async def test_other_errors_fail_the_rest_of_the_batch():
+    # e.g. the database went away: no point retrying every reading
+    writer = RecordingIngestWriter(max_queue=100, batch_size=3, flush_interval=10, rejected={"M1"}, error_code="08006")
+    futures = await submit_all(writer, 3)
+    writer.start()
+    await writer.stop()
+    assert writer.batches == [["M0", "M1", "M2"], ["M0"], ["M1"]]
+    assert futures[0].result() == "M0"
+    assert futures[1].exception() is futures[2].exception()
+
+async def test_a_failed_single_reading_is_not_retried():
+    writer = RecordingIngestWriter(max_queue=100, batch_size=3, flush_interval=0, rejected={"M0"})
+    futures = await submit_all(writer, 1)
+    writer.start()
+    await writer.stop()
+    assert writer.batches == [["M0"]]
+    assert isinstance(futures[0].exception(), DBAPIError)
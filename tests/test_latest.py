@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.models import PowerReadingBatchItem, PowerReadingCreate
+from app.services.latest import LatestReadingIndex
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+class MappingRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+class LatestSession:
+    """Stands in for an AsyncSession answering the latest-reading query with fixed rows"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query.compile(dialect=postgresql.dialect()))
+        return MappingRows(self.rows)
+
+def reading(equipment_id: str = "M1", location: str = "L1", voltage: float = 230.0) -> PowerReadingCreate:
+    return PowerReadingCreate(
+        voltage=voltage, current=10, frequency=50, equipment_id=equipment_id, location=location
+    )
+
+def item(id: int, seconds: float = 0, is_anomaly: bool = False) -> PowerReadingBatchItem:
+    return PowerReadingBatchItem(index=0, id=id, timestamp=START + timedelta(seconds=seconds), is_anomaly=is_anomaly)
+
+def row(id: int, equipment_id: str, seconds: float = 0, location: str = "L1") -> dict:
+    return {
+        "id": id,
+        "timestamp": START + timedelta(seconds=seconds),
+        "voltage": 231.0,
+        "current": 10.0,
+        "frequency": 50.0,
+        "power_factor": None,
+        "equipment_id": equipment_id,
+        "location": location,
+        "is_anomaly": False
+    }
+
+def test_recorded_readings_replace_older_ones_only():
+    index = LatestReadingIndex()
+    index.record([reading(voltage=230), reading("M2")], [item(1), item(2)])
+    index.record([reading(voltage=240)], [item(3, seconds=10)])
+    # Committed late, but older than the reading already held
+    index.record([reading(voltage=220)], [item(4, seconds=5)])
+
+    assert [(entry["equipment_id"], entry["id"], entry["voltage"]) for entry in index.get()] == [
+        ("M1", 3, 240), ("M2", 2, 230)
+    ]
+    assert len(index) == 2
+
+def test_equipment_moving_location_leaves_the_old_view():
+    index = LatestReadingIndex()
+    index.record([reading("M1"), reading("M2")], [item(1), item(2)])
+    assert [entry["equipment_id"] for entry in index.get("L1")] == ["M1", "M2"]
+
+    index.record([reading("M1", location="L2")], [item(3, seconds=1)])
+    assert [entry["equipment_id"] for entry in index.get("L1")] == ["M2"]
+    assert [entry["equipment_id"] for entry in index.get("L2")] == ["M1"]
+    assert index.get("L3") == []
+
+def test_json_reuses_fragments_until_an_entry_changes():
+    index = LatestReadingIndex()
+    index.record([reading("M2"), reading("M1")], [item(1), item(2, is_anomaly=True)])
+    body = index.to_json()
+    decoded = orjson.loads(body)
+    assert [entry["equipment_id"] for entry in decoded] == ["M1", "M2"]
+    assert decoded[0]["timestamp"] == "2026-10-17T12:00:00Z"
+    assert decoded[0]["is_anomaly"] is True
+
+    cached = index._fragments["M2"]
+    index.record([reading("M1", voltage=250)], [item(3, seconds=1)])
+    assert "M1" not in index._fragments
+    assert orjson.loads(index.to_json())[0]["voltage"] == 250
+    assert index._fragments["M2"] is cached
+    assert index.to_json("L9") == b"[]"
+
+async def test_load_merges_the_latest_stored_readings():
+    index = LatestReadingIndex()
+    index.record([reading("M1")], [item(9, seconds=30)])
+    db = LatestSession([row(1, "M1"), row(2, "M2")])
+    assert await index.load(db) == 2
+    assert index.is_loaded
+    # The newer reading recorded by this process wins over the stored one
+    assert [entry["id"] for entry in index.get()] == [9, 2]
+
+    sql = str(db.queries[0])
+    assert "LATERAL" in sql
+    assert "ORDER BY power_readings.timestamp DESC, power_readings.id DESC" in sql
+    assert "power_readings.timestamp >=" not in sql
+
+async def test_refresh_reads_back_from_the_previous_load_with_overlap():
+    index = LatestReadingIndex()
+    db = LatestSession()
+    assert await index.refresh(db) == 0
+    first_load = index._refreshed_at
+
+    db.rows = [row(5, "M3", location="L2")]
+    assert await index.refresh(db) == 1
+    since = db.queries[1].params["timestamp_1"]
+    assert since == first_load - timedelta(seconds=60)
+    assert "power_readings.timestamp >= " in str(db.queries[1])
+    assert index._refreshed_at >= first_load
+    assert [entry["equipment_id"] for entry in index.get("L2")] == ["M3"]
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.api.v1.endpoints import monitoring as monitoring_endpoints
+from app.services.monitoring import MonitoringService, parse_bucket_width
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+END = datetime(2026, 10, 2, tzinfo=timezone.utc)
+
+def compiled_sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+class StreamedRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def partitions(self, size):
+        for offset in range(0, len(self.rows), size):
+            yield self.rows[offset:offset + size]
+
+class StreamingSession:
+    """Stands in for an AsyncSession streaming fixed result rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def stream(self, query):
+        self.queries.append(query)
+        return StreamedRows(self.rows)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+@pytest.mark.parametrize("bucket, width", [
+    ("30s", timedelta(seconds=30)),
+    ("15m", timedelta(minutes=15)),
+    ("1h", timedelta(hours=1)),
+    ("7d", timedelta(days=7)),
+])
+def test_parse_bucket_width(bucket, width):
+    assert parse_bucket_width(bucket) == width
+
+@pytest.mark.parametrize("bucket", ["0m", "1w", "h", "1.5h", ""])
+def test_invalid_bucket_widths_are_rejected(bucket):
+    with pytest.raises(ValueError):
+        parse_bucket_width(bucket)
+
+def test_aggregate_query_buckets_with_date_bin():
+    query, names = MonitoringService.build_aggregate_query(
+        ["M1", "M2"], START, END, "15m", ["count", "avg", "stddev", "p95"], ["voltage", "current"]
+    )
+    assert names == [
+        "equipment_id", "bucket",
+        "voltage_count", "voltage_avg", "voltage_stddev", "voltage_p95",
+        "current_count", "current_avg", "current_stddev", "current_p95",
+    ]
+    sql = compiled_sql(query)
+    assert "date_bin(" in sql
+    assert "stddev_samp(power_readings.voltage)" in sql
+    assert "percentile_cont(" in sql and "WITHIN GROUP (ORDER BY power_readings.current)" in sql
+    assert "GROUP BY equipment_id, bucket ORDER BY equipment_id, bucket" in sql
+    assert "power_readings.timestamp >= " in sql and "power_readings.timestamp < " in sql
+
+    params = query.compile(dialect=postgresql.dialect()).params
+    assert timedelta(minutes=15) in params.values()
+    assert datetime(2000, 1, 1, tzinfo=timezone.utc) in params.values()
+
+@pytest.mark.parametrize("end, bucket, stats, fields", [
+    (START, "1h", ["avg"], ["voltage"]),
+    (START + timedelta(days=2), "1s", ["avg"], ["voltage"]),
+    (END, "1h", ["median"], ["voltage"]),
+    (END, "1h", ["avg"], ["equipment_id"]),
+])
+def test_invalid_aggregations_are_rejected(end, bucket, stats, fields):
+    with pytest.raises(ValueError):
+        MonitoringService.build_aggregate_query(["M1"], START, end, bucket, stats, fields)
+
+async def test_aggregate_readings_yields_columnar_chunks(monkeypatch):
+    monkeypatch.setattr(monitoring_endpoints.settings, "AGGREGATE_CHUNK_SIZE", 2)
+    rows = [("M1", START + timedelta(hours=hour), 230.0 + hour) for hour in range(3)]
+    chunks = [
+        chunk async for chunk in MonitoringService(StreamingSession(rows)).aggregate_readings(["M1"], START, END)
+    ]
+    assert chunks == [
+        {"equipment_id": ["M1", "M1"], "bucket": [START, START + timedelta(hours=1)], "voltage_avg": [230.0, 231.0]},
+        {"equipment_id": ["M1"], "bucket": [START + timedelta(hours=2)], "voltage_avg": [232.0]},
+    ]
+
+async def test_aggregate_endpoint_streams_ndjson(monkeypatch):
+    monkeypatch.setattr(monitoring_endpoints.settings, "AGGREGATE_CHUNK_SIZE", 1)
+    rows = [("M1", START, 230.0), ("M1", START + timedelta(hours=1), 231.0)]
+    monkeypatch.setattr(monitoring_endpoints, "AsyncSessionLocal", lambda: StreamingSession(rows))
+    lines = [
+        line async for line in monitoring_endpoints._aggregate_chunks(["M1"], START, END, "1h", ["avg"], ["voltage"])
+    ]
+    assert all(line.endswith("\n") for line in lines)
+    assert [json.loads(line) for line in lines] == [
+        {"equipment_id": ["M1"], "bucket": ["2026-10-01T00:00:00+00:00"], "voltage_avg": [230.0]},
+        {"equipment_id": ["M1"], "bucket": ["2026-10-01T01:00:00+00:00"], "voltage_avg": [231.0]},
+    ]
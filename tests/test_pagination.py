@@ -0,0 +1,27 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+import pytest
+from app.core.pagination import decode_cursor, encode_cursor, next_cursor
+
+Row = namedtuple("Row", "id timestamp")
+
+MOMENT = datetime(2026, 10, 17, 12, 30, 5, 123456, tzinfo=timezone.utc)
+
+def test_cursor_round_trips():
+    cursor = encode_cursor(MOMENT, 42)
+    assert decode_cursor(cursor) == (MOMENT, 42)
+    # URL safe and without padding
+    assert all(character.isalnum() or character in "-_" for character in cursor)
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(MOMENT, 1)[:-4], "WyJ4IiwxXQ"])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+def test_next_cursor_points_after_the_last_row_of_a_full_page():
+    rows = [Row(3, MOMENT), Row(2, MOMENT)]
+    assert decode_cursor(next_cursor(rows, limit=2)) == (MOMENT, 2)
+
+def test_next_cursor_ends_on_a_short_page():
+    assert next_cursor([Row(3, MOMENT)], limit=2) is None
+    assert next_cursor([], limit=2) is None
@@ -0,0 +1,204 @@
+import asyncio
+import pytest
+from app.models import PollDevice
+from app.services.modbus import ModbusClient, ModbusError, decode_value, encode_value
+from app.services.poller import DevicePoller, check_devices
+from tests.modbus_sim import ModbusSimulator
+
+pytestmark = pytest.mark.anyio
+
+class RecordingWriter:
+    """Stands in for the IngestWriter, keeping submitted readings"""
+
+    def __init__(self):
+        self.readings = []
+
+    async def submit(self, reading):
+        self.readings.append(reading)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+def make_device(port: int, unit_id: int = 1, equipment_id: str = "PLC-1", **overrides) -> PollDevice:
+    fields = dict(
+        equipment_id=equipment_id,
+        location="Substation-1",
+        host="127.0.0.1",
+        port=port,
+        unit_id=unit_id,
+        interval=0.05,
+        voltage={"address": 0},
+        current={"address": 2},
+        frequency={"address": 10, "data_type": "uint16", "scale": 0.01},
+        power_factor={"address": 11, "data_type": "int16", "scale": 0.01}
+    )
+    fields.update(overrides)
+    return PollDevice(**fields)
+
+def load_meter(simulator: ModbusSimulator, unit_id: int = 1, voltage: float = 231.5):
+    simulator.set_value(unit_id, 0, voltage)
+    simulator.set_value(unit_id, 2, 12.25)
+    simulator.set_value(unit_id, 10, 5002, "uint16")
+    simulator.set_value(unit_id, 11, -95, "int16")
+
+def make_poller(writer=None, max_backoff: float = 1.0) -> DevicePoller:
+    return DevicePoller("", 60, timeout=0.5, max_backoff=max_backoff, writer=writer or RecordingWriter())
+
+async def wait_for(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+@pytest.fixture
+async def simulator():
+    simulator = ModbusSimulator()
+    simulator.port = await simulator.start()
+    yield simulator
+    await simulator.stop()
+
+@pytest.mark.parametrize("data_type", ["uint16", "int16", "uint32", "int32", "float32"])
+@pytest.mark.parametrize("word_order", ["big", "little"])
+def test_register_encoding_round_trips(data_type, word_order):
+    value = 1234 if data_type.startswith("u") else -1234
+    assert decode_value(encode_value(value, data_type, word_order), data_type, word_order) == value
+
+async def test_poll_reads_and_scales_registers(simulator):
+    load_meter(simulator)
+    poller = make_poller()
+    reading = await poller.poll(make_device(simulator.port))
+    await poller.stop()
+
+    assert reading.equipment_id == "PLC-1"
+    assert reading.location == "Substation-1"
+    assert reading.voltage == 231.5
+    assert reading.current == 12.25
+    assert reading.frequency == pytest.approx(50.02)
+    assert reading.power_factor == pytest.approx(-0.95)
+    # One block read covering every point
+    assert simulator.requests == 1
+
+async def test_poll_little_endian_input_registers(simulator):
+    for address, value in ((0, 230.0), (2, 5.0), (4, 50.0)):
+        simulator.set_value(3, address, value, word_order="little")
+    device = make_device(
+        simulator.port,
+        unit_id=3,
+        register_type="input",
+        word_order="little",
+        frequency={"address": 4},
+        power_factor=None
+    )
+    poller = make_poller()
+    reading = await poller.poll(device)
+    await poller.stop()
+    assert (reading.voltage, reading.current, reading.frequency, reading.power_factor) == (230.0, 5.0, 50.0, None)
+
+async def test_running_poller_submits_readings(simulator):
+    load_meter(simulator, 1)
+    load_meter(simulator, 2, voltage=229.0)
+    writer = RecordingWriter()
+    poller = make_poller(writer)
+    poller.start([make_device(simulator.port, 1, "PLC-1"), make_device(simulator.port, 2, "PLC-2")])
+    await wait_for(lambda: all(status["polls"] >= 3 for status in poller.status()))
+    await poller.stop()
+
+    assert not poller.is_running
+    assert {reading.equipment_id for reading in writer.readings} == {"PLC-1", "PLC-2"}
+    assert {reading.voltage for reading in writer.readings if reading.equipment_id == "PLC-2"} == {229.0}
+
+async def test_device_errors_are_recorded_and_cleared_on_recovery(simulator):
+    poller = make_poller()
+    poller.start([make_device(simulator.port, unit_id=7)])
+    status = poller.statuses["PLC-1"]
+    # Unit 7 has no registers yet, so the simulator answers with an exception
+    await wait_for(lambda: status.failures >= 1)
+    assert status.polls == 0
+    assert "exception code 11" in status.last_error
+
+    load_meter(simulator, 7)
+    await wait_for(lambda: status.polls >= 1)
+    await poller.stop()
+    assert status.failures == 0
+    assert status.last_error is None
+    assert status.errors >= 1
+
+async def test_client_reconnects_after_the_server_restarts(simulator):
+    load_meter(simulator)
+    client = ModbusClient("127.0.0.1", simulator.port, timeout=0.5)
+    assert len(await client.read_registers(1, 3, 0, 4)) == 4
+
+    await simulator.stop()
+    with pytest.raises(ModbusError):
+        await client.read_registers(1, 3, 0, 4)
+    assert not client.is_connected
+
+    await simulator.start(port=simulator.port)
+    assert len(await client.read_registers(1, 3, 0, 4)) == 4
+    await client.close()
+
+async def test_client_drops_the_connection_after_a_timeout():
+    slow = ModbusSimulator(latency=0.3)
+    port = await slow.start()
+    slow.set_value(1, 0, 1.0)
+    client = ModbusClient("127.0.0.1", port, timeout=0.1)
+    with pytest.raises(ModbusError, match="no response"):
+        await client.read_registers(1, 3, 0, 2)
+    assert not client.is_connected
+
+    # The late response of the timed out request cannot be mistaken for this one
+    client.timeout = 1.0
+    assert await client.read_registers(1, 3, 0, 2) == tuple(encode_value(1.0, "float32"))
+    await client.close()
+    await slow.stop()
+
+async def test_unreachable_device_backs_off():
+    poller = make_poller(max_backoff=0.4)
+    # Nothing listens on port 1
+    poller.start([make_device(1)])
+    await asyncio.sleep(1.0)
+    await poller.stop()
+    status = poller.statuses["PLC-1"]
+    # Retries after 0.1, 0.2, 0.4, 0.4...: a handful of attempts, not one per 0.05s interval
+    assert 2 <= status.failures <= 6
+    assert status.failures == status.errors
+
+def test_retry_delay_doubles_up_to_max_backoff():
+    poller = make_poller(max_backoff=300)
+    assert [poller.retry_delay(10, failures) for failures in range(1, 7)] == [20, 40, 80, 160, 300, 300]
+    # An interval longer than max_backoff is never shortened
+    assert poller.retry_delay(600, 3) == 600
+    # Long outages do not overflow
+    assert poller.retry_delay(10, 100000) == 300
+
+async def test_crashed_device_loop_is_restarted(simulator, monkeypatch):
+    load_meter(simulator)
+    poller = make_poller()
+    poll = poller.poll
+    calls = []
+
+    async def flaky_poll(device):
+        calls.append(device)
+        if len(calls) == 1:
+            raise RuntimeError("unexpected")
+        return await poll(device)
+
+    monkeypatch.setattr(poller, "poll", flaky_poll)
+    poller.start([make_device(simulator.port)])
+    status = poller.statuses["PLC-1"]
+    await wait_for(lambda: status.polls >= 1)
+    await poller.stop()
+    assert status.errors == 1
+    assert status.last_error is None
+
+def test_duplicate_equipment_ids_are_rejected():
+    devices = [make_device(502, 1, "PLC-1"), make_device(502, 2, "PLC-2"), make_device(502, 3, "PLC-1")]
+    with pytest.raises(ValueError, match="PLC-1"):
+        check_devices(devices)
+    with pytest.raises(ValueError):
+        make_poller().start(devices)
+
+def test_points_must_fit_one_request():
+    with pytest.raises(ValueError):
+        make_device(502, current={"address": 200})
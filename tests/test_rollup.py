@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models import PowerReadingCreate
+from app.services.rollup import RollupService
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+class RecordingSession:
+    """Stands in for an AsyncSession, keeping executed statements and parameters"""
+
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, statement, parameters=None):
+        self.executed.append((statement, parameters))
+
+def reading(voltage: float, equipment_id: str = "M1") -> PowerReadingCreate:
+    return PowerReadingCreate(voltage=voltage, current=10, frequency=50, equipment_id=equipment_id, location="L")
+
+async def test_batches_fold_into_buckets_keyed_by_equipment_key():
+    db = RecordingSession()
+    readings = [reading(230), reading(232, "M2"), reading(234), reading(236)]
+    timestamps = [START, START, START + timedelta(seconds=30), START + timedelta(minutes=1)]
+    await RollupService(db).apply(readings, [7, 3, 7, 7], timestamps, [False, False, True, False])
+
+    minute, hour, day = (parameters for _, parameters in db.executed)
+    assert [(row["equipment_key"], row["bucket_start"], row["count"]) for row in minute] == [
+        (3, START, 1),
+        (7, START, 2),
+        (7, START + timedelta(minutes=1), 1),
+    ]
+    assert [(row["equipment_key"], row["count"], row["anomaly_count"]) for row in hour] == [(3, 1, 0), (7, 3, 1)]
+    assert hour[1]["voltage_sum"] == 700
+    assert hour[1]["voltage_sumsq"] == 230 ** 2 + 234 ** 2 + 236 ** 2
+    assert (hour[1]["voltage_min"], hour[1]["voltage_max"]) == (230, 236)
+    assert [row["bucket_start"] for row in day] == [START.replace(hour=0)] * 2
+    assert [{**row, "bucket_start": None} for row in day] == [{**row, "bucket_start": None} for row in hour]
+
+async def test_the_upsert_statement_is_shared_across_batch_shapes():
+    db = RecordingSession()
+    service = RollupService(db)
+    await service.apply([reading(230)], [1], [START], [False])
+    await service.apply([reading(230), reading(231, "M2")], [1, 2], [START, START], [False, False])
+    statements = [statement for statement, _ in db.executed]
+    assert all("ON CONFLICT (equipment_key, bucket_start)" in str(statement) for statement in statements)
+    assert str(statements[0]) == str(statements[3])
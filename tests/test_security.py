@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app.api.dependencies import get_current_username, require_viewer
+from app.core.security import create_access_token, decode_access_token
+from app.core.token_cache import TokenCache, TokenRevocations, token_cache, token_revocations
+from app.services import session as session_module
+from app.services.session import SessionService
+
+pytestmark = pytest.mark.anyio
+
+class TokenResult:
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.tokens
+
+class RevokingSession:
+    """Stands in for an AsyncSession whose bulk update ends the given sessions"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.commits = 0
+
+    async def execute(self, query):
+        return TokenResult(self.tokens)
+
+    async def commit(self):
+        self.commits += 1
+
+class NoSessionStore:
+    async def invalidate_user(self, user_id, keep_token=None):
+        pass
+
+@pytest.fixture(autouse=True)
+def clean_token_state():
+    token_cache.clear()
+    token_revocations._expiry.clear()
+    yield
+    token_cache.clear()
+    token_revocations._expiry.clear()
+
+def token(username: str = "alice") -> str:
+    return create_access_token({"sub": username, "role": "viewer"})
+
+async def test_revoked_tokens_are_rejected_despite_a_cache_hit():
+    alice = token()
+    assert decode_access_token(alice)["sub"] == "alice"
+    assert token_cache.get(alice) is not None
+
+    token_revocations.revoke(alice)
+    assert decode_access_token(alice) is None
+    with pytest.raises(HTTPException) as error:
+        await get_current_username(alice)
+    assert error.value.status_code == 401
+
+async def test_role_checks_reject_revoked_tokens():
+    alice = token()
+    assert await require_viewer(alice) == "viewer"
+    token_revocations.revoke(alice)
+    with pytest.raises(HTTPException) as error:
+        await require_viewer(alice)
+    assert error.value.status_code == 401
+
+async def test_ending_sessions_revokes_their_tokens(monkeypatch):
+    monkeypatch.setattr(session_module, "session_store", NoSessionStore())
+    alice, bob, current = token("alice"), token("bob"), token("carol")
+    for each in (alice, bob, current):
+        decode_access_token(each)
+
+    db = RevokingSession([alice, bob])
+    assert await SessionService(db).invalidate_all_sessions(user_id=1, current_token=current) == 2
+    assert db.commits == 1
+    assert decode_access_token(alice) is None
+    assert decode_access_token(bob) is None
+    assert decode_access_token(current)["sub"] == "carol"
+
+def test_revocations_last_until_the_token_expires():
+    revocations = TokenRevocations()
+    short = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=1))
+    revocations.revoke(short)
+    assert revocations.is_revoked(short)
+
+    revocations._expiry[TokenCache.key(short)] = time.time() - 1
+    assert not revocations.is_revoked(short)
+    assert len(revocations) == 0
+
+    expired = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=-1))
+    revocations.revoke(expired)
+    assert len(revocations) == 0
+
+def test_prune_forgets_expired_revocations():
+    revocations = TokenRevocations()
+    alice, bob = token("alice"), token("bob")
+    revocations.revoke(alice)
+    revocations.revoke(bob)
+    revocations._expiry[TokenCache.key(alice)] = time.time() - 1
+    assert revocations.prune() == 1
+    assert not revocations.is_revoked(alice)
+    assert revocations.is_revoked(bob)
+
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+import time
+import pytest
+from app.db import User
+from app.services import session_store as store_module
+from app.services.session_store import MemorySessionBackend, SessionRecord, SessionStore
+
+pytestmark = pytest.mark.anyio
+
+class ActivitySession:
+    """Stands in for an AsyncSession, keeping the last_activity batches written"""
+
+    batches = []
+    fail = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement, parameters):
+        if self.fail:
+            raise ConnectionError("database is down")
+        type(self).batches.append(parameters)
+
+    async def commit(self):
+        pass
+
+@pytest.fixture
+def database(monkeypatch):
+    ActivitySession.batches = []
+    ActivitySession.fail = False
+    monkeypatch.setattr(store_module, "AsyncSessionLocal", ActivitySession)
+    return ActivitySession
+
+def record(id: int, user_id: int = 1, expires_in: timedelta = timedelta(days=1), age: float = 0) -> SessionRecord:
+    return SessionRecord(
+        id=id,
+        user_id=user_id,
+        token=f"token-{id}",
+        expires_at=datetime.now(timezone.utc) + expires_in,
+        user=User(id=user_id, username=f"user-{user_id}"),
+        cached_at=time.monotonic() - age
+    )
+
+async def test_memory_backend_evicts_the_least_recently_used():
+    backend = MemorySessionBackend(max_size=2)
+    await backend.set(record(1))
+    await backend.set(record(2, user_id=2))
+    await backend.get("token-1")
+    await backend.set(record(3))
+
+    assert await backend.get("token-2") is None
+    assert [await backend.get(f"token-{id}") is not None for id in (1, 3)] == [True, True]
+    assert backend._by_user == {1: {"token-1", "token-3"}}
+
+async def test_memory_backend_drops_a_users_sessions_except_the_kept_one():
+    backend = MemorySessionBackend(max_size=10)
+    for id in (1, 2, 3):
+        await backend.set(record(id))
+    await backend.set(record(4, user_id=2))
+    await backend.delete_user(1, keep_token="token-2")
+
+    assert [await backend.get(f"token-{id}") is not None for id in (1, 2, 3, 4)] == [False, True, False, True]
+    assert backend._by_user == {1: {"token-2"}, 2: {"token-4"}}
+
+async def test_stale_and_expired_sessions_are_not_served():
+    store = SessionStore(MemorySessionBackend(max_size=10), ttl=60, flush_interval=30)
+    await store.backend.set(record(1))
+    await store.backend.set(record(2, age=61))
+    await store.backend.set(record(3, expires_in=timedelta(seconds=-1)))
+
+    assert (await store.get("token-1")).id == 1
+    assert await store.get("token-2") is None
+    assert await store.get("token-3") is None
+    # Dropped from the backend too, so the next lookup reads the database
+    assert await store.backend.get("token-2") is None
+    assert await store.backend.get("token-3") is None
+
+async def test_touches_are_coalesced_into_one_flush(database):
+    store = SessionStore(MemorySessionBackend(max_size=10), ttl=60, flush_interval=30)
+    store.touch(1)
+    store.touch(2)
+    store.touch(1)
+    assert store.pending == 2
+
+    assert await store.flush() == 2
+    assert [sorted(row["id"] for row in batch) for batch in database.batches] == [[1, 2]]
+    assert store.pending == 0
+    assert await store.flush() == 0
+    assert len(database.batches) == 1
+
+async def test_failed_flushes_keep_activity_for_the_next_one(database):
+    store = SessionStore(MemorySessionBackend(max_size=10), ttl=60, flush_interval=30)
+    store.touch(1)
+    database.fail = True
+    assert await store.flush() == 0
+    assert store.pending == 1
+
+    database.fail = False
+    assert await store.flush() == 1
+    assert [row["id"] for row in database.batches[0]] == [1]
+
+async def test_stopping_flushes_remaining_activity(database):
+    store = SessionStore(MemorySessionBackend(max_size=10), ttl=60, flush_interval=3600)
+    store.start()
+    assert store.is_running
+    store.touch(7)
+    await store.stop()
+    assert not store.is_running
+    assert [row["id"] for row in database.batches[0]] == [7]
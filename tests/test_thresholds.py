@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from pydantic import ValidationError
+from app.db import ThresholdProfile as ThresholdProfileModel
+from app.models import PowerReadingCreate, ThresholdProfileUpdate
+from app.services.anomaly import AnomalyEngine, ISSUE_CURRENT, evaluate_with_engines
+from app.services.thresholds import ThresholdRuleCache
+
+pytestmark = pytest.mark.anyio
+
+DEFAULT = AnomalyEngine(voltage_nominal=230, current_limit=100)
+UPDATED = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+class ProfileResult:
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.profiles
+
+class VersionResult(ProfileResult):
+    def all(self):
+        return [(profile.id, profile.updated_at) for profile in self.profiles]
+
+class ProfileSession:
+    """Stands in for an AsyncSession holding threshold_profiles rows"""
+
+    def __init__(self, *profiles, during_load=None):
+        self.profiles = list(profiles)
+        self.during_load = during_load
+        self.loads = 0
+
+    async def execute(self, query):
+        if len(query.column_descriptions) > 1:
+            return VersionResult(sorted(self.profiles, key=lambda profile: profile.id))
+        self.loads += 1
+        if self.during_load is not None:
+            self.during_load()
+        return ProfileResult(sorted(self.profiles, key=lambda profile: (-profile.priority, profile.id)))
+
+def profile(id: int, current_limit: float, equipment_id=None, location_pattern=None, priority=0, is_active=True):
+    return ThresholdProfileModel(
+        id=id,
+        name=f"profile-{id}",
+        equipment_id=equipment_id,
+        location_pattern=location_pattern,
+        priority=priority,
+        voltage_nominal=230,
+        voltage_tolerance=10.0,
+        current_limit=current_limit,
+        frequency_min=45.0,
+        frequency_max=65.0,
+        is_active=is_active,
+        updated_at=UPDATED
+    )
+
+def reading(current: float) -> PowerReadingCreate:
+    return PowerReadingCreate(voltage=230, current=current, frequency=50, equipment_id="M1", location="L")
+
+async def loaded_cache(db) -> ThresholdRuleCache:
+    cache = ThresholdRuleCache(DEFAULT)
+    await cache.load(db)
+    return cache
+
+async def test_equipment_profiles_beat_location_patterns():
+    db = ProfileSession(
+        profile(1, 10, location_pattern="Substation-4/*"),
+        profile(2, 20, location_pattern="Substation-4/Bay-*", priority=5),
+        profile(3, 30, equipment_id="M1"),
+        profile(4, 40, equipment_id="M2", is_active=False)
+    )
+    cache = await loaded_cache(db)
+    assert cache.lookup("M1", "Substation-4/Bay-1").current_limit == 30
+    assert cache.lookup("M9", "Substation-4/Bay-1").current_limit == 20
+    assert cache.lookup("M9", "Substation-4/Hall").current_limit == 10
+    assert cache.lookup("M2", "Elsewhere") is DEFAULT
+
+async def test_lookups_are_cached_per_equipment_and_location():
+    cache = await loaded_cache(ProfileSession(profile(1, 10, equipment_id="M1")))
+    first = cache.lookup("M1", "L")
+    assert cache.lookup("M1", "L") is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+async def test_a_load_racing_an_invalidation_is_discarded():
+    cache = ThresholdRuleCache(DEFAULT)
+    db = ProfileSession(profile(1, 10, equipment_id="M1"), during_load=cache.invalidate)
+    await cache.load(db)
+    assert not cache.is_loaded
+    assert cache.loads == 0
+
+    db.during_load = None
+    await cache.ensure_loaded(db)
+    assert cache.lookup("M1", "L").current_limit == 10
+
+async def test_refresh_reloads_only_when_profiles_changed():
+    stored = profile(1, 10, equipment_id="M1")
+    db = ProfileSession(stored)
+    cache = await loaded_cache(db)
+    assert await cache.refresh(db) == 0
+    assert db.loads == 1
+
+    # Changed through another worker
+    stored.current_limit = 50
+    stored.updated_at = UPDATED + timedelta(seconds=1)
+    assert await cache.refresh(db) == 1
+    assert cache.lookup("M1", "L").current_limit == 50
+
+    # Deactivating still changes the version, so the profile stops applying
+    stored.is_active = False
+    stored.updated_at = UPDATED + timedelta(seconds=2)
+    assert await cache.refresh(db) == 1
+    assert cache.lookup("M1", "L") is DEFAULT
+
+    db.profiles.append(profile(2, 20, equipment_id="M2"))
+    assert await cache.refresh(db) == 1
+    assert cache.lookup("M2", "L").current_limit == 20
+
+async def test_refresh_leaves_an_unloaded_cache_alone():
+    db = ProfileSession(profile(1, 10, equipment_id="M1"))
+    assert await ThresholdRuleCache(DEFAULT).refresh(db) == 0
+    assert db.loads == 0
+
+def test_evaluate_with_engines_applies_each_readings_engine():
+    strict = AnomalyEngine(voltage_nominal=230, current_limit=5)
+    readings = [reading(10), reading(4), reading(50), reading(6)]
+    result = evaluate_with_engines(readings, [DEFAULT, strict, DEFAULT, strict])
+    assert result.issues.tolist() == [0, 0, 0, ISSUE_CURRENT]
+
+def test_profile_updates_reject_nulls_for_required_thresholds():
+    with pytest.raises(ValidationError):
+        ThresholdProfileUpdate(current_limit=None)
+    assert ThresholdProfileUpdate(power_factor_min=None).model_dump(exclude_unset=True) == {"power_factor_min": None}